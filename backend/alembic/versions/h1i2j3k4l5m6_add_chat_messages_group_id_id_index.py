@@ -0,0 +1,28 @@
+"""add_chat_messages_group_id_id_index
+
+Revision ID: h1i2j3k4l5m6
+Revises: g1h2i3j4k5l6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'h1i2j3k4l5m6'
+down_revision = 'g1h2i3j4k5l6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite index used for keyset pagination of a group's history.
+    # It also covers lookups by group_id alone, so the old index is dropped.
+    op.create_index('ix_group_chat_messages_group_id_id', 'group_chat_messages', ['group_id', 'id'])
+    op.drop_index('ix_group_chat_messages_group_id', table_name='group_chat_messages')
+
+
+def downgrade():
+    op.create_index('ix_group_chat_messages_group_id', 'group_chat_messages', ['group_id'])
+    op.drop_index('ix_group_chat_messages_group_id_id', table_name='group_chat_messages')
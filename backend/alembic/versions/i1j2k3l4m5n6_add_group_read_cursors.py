@@ -0,0 +1,70 @@
+"""add_group_read_cursors
+
+Revision ID: i1j2k3l4m5n6
+Revises: h1i2j3k4l5m6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'i1j2k3l4m5n6'
+down_revision = 'h1i2j3k4l5m6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One read watermark per (group, user) replaces one row per (message, user)
+    op.create_table(
+        'group_read_cursors',
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('last_read_message_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('group_id', 'user_id'),
+        sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    
+    # Backfill each member's watermark from the newest message they have read
+    op.execute("""
+        INSERT INTO group_read_cursors (group_id, user_id, last_read_message_id, updated_at)
+        SELECT m.group_id, r.user_id, MAX(r.message_id), MAX(r.read_at)
+        FROM message_read_status r
+        JOIN group_chat_messages m ON m.id = r.message_id
+        GROUP BY m.group_id, r.user_id
+    """)
+    
+    op.drop_index('ix_message_read_status_user_id', table_name='message_read_status')
+    op.drop_index('ix_message_read_status_message_id', table_name='message_read_status')
+    op.drop_table('message_read_status')
+
+
+def downgrade():
+    op.create_table(
+        'message_read_status',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('read_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['message_id'], ['group_chat_messages.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('message_id', 'user_id', name='unique_message_user_read')
+    )
+    op.create_index('ix_message_read_status_message_id', 'message_read_status', ['message_id'])
+    op.create_index('ix_message_read_status_user_id', 'message_read_status', ['user_id'])
+    
+    # Expand each watermark back into per-message rows
+    op.execute("""
+        INSERT INTO message_read_status (message_id, user_id, read_at)
+        SELECT m.id, c.user_id, c.updated_at
+        FROM group_read_cursors c
+        JOIN group_chat_messages m
+          ON m.group_id = c.group_id AND m.id <= c.last_read_message_id
+    """)
+    
+    op.drop_table('group_read_cursors')
@@ -0,0 +1,40 @@
+"""add_chat_message_search_vector
+
+Revision ID: j1k2l3m4n5o6
+Revises: i1j2k3l4m5n6
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'j1k2l3m4n5o6'
+down_revision = 'i1j2k3l4m5n6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 'simple' configuration: messages are multilingual, so no stemming
+    op.add_column(
+        'group_chat_messages',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', message)", persisted=True)
+        )
+    )
+    op.create_index(
+        'ix_group_chat_messages_search_vector',
+        'group_chat_messages',
+        ['search_vector'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_group_chat_messages_search_vector', table_name='group_chat_messages')
+    op.drop_column('group_chat_messages', 'search_vector')
@@ -0,0 +1,138 @@
+"""partition_group_chat_messages
+
+Revision ID: k1l2m3n4o5p6
+Revises: j1k2l3m4n5o6
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'k1l2m3n4o5p6'
+down_revision = 'j1k2l3m4n5o6'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = 'id, group_id, sender_id, sender_type, message, created_at, edited_at, is_deleted'
+
+# Monthly partitions from the oldest message up to three months ahead.
+# Later months are created by `python -m app.maintenance.chat_partitions`.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', LEAST(
+                COALESCE((SELECT MIN(created_at) FROM group_chat_messages_unpartitioned), now()),
+                now()
+            ) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF group_chat_messages FOR VALUES FROM (%L) TO (%L)',
+            'group_chat_messages_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month::text || ' 00:00:00+00',
+            (month + interval '1 month')::date::text || ' 00:00:00+00'
+        );
+    END LOOP;
+END $$;
+"""
+
+
+def _drop_indexes():
+    op.drop_index('ix_group_chat_messages_search_vector', table_name='group_chat_messages')
+    op.drop_index('ix_group_chat_messages_group_id_id', table_name='group_chat_messages')
+    op.drop_index('ix_group_chat_messages_created_at', table_name='group_chat_messages')
+    op.drop_index('ix_group_chat_messages_id', table_name='group_chat_messages')
+
+
+def _create_indexes():
+    op.create_index('ix_group_chat_messages_id', 'group_chat_messages', ['id'])
+    op.create_index('ix_group_chat_messages_created_at', 'group_chat_messages', ['created_at'])
+    op.create_index('ix_group_chat_messages_group_id_id', 'group_chat_messages', ['group_id', 'id'])
+    op.create_index(
+        'ix_group_chat_messages_search_vector',
+        'group_chat_messages',
+        ['search_vector'],
+        postgresql_using='gin'
+    )
+
+
+def upgrade():
+    # The partition key must be NOT NULL and part of the primary key
+    op.execute('UPDATE group_chat_messages SET created_at = now() WHERE created_at IS NULL')
+    
+    # Keep the id sequence alive while the old table is swapped out
+    op.execute('ALTER SEQUENCE group_chat_messages_id_seq OWNED BY NONE')
+    _drop_indexes()
+    # Index names are schema-wide, so the primary key index is renamed out of the way
+    op.rename_table('group_chat_messages', 'group_chat_messages_unpartitioned')
+    op.execute(
+        'ALTER TABLE group_chat_messages_unpartitioned '
+        'RENAME CONSTRAINT group_chat_messages_pkey TO group_chat_messages_unpartitioned_pkey'
+    )
+    
+    op.execute("""
+        CREATE TABLE group_chat_messages (
+            id INTEGER NOT NULL DEFAULT nextval('group_chat_messages_id_seq'),
+            group_id INTEGER NOT NULL REFERENCES groups (id) ON DELETE CASCADE,
+            sender_id INTEGER NOT NULL,
+            sender_type VARCHAR NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            edited_at TIMESTAMP WITH TIME ZONE,
+            is_deleted BOOLEAN,
+            search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', message)) STORED,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    
+    op.execute(
+        f'INSERT INTO group_chat_messages ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM group_chat_messages_unpartitioned'
+    )
+    op.drop_table('group_chat_messages_unpartitioned')
+    op.execute('ALTER SEQUENCE group_chat_messages_id_seq OWNED BY group_chat_messages.id')
+    _create_indexes()
+
+
+def downgrade():
+    op.execute('ALTER SEQUENCE group_chat_messages_id_seq OWNED BY NONE')
+    _drop_indexes()
+    op.rename_table('group_chat_messages', 'group_chat_messages_partitioned')
+    op.execute(
+        'ALTER TABLE group_chat_messages_partitioned '
+        'RENAME CONSTRAINT group_chat_messages_pkey TO group_chat_messages_partitioned_pkey'
+    )
+    
+    op.create_table(
+        'group_chat_messages',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('group_chat_messages_id_seq')"), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('sender_type', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('edited_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), default=False),
+        sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR(),
+                  sa.Computed("to_tsvector('simple', message)", persisted=True)),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+    )
+    op.execute(
+        f'INSERT INTO group_chat_messages ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM group_chat_messages_partitioned'
+    )
+    # Dropping the parent drops its partitions; archived tables are left alone
+    op.drop_table('group_chat_messages_partitioned')
+    op.execute('ALTER SEQUENCE group_chat_messages_id_seq OWNED BY group_chat_messages.id')
+    _create_indexes()
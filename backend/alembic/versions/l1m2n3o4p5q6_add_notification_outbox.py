@@ -0,0 +1,41 @@
+"""add_notification_outbox
+
+Revision ID: l1m2n3o4p5q6
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'l1m2n3o4p5q6'
+down_revision = 'k1l2m3n4o5p6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Notifications waiting for the dispatcher; drained oldest first by id
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('message', sa.String(), nullable=True),
+        sa.Column('link', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('related_group_id', sa.Integer(), nullable=True),
+        sa.Column('related_student_id', sa.Integer(), nullable=True),
+        sa.Column('related_request_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_group_id'], ['groups.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_student_id'], ['students.id'], ondelete='CASCADE'),
+    )
+
+
+def downgrade():
+    op.drop_table('notification_outbox')
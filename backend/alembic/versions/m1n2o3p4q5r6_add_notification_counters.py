@@ -0,0 +1,94 @@
+"""add_notification_counters
+
+Revision ID: m1n2o3p4q5r6
+Revises: l1m2n3o4p5q6
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'm1n2o3p4q5r6'
+down_revision = 'l1m2n3o4p5q6'
+branch_labels = None
+depends_on = None
+
+
+# Same definition as app.models.notification.NOTIFICATION_COUNTER_TRIGGERS
+COUNTER_TRIGGERS = """
+CREATE OR REPLACE FUNCTION notification_counters_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, count(*) FROM new_rows
+        WHERE user_id IS NOT NULL AND NOT coalesce(read, false)
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_counters.unread_count + EXCLUDED.unread_count;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, sum(delta) FROM (
+            SELECT user_id, 1 AS delta FROM new_rows WHERE NOT coalesce(read, false)
+            UNION ALL
+            SELECT user_id, -1 AS delta FROM old_rows WHERE NOT coalesce(read, false)
+        ) changes
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        HAVING sum(delta) <> 0
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_counters.unread_count + EXCLUDED.unread_count;
+    ELSE
+        UPDATE notification_counters
+        SET unread_count = notification_counters.unread_count - removed.unread
+        FROM (
+            SELECT user_id, count(*) AS unread FROM old_rows
+            WHERE NOT coalesce(read, false)
+            GROUP BY user_id
+        ) removed
+        WHERE notification_counters.user_id = removed.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notification_counters_insert
+AFTER INSERT ON notifications REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+CREATE TRIGGER notification_counters_update
+AFTER UPDATE ON notifications REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+CREATE TRIGGER notification_counters_delete
+AFTER DELETE ON notifications REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+"""
+
+
+def upgrade():
+    op.create_table(
+        'notification_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    op.execute(COUNTER_TRIGGERS)
+    
+    # Seed the counters from the existing notifications
+    op.execute("""
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, count(*) FROM notifications
+        WHERE user_id IS NOT NULL AND NOT coalesce(read, false)
+        GROUP BY user_id
+    """)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS notification_counters_delete ON notifications')
+    op.execute('DROP TRIGGER IF EXISTS notification_counters_update ON notifications')
+    op.execute('DROP TRIGGER IF EXISTS notification_counters_insert ON notifications')
+    op.execute('DROP FUNCTION IF EXISTS notification_counters_apply()')
+    op.drop_table('notification_counters')
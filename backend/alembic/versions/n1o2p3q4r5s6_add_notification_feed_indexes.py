@@ -0,0 +1,37 @@
+"""add_notification_feed_indexes
+
+Revision ID: n1o2p3q4r5s6
+Revises: m1n2o3p4q5r6
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'n1o2p3q4r5s6'
+down_revision = 'm1n2o3p4q5r6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination of a user's feed, newest first
+    op.create_index(
+        'ix_notifications_user_id_created_at_id',
+        'notifications',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    # The same order over unread notifications only
+    op.create_index(
+        'ix_notifications_user_id_unread',
+        'notifications',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('read = false')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_user_id_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_id_created_at_id', table_name='notifications')
@@ -0,0 +1,84 @@
+"""add_notification_coalescing
+
+Revision ID: o1p2q3r4s5t6
+Revises: n1o2p3q4r5s6
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'o1p2q3r4s5t6'
+down_revision = 'n1o2p3q4r5s6'
+branch_labels = None
+depends_on = None
+
+
+# Exactly the rows the dispatcher coalesces (app.models.notification.COALESCING_PREDICATE).
+# Invitations and mentorship requests are one per recipient and group and are
+# never merged; merged join requests keep every request id in request_ids.
+COALESCED = (
+    "read = false AND related_group_id IS NOT NULL "
+    "AND type NOT IN ('group_invitation', 'mentorship_request')"
+)
+
+# Unread notifications sharing (user, type, group); the newest row is kept
+DUPLICATE_EVENTS = f"""
+    SELECT user_id, type, related_group_id,
+           max(id) AS keep_id,
+           count(*) AS occurrences,
+           array_agg(related_student_id ORDER BY id) FILTER (WHERE related_student_id IS NOT NULL) AS actors,
+           array_agg(related_request_id ORDER BY id) FILTER (WHERE related_request_id IS NOT NULL) AS requests
+    FROM notifications
+    WHERE {COALESCED}
+    GROUP BY user_id, type, related_group_id
+    HAVING count(*) > 1
+"""
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('occurrence_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('notifications', sa.Column('actor_ids', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column('notifications', sa.Column('request_ids', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.execute("""
+        UPDATE notifications SET request_ids = ARRAY[related_request_id]
+        WHERE related_request_id IS NOT NULL
+    """)
+    
+    # Merge existing repeats so the unique index can be built
+    op.execute(f"""
+        UPDATE notifications
+        SET occurrence_count = duplicates.occurrences,
+            actor_ids = duplicates.actors[greatest(cardinality(duplicates.actors) - 4, 1):],
+            request_ids = duplicates.requests
+        FROM ({DUPLICATE_EVENTS}) duplicates
+        WHERE notifications.id = duplicates.keep_id
+    """)
+    op.execute(f"""
+        DELETE FROM notifications
+        USING ({DUPLICATE_EVENTS}) duplicates
+        WHERE notifications.read = false
+          AND notifications.user_id = duplicates.user_id
+          AND notifications.type = duplicates.type
+          AND notifications.related_group_id = duplicates.related_group_id
+          AND notifications.id <> duplicates.keep_id
+    """)
+    
+    op.create_index(
+        'uq_notifications_unread_group_event',
+        'notifications',
+        ['user_id', 'type', 'related_group_id'],
+        unique=True,
+        postgresql_where=sa.text(COALESCED)
+    )
+
+
+def downgrade():
+    # Merged occurrences are not split back into separate rows
+    op.drop_index('uq_notifications_unread_group_event', table_name='notifications')
+    op.drop_column('notifications', 'request_ids')
+    op.drop_column('notifications', 'actor_ids')
+    op.drop_column('notifications', 'occurrence_count')
@@ -0,0 +1,25 @@
+"""add_user_muted_notification_types
+
+Revision ID: p1q2r3s4t5u6
+Revises: o1p2q3r4s5t6
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'p1q2r3s4t5u6'
+down_revision = 'o1p2q3r4s5t6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bitmask over app.services.notification_preferences.NOTIFICATION_TYPES
+    op.add_column('users', sa.Column('muted_notification_types', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'muted_notification_types')
@@ -0,0 +1,43 @@
+"""add_notification_templates
+
+Revision ID: q1r2s3t4u5v6
+Revises: p1q2r3s4t5u6
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'q1r2s3t4u5v6'
+down_revision = 'p1q2r3s4t5u6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Templated notifications are rendered on read (app.services.notification_templates)
+    for table in ('notifications', 'notification_outbox'):
+        op.add_column(table, sa.Column('template_id', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    
+    op.alter_column('notifications', 'title', existing_type=sa.String(), nullable=True)
+    op.alter_column('notifications', 'message', existing_type=sa.String(), nullable=True)
+
+
+def downgrade():
+    # Older code expects stored text, so templated rows keep their template id as a title
+    op.execute("""
+        UPDATE notifications
+        SET title = COALESCE(title, template_id, ''),
+            message = COALESCE(message, '')
+        WHERE title IS NULL OR message IS NULL
+    """)
+    op.alter_column('notifications', 'message', existing_type=sa.String(), nullable=False)
+    op.alter_column('notifications', 'title', existing_type=sa.String(), nullable=False)
+    
+    for table in ('notification_outbox', 'notifications'):
+        op.drop_column(table, 'params')
+        op.drop_column(table, 'template_id')
@@ -0,0 +1,53 @@
+"""add_announcements
+
+Revision ID: r1s2t3u4v5w6
+Revises: q1r2s3t4u5v6
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'r1s2t3u4v5w6'
+down_revision = 'q1r2s3t4u5v6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The userrole enum already exists (created with users)
+    user_role = postgresql.ENUM('ADMIN', 'STUDENT', 'PROFESSOR', name='userrole', create_type=False)
+    op.create_table(
+        'announcements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('link', sa.String(), nullable=True),
+        sa.Column('target_role', user_role, nullable=True),
+        sa.Column('target_faculty', sa.String(), nullable=True),
+        sa.Column('target_year', sa.String(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_announcements_created_at_id',
+        'announcements',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    
+    # Per-user watermark: announcements with a higher id are unread
+    op.add_column(
+        'notification_counters',
+        sa.Column('last_seen_announcement_id', sa.Integer(), server_default='0', nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('notification_counters', 'last_seen_announcement_id')
+    op.drop_index('ix_announcements_created_at_id', table_name='announcements')
+    op.drop_table('announcements')
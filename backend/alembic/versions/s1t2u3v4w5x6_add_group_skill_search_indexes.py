@@ -0,0 +1,40 @@
+"""add_group_skill_search_indexes
+
+Revision ID: s1t2u3v4w5x6
+Revises: r1s2t3u4v5w6
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 's1t2u3v4w5x6'
+down_revision = 'r1s2t3u4v5w6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # needed_skills && :skills for GET /groups/search
+    op.create_index('ix_groups_needed_skills', 'groups', ['needed_skills'], postgresql_using='gin')
+    op.create_index(
+        'ix_groups_needed_skills_open',
+        'groups',
+        ['needed_skills'],
+        postgresql_using='gin',
+        postgresql_where=sa.text('current_members < max_members')
+    )
+    op.create_index(
+        'ix_groups_open_has_mentor',
+        'groups',
+        ['has_mentor', 'id'],
+        postgresql_where=sa.text('current_members < max_members')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_groups_open_has_mentor', table_name='groups')
+    op.drop_index('ix_groups_needed_skills_open', table_name='groups')
+    op.drop_index('ix_groups_needed_skills', table_name='groups')
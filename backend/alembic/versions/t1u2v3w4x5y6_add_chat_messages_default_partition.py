@@ -0,0 +1,33 @@
+"""add_chat_messages_default_partition
+
+Revision ID: t1u2v3w4x5y6
+Revises: s1t2u3v4w5x6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 't1u2v3w4x5y6'
+down_revision = 's1t2u3v4w5x6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Catches rows for months without a partition instead of failing the insert;
+    # app.maintenance.chat_partitions moves them out when the month is created
+    op.execute('CREATE TABLE IF NOT EXISTS group_chat_messages_default PARTITION OF group_chat_messages DEFAULT')
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM group_chat_messages_default) THEN
+                RAISE EXCEPTION 'group_chat_messages_default is not empty; create the missing monthly partitions first';
+            END IF;
+        END $$;
+    """)
+    op.drop_table('group_chat_messages_default')
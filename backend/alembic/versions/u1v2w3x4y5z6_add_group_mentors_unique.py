@@ -0,0 +1,33 @@
+"""add_group_mentors_unique
+
+Revision ID: u1v2w3x4y5z6
+Revises: t1u2v3w4x5y6
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'u1v2w3x4y5z6'
+down_revision = 't1u2v3w4x5y6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent accepts could assign the same professor twice; keep one row per
+    # pair. Run python -m app.maintenance.group_counters afterwards to give
+    # back the counters the duplicates took.
+    op.execute("""
+        DELETE FROM group_mentors duplicate
+        USING group_mentors kept
+        WHERE duplicate.group_id = kept.group_id
+          AND duplicate.professor_id = kept.professor_id
+          AND duplicate.ctid > kept.ctid
+    """)
+    op.create_unique_constraint('uq_group_mentors_group_professor', 'group_mentors', ['group_id', 'professor_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_group_mentors_group_professor', 'group_mentors', type_='unique')
@@ -13,6 +13,7 @@ from app.schemas.student import StudentWithUser
 from app.schemas.professor import ProfessorWithUser
 from app.utils.security import verify_password, get_password_hash, create_access_token, verify_token
 from app.config import settings
+from app.services import event_bus
 
 router = APIRouter()
 
@@ -148,6 +149,7 @@ def update_student_profile(
     if profile_data.looking_for_group is not None:
         student.looking_for_group = profile_data.looking_for_group
     
+    event_bus.emit(db, "student.updated", student_id=student.id)
     db.commit()
     db.refresh(student)
     
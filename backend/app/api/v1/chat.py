@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas.chat import ChatMessage, ChatMessageCreate, ChatMessageUpdate, UnreadCountResponse
+from typing import Dict, List, Optional
+from app.database import get_db, SessionLocal
+from app.schemas.chat import ChatMessage, ChatMessageCreate, ChatMessageUpdate, ChatSearchResult, UnreadCountResponse
 from app.crud import chat as crud_chat
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_admin, get_user_from_token
 from app.models.user import User
 from app.models.student import Student
 from app.models.professor import Professor
 from app.models.group import Group, GroupMember
 from app.models.group import group_mentors
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services import event_bus
+from app.services.hub import chat_hub, SlowConsumerError
+from app.services.access_cache import group_access_cache
+from app.services.message_signal import message_signal
 
 router = APIRouter()
 
@@ -19,7 +27,17 @@ def get_user_access_to_group(db: Session, user: User, group_id: int) -> tuple:
     Check if user has access to the group and return (has_access, user_type, user_profile_id)
     user_type: 'student' or 'professor'
     user_profile_id: the student.id or professor.id
+    Decisions are cached per (user, group) until membership changes or the TTL expires.
     """
+    access = group_access_cache.get(user.id, group_id)
+    if access is None:
+        version = group_access_cache.version()
+        access = _resolve_user_access_to_group(db, user, group_id)
+        group_access_cache.set(user.id, group_id, access, version)
+    return access
+
+
+def _resolve_user_access_to_group(db: Session, user: User, group_id: int) -> tuple:
     # Check if user is a student member
     student = db.query(Student).filter(Student.user_id == user.id).first()
     if student:
@@ -45,6 +63,155 @@ def get_user_access_to_group(db: Session, user: User, group_id: int) -> tuple:
     return (False, None, None)
 
 
+# Bus event type -> event type sent over the socket
+SOCKET_EVENT_TYPES = {
+    "chat.message_created": "message.created",
+    "chat.message_edited": "message.edited",
+    "chat.message_deleted": "message.deleted",
+}
+
+
+def push_chat_event(event: dict) -> None:
+    """
+    Fan a chat event from the event bus out to this worker's sockets.
+    Runs on the event bus listener thread for writes made by any worker.
+    """
+    group_id = event["group_id"]
+    if not chat_hub.has_subscribers(group_id):
+        return
+    
+    socket_event = {"type": SOCKET_EVENT_TYPES[event["type"]], "group_id": group_id}
+    if event["type"] == "chat.message_deleted":
+        socket_event["message_id"] = event["message_id"]
+    else:
+        db = SessionLocal()
+        try:
+            message = crud_chat.get_message_details(db, event["message_id"])
+        finally:
+            db.close()
+        if message is None:
+            return
+        # Read state is per recipient, so it is not part of the broadcast
+        socket_event["message"] = ChatMessage(**message).model_dump(mode="json", exclude={"is_read"})
+    
+    chat_hub.publish(group_id, socket_event)
+
+
+for _event_type in SOCKET_EVENT_TYPES:
+    event_bus.subscribe(_event_type, push_chat_event)
+
+
+# Close code for sockets whose user lost access to the group
+WS_ACCESS_REVOKED = 4403
+
+
+class AccessRevoked:
+    """
+    Hub event telling a group's sockets that a member was removed, or that
+    everyone lost access (student_id None) because the group was deleted.
+    Handled by the socket loop itself and never sent to clients.
+    """
+    
+    def __init__(self, student_id: Optional[int] = None):
+        self.student_id = student_id
+    
+    def applies_to(self, user_type: str, user_profile_id: int) -> bool:
+        return self.student_id is None or (user_type == "student" and user_profile_id == self.student_id)
+
+
+def revoke_socket_access(event: dict) -> None:
+    """Disconnect this worker's sockets that belong to a removed member or a deleted group"""
+    group_id = event["group_id"]
+    if chat_hub.has_subscribers(group_id):
+        chat_hub.publish(group_id, AccessRevoked(event.get("student_id")))
+
+
+event_bus.subscribe("group.member_removed", revoke_socket_access)
+event_bus.subscribe("group.deleted", revoke_socket_access)
+
+
+def _authorize_socket(token: Optional[str], group_id: int) -> tuple:
+    """
+    Check a socket's token and group access with a short-lived session.
+    Returns (has_access, user_type, user_profile_id) like get_user_access_to_group.
+    """
+    if not token:
+        return (False, None, None)
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        if user is None:
+            return (False, None, None)
+        group = db.query(Group).filter(Group.id == group_id).first()
+        if not group:
+            return (False, None, None)
+        return get_user_access_to_group(db, user, group_id)
+    finally:
+        db.close()
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Consume client frames until the client goes away"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/groups/{group_id}/ws")
+async def group_chat_socket(
+    websocket: WebSocket,
+    group_id: int,
+    token: Optional[str] = None
+):
+    """
+    Push channel for a group chat.
+    Authenticate with the access token as the `token` query parameter.
+    The server sends message.created, message.edited and message.deleted
+    events. Clients that fall too far behind are disconnected with code 1013
+    and should reload history with `after_id` before reconnecting. Members
+    removed from the group, and everyone when it is deleted, are disconnected
+    with code 4403.
+    """
+    # Subscribe before checking access so a removal racing the check is not missed
+    subscription = chat_hub.subscribe(group_id)
+    try:
+        has_access, user_type, user_profile_id = await run_in_threadpool(_authorize_socket, token, group_id)
+    except Exception:
+        chat_hub.unsubscribe(subscription)
+        raise
+    if not has_access:
+        chat_hub.unsubscribe(subscription)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.get())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                break
+            try:
+                event = next_event.result()
+            except SlowConsumerError:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+            if isinstance(event, AccessRevoked):
+                if event.applies_to(user_type, user_profile_id):
+                    await websocket.close(code=WS_ACCESS_REVOKED)
+                    break
+                continue
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_hub.unsubscribe(subscription)
+        disconnected.cancel()
+
+
 @router.post("/groups/{group_id}/messages", response_model=ChatMessage, status_code=status.HTTP_201_CREATED)
 def send_message(
     group_id: int,
@@ -73,7 +240,7 @@ def send_message(
     sender_name = current_user.name
     
     # Mark as read by sender
-    crud_chat.mark_message_as_read(db, message.id, current_user.id)
+    crud_chat.mark_message_as_read(db, group_id, message.id, current_user.id)
     
     # Return properly structured response
     return ChatMessage(
@@ -93,12 +260,41 @@ def send_message(
 @router.get("/groups/{group_id}/messages", response_model=List[ChatMessage])
 def get_group_messages(
     group_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=200),
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all messages for a group"""
+    """
+    Get a page of messages for a group.
+    Returns the newest messages by default. Pass `before_id` (or the
+    `X-Next-Cursor` header of the previous page as `cursor`) to scroll back,
+    or `after_id` to fetch messages newer than one already seen.
+    """
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="Use either before_id or after_id, not both")
+    
+    boundary_created_at = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        boundary = position.pop("created_at", None)
+        if not all(isinstance(value, int) for value in position.values()):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        before_id = position.get("before_id")
+        after_id = position.get("after_id")
+        if boundary is not None:
+            # Timestamp of the boundary message, used to prune partitions
+            try:
+                boundary_created_at = datetime.fromisoformat(boundary)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     # Check group exists
     group = db.query(Group).filter(Group.id == group_id).first()
     if not group:
@@ -113,11 +309,107 @@ def get_group_messages(
         )
     
     # Get messages with sender details
-    messages = crud_chat.get_messages(db, group_id, skip, limit, current_user.id)
+    messages = crud_chat.get_message_history(
+        db, group_id, current_user.id, limit,
+        before_id=before_id,
+        after_id=after_id,
+        before_created_at=boundary_created_at if before_id is not None else None,
+        after_created_at=boundary_created_at if after_id is not None else None
+    )
+    
+    # A full page means there may be more in the same direction
+    if len(messages) == limit:
+        edge = messages[-1] if after_id is not None else messages[0]
+        next_position = {"after_id" if after_id is not None else "before_id": edge["id"]}
+        if edge["created_at"] is not None:
+            next_position["created_at"] = edge["created_at"].isoformat()
+        response.headers["X-Next-Cursor"] = encode_cursor(next_position)
     
     return messages
 
 
+def _load_messages_after(
+    db: Session,
+    user: User,
+    group_id: int,
+    after_id: int,
+    limit: int
+) -> List[dict]:
+    """Check access and load messages newer than after_id, then release the connection"""
+    try:
+        group = db.query(Group).filter(Group.id == group_id).first()
+        if not group:
+            raise HTTPException(status_code=404, detail="Group not found")
+        
+        has_access, _, _ = get_user_access_to_group(db, user, group_id)
+        if not has_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not a member of this group"
+            )
+        
+        return crud_chat.get_message_history(db, group_id, user.id, limit, after_id=after_id)
+    finally:
+        # Never hold a pooled connection while the request is parked
+        db.close()
+
+
+@router.get("/groups/{group_id}/messages/wait", response_model=List[ChatMessage])
+async def wait_for_group_messages(
+    group_id: int,
+    after_id: int,
+    timeout: float = Query(25, ge=0, le=60),
+    limit: int = Query(100, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Long-poll for messages newer than after_id.
+    Returns as soon as a newer message exists, or an empty list when the
+    timeout (in seconds) expires. For clients that cannot hold a WebSocket.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        # Anything signalled up to here is covered by the load below
+        seen = max(after_id, message_signal.latest(group_id))
+        messages = await run_in_threadpool(_load_messages_after, db, current_user, group_id, after_id, limit)
+        if messages:
+            return messages
+        
+        # A wake-up can be for a message that was deleted before the load saw it;
+        # keep waiting for something newer until the deadline instead of
+        # returning an empty page that makes the client poll again at once
+        remaining = deadline - loop.time()
+        if remaining <= 0 or not await message_signal.wait_for_message(group_id, seen, remaining):
+            return []
+
+
+@router.get("/groups/{group_id}/search", response_model=List[ChatSearchResult])
+def search_group_messages(
+    group_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search a group's messages; returns ranked hits with highlighted snippets"""
+    # Check group exists
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
+    # Check user has access to this group
+    has_access, _, _ = get_user_access_to_group(db, current_user, group_id)
+    if not has_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a member of this group"
+        )
+    
+    return crud_chat.search_messages(db, group_id, q, current_user.id, limit)
+
+
 @router.put("/groups/{group_id}/messages/{message_id}", response_model=ChatMessage)
 def update_message(
     group_id: int,
@@ -198,14 +490,25 @@ def mark_message_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mark a message as read"""
+    """
+    Mark a message as read.
+    The mark is buffered and written within CHAT_READ_RECEIPT_FLUSH_SECONDS;
+    until then only this worker counts it, so unread counts served by another
+    worker may briefly include it. Use read-all for an immediate write.
+    """
+    # Check if group exists
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
     # Check access
     has_access, _, _ = get_user_access_to_group(db, current_user, group_id)
     if not has_access:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Mark as read
-    crud_chat.mark_message_as_read(db, message_id, current_user.id)
+    if not crud_chat.mark_message_as_read(db, group_id, message_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Message not found")
     
     return None
 
@@ -217,6 +520,11 @@ def mark_all_messages_read(
     current_user: User = Depends(get_current_user)
 ):
     """Mark all messages in a group as read"""
+    # Check if group exists
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
     # Check access
     has_access, _, _ = get_user_access_to_group(db, current_user, group_id)
     if not has_access:
@@ -234,7 +542,15 @@ def get_unread_count(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get count of unread messages for current user in a group"""
+    """
+    Get count of unread messages for current user in a group.
+    Read marks still buffered by another worker are not counted yet (see mark_message_read).
+    """
+    # Check if group exists
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
     # Check access
     has_access, _, _ = get_user_access_to_group(db, current_user, group_id)
     if not has_access:
@@ -246,4 +562,19 @@ def get_unread_count(
     return UnreadCountResponse(
         group_id=group_id,
         unread_count=count
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/unread-counts", response_model=Dict[int, int])
+def get_unread_counts(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get unread message counts for every group the current user belongs to or mentors"""
+    return crud_chat.get_unread_counts_for_user(db, current_user.id)
+
+
+@router.get("/access-cache/stats")
+def get_access_cache_stats(current_user: User = Depends(get_current_admin)):
+    """Get hit/miss counters for the group access cache of this worker (admin only)"""
+    return group_access_cache.stats()
@@ -1,33 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from app.database import get_db
 from app.schemas.group import (
     Group, GroupCreate, GroupUpdate, GroupInvitation, 
-    GroupInvitationCreate, GroupJoinRequest, GroupJoinRequestCreate, GroupMember
+    GroupInvitationCreate, GroupJoinRequest, GroupJoinRequestCreate, GroupMember, GroupSearchResult,
+    GroupRecommendation, GroupWorkspace
 )
+from app.schemas.student import StudentRecommendation
 from app.schemas.notification import Notification as NotificationSchema, NotificationCreate
 from app.crud import group as crud_group
+from app.crud import chat as crud_chat
+from app.crud import mentorship as crud_mentorship
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.models.group import Group as GroupModel, GroupMember as GroupMemberModel, GroupJoinRequest as GroupJoinRequestModel
 from app.models.student import Student
-from app.models.professor import Professor
-from app.models.notification import Notification
-from app.models.group import group_mentors
+from app.services import notifications as notification_service
+from app.services.recommendations import recommendation_index
+from app.services.access_cache import group_access_cache
 
 router = APIRouter()
 
 
-def create_notification(db: Session, notification: NotificationCreate):
-    """Helper function to create notifications"""
-    db_notification = Notification(**notification.dict())
-    db.add(db_notification)
-    db.commit()
-    db.refresh(db_notification)
-    return db_notification
-
-
 @router.get("/", response_model=List[Group])
 def read_groups(
     skip: int = 0,
@@ -35,37 +30,7 @@ def read_groups(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    groups_data = crud_group.get_groups(db, skip=skip, limit=limit)
-    
-    # Enrich groups with mentor information
-    result = []
-    for group in groups_data:
-        group_dict = {
-            **group.__dict__,
-            "mentors": [],
-            "mentor_count": group.mentor_count or 0
-        }
-        
-        # Fetch mentors if group has any
-        if group.has_mentor:
-            mentor_records = db.execute(
-                group_mentors.select().where(group_mentors.c.group_id == group.id)
-            ).fetchall()
-            
-            for record in mentor_records:
-                professor = db.query(Professor).filter(Professor.id == record.professor_id).first()
-                if professor:
-                    group_dict["mentors"].append({
-                        "id": professor.id,
-                        "name": professor.user.name,
-                        "email": professor.user.email,
-                        "department": professor.department,
-                        "research_areas": professor.research_areas
-                    })
-        
-        result.append(group_dict)
-    
-    return result
+    return crud_group.get_group_cards(db, skip=skip, limit=limit)
 
 
 @router.get("/my-groups", response_model=List[Group])
@@ -79,44 +44,61 @@ def read_my_groups(
     if not student:
         return []
     
-    # Get all group memberships
-    group_members = db.query(GroupMemberModel).filter(
-        GroupMemberModel.student_id == student.id
-    ).all()
-    
-    # Get the actual groups
-    group_ids = [gm.group_id for gm in group_members]
-    groups_data = db.query(GroupModel).filter(GroupModel.id.in_(group_ids)).all()
-    
-    # Enrich groups with mentor information
-    result = []
-    for group in groups_data:
-        group_dict = {
-            **group.__dict__,
-            "mentors": [],
-            "mentor_count": group.mentor_count or 0
-        }
-        
-        # Fetch mentors if group has any
-        if group.has_mentor:
-            mentor_records = db.execute(
-                group_mentors.select().where(group_mentors.c.group_id == group.id)
-            ).fetchall()
-            
-            for record in mentor_records:
-                professor = db.query(Professor).filter(Professor.id == record.professor_id).first()
-                if professor:
-                    group_dict["mentors"].append({
-                        "id": professor.id,
-                        "name": professor.user.name,
-                        "email": professor.user.email,
-                        "department": professor.department,
-                        "research_areas": professor.research_areas
-                    })
-        
-        result.append(group_dict)
+    return crud_group.get_student_group_cards(db, student_id=student.id)
+
+
+# Declared before /{group_id} so "search" is not parsed as a group id
+@router.get("/search", response_model=List[GroupSearchResult])
+def search_groups(
+    skills: Optional[List[str]] = Query(None),
+    open_only: bool = True,
+    has_mentor: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Find groups that need any of `skills` (repeat the parameter for several).
+    By default only groups with free seats are returned. Groups needing more
+    of the current student's skills come first.
+    """
+    student_skills = db.query(Student.skills).filter(Student.user_id == current_user.id).scalar()
+    return crud_group.search_group_cards(
+        db,
+        skills=skills,
+        student_skills=student_skills,
+        open_only=open_only,
+        has_mentor=has_mentor,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/recommended", response_model=List[GroupRecommendation])
+def recommend_groups(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Open groups the current student is not in, best fit first"""
+    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    if not student:
+        return []
     
-    return result
+    member_of = [
+        group_id for group_id, in db.query(GroupMemberModel.group_id).filter(
+            GroupMemberModel.student_id == student.id
+        ).all()
+    ]
+    ranked = recommendation_index.recommend_groups(student.id, exclude_group_ids=member_of, limit=limit)
+    
+    cards = crud_group.get_group_cards_by_ids(db, [group_id for group_id, _, _ in ranked])
+    scores = {group_id: (score, skill_match) for group_id, score, skill_match in ranked}
+    return [
+        {**card, "score": scores[card["id"]][0], "skill_match": scores[card["id"]][1]}
+        for card in cards
+    ]
 
 
 @router.get("/{group_id}", response_model=Group)
@@ -125,35 +107,52 @@ def read_group(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    group_card = crud_group.get_group_card(db, group_id=group_id)
+    if group_card is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
+    return group_card
+
+
+@router.get("/{group_id}/recommended-students", response_model=List[StudentRecommendation])
+def recommend_students(
+    group_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Students looking for a group who best fit this one (group leader only)"""
     db_group = crud_group.get_group(db, group_id=group_id)
     if db_group is None:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    # Add mentor information
-    group_dict = {
-        **db_group.__dict__,
-        "mentors": [],
-        "mentor_count": db_group.mentor_count or 0
+    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    if not student or db_group.leader_id != student.id:
+        raise HTTPException(status_code=403, detail="Only the group leader can see recommended students")
+    
+    members = [
+        student_id for student_id, in db.query(GroupMemberModel.student_id).filter(
+            GroupMemberModel.group_id == group_id
+        ).all()
+    ]
+    ranked = recommendation_index.recommend_students(group_id, exclude_student_ids=members, limit=limit)
+    
+    students = {
+        candidate.id: candidate
+        for candidate in db.query(Student).options(joinedload(Student.user)).filter(
+            Student.id.in_([student_id for student_id, _, _ in ranked])
+        ).all()
     }
-    
-    # Fetch mentors if group has any
-    if db_group.has_mentor:
-        mentor_records = db.execute(
-            group_mentors.select().where(group_mentors.c.group_id == group_id)
-        ).fetchall()
-        
-        for record in mentor_records:
-            professor = db.query(Professor).filter(Professor.id == record.professor_id).first()
-            if professor:
-                group_dict["mentors"].append({
-                    "id": professor.id,
-                    "name": professor.user.name,
-                    "email": professor.user.email,
-                    "department": professor.department,
-                    "research_areas": professor.research_areas
-                })
-    
-    return group_dict
+    return [
+        {
+            **students[student_id].__dict__,
+            "name": students[student_id].user.name,
+            "email": students[student_id].user.email,
+            "score": score,
+            "skill_match": skill_match
+        }
+        for student_id, score, skill_match in ranked if student_id in students
+    ]
 
 
 @router.get("/{group_id}/members", response_model=List[GroupMember])
@@ -171,6 +170,50 @@ def read_group_members(
     return members
 
 
+@router.get("/{group_id}/workspace", response_model=GroupWorkspace)
+def read_group_workspace(
+    group_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The group, its members, the current user's chat unread count and, for
+    the leader, pending join and mentorship requests, in one call.
+    Applies the same rules as the individual endpoints.
+    """
+    access_version = group_access_cache.version()
+    db_group = crud_group.get_group_with_mentors(db, group_id=group_id)
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
+    members = db.query(GroupMemberModel).filter(GroupMemberModel.group_id == group_id).all()
+    student_id = db.query(Student.id).filter(Student.user_id == current_user.id).scalar()
+    is_leader = student_id is not None and student_id == db_group.leader_id
+    
+    # Chat access from what is already loaded: a member student or a mentoring professor
+    mentor = next((professor for professor in db_group.mentors if professor.user_id == current_user.id), None)
+    if student_id is not None and any(member.student_id == student_id for member in members):
+        access = (True, "student", student_id)
+    elif mentor is not None:
+        access = (True, "professor", mentor.id)
+    else:
+        access = (False, None, None)
+    group_access_cache.set(current_user.id, group_id, access, access_version)
+    
+    workspace = {
+        "group": crud_group.group_card(db_group),
+        "members": members,
+        "is_leader": is_leader,
+    }
+    if access[0]:
+        workspace["chat_unread_count"] = crud_chat.get_unread_count(db, group_id, current_user.id)
+    if is_leader:
+        workspace["join_requests"] = crud_group.get_join_requests_for_group(db, group_id=group_id)
+    if is_leader or current_user.role == UserRole.ADMIN:
+        workspace["mentorship_requests"] = crud_mentorship.get_mentorship_requests_for_group(db, group_id)
+    return workspace
+
+
 @router.post("/", response_model=Group, status_code=status.HTTP_201_CREATED)
 def create_group(
     group: GroupCreate,
@@ -327,25 +370,25 @@ def create_invitation(
             detail="This student already has a pending invitation to this group"
         )
     
-    result = crud_group.create_invitation(db=db, invitation=invitation)
+    result = crud_group.create_invitation(db=db, invitation=invitation, commit=False)
     
-    # Create notification for invited student
+    # Create notification for invited student, committed together with the invitation
     invited_student = db.query(Student).filter(Student.id == invitation.student_id).first()
     if invited_student:
-        group = crud_group.get_group(db, invitation.group_id)
-        create_notification(
+        notification_service.enqueue(
             db,
             NotificationCreate(
                 user_id=invited_student.user_id,
                 type="group_invitation",
-                title="Group Invitation",
-                message=f"You've been invited to join {group.name if group else 'a group'}",
+                template_id="group_invitation",
                 related_group_id=invitation.group_id,
                 related_student_id=invited_student.id,
                 related_request_id=result.id,
                 link=f"/student/groups/{invitation.group_id}"
             )
         )
+    db.commit()
+    db.refresh(result)
     
     return result
 
@@ -374,32 +417,41 @@ def update_invitation(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    invitation = crud_group.update_invitation_status(db, invitation_id=invitation_id, status=status)
-    if invitation is None:
+    if crud_group.get_invitation(db, invitation_id) is None:
         raise HTTPException(status_code=404, detail="Invitation not found")
+    invitation = crud_group.update_invitation_status(db, invitation_id=invitation_id, status=status, commit=False)
+    if invitation is None:
+        raise HTTPException(status_code=400, detail="This invitation has already been answered")
+    group_id = invitation.group_id
     
     # If accepted, add student to group
     if status == "accepted":
-        crud_group.add_group_member(db, group_id=invitation.group_id, student_id=invitation.student_id)
+        if crud_group.add_group_member(db, group_id=group_id, student_id=invitation.student_id, commit=False) is None:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Group is full")
     
-    # Notify group leader about response
-    group = crud_group.get_group(db, invitation.group_id)
+    # Notify group leader about response, in the same transaction
+    group = crud_group.get_group(db, group_id)
     if group:
         leader_student = db.query(Student).filter(Student.id == group.leader_id).first()
         if leader_student:
             student = db.query(Student).filter(Student.id == invitation.student_id).first()
             if student:
-                create_notification(
+                notification_service.enqueue(
                     db,
                     NotificationCreate(
                         user_id=leader_student.user_id,
                         type=f"invitation_{status}",
-                        title=f"Invitation {status.capitalize()}",
-                        message=f"{student.user.name} has {status} your invitation to {group.name}",
+                        template_id="invitation_response",
+                        params={"status": status},
                         related_group_id=group.id,
+                        related_student_id=student.id,
                         link=f"/student/mygroups"
                     )
                 )
+    db.commit()
+    if status == "accepted":
+        group_access_cache.invalidate_group(group_id)
     
     return {"message": f"Invitation {status}"}
 
@@ -439,26 +491,27 @@ def create_join_request(
     if existing_request:
         raise HTTPException(status_code=400, detail="You already have a pending join request for this group")
     
-    result = crud_group.create_join_request(db=db, join_request=join_request)
+    result = crud_group.create_join_request(db=db, join_request=join_request, commit=False)
     
-    # Create notification for group leader
+    # Create notification for group leader, committed together with the request
     leader_student = db.query(Student).filter(Student.id == group.leader_id).first()
     requesting_student = db.query(Student).filter(Student.id == join_request.student_id).first()
     
     if leader_student and requesting_student:
-        create_notification(
+        notification_service.enqueue(
             db,
             NotificationCreate(
                 user_id=leader_student.user_id,
                 type="join_request",
-                title="New Join Request",
-                message=f"{requesting_student.user.name} wants to join {group.name}",
+                template_id="join_request",
                 related_group_id=group.id,
                 related_student_id=requesting_student.id,
                 related_request_id=result.id,
                 link=f"/student/mygroups"
             )
         )
+    db.commit()
+    db.refresh(result)
     
     return result
 
@@ -492,29 +545,37 @@ def update_join_request(
     current_user: User = Depends(get_current_user)
 ):
     """Update a join request status (accept/reject)"""
-    join_request = crud_group.update_join_request_status(db, request_id=request_id, status=status)
-    if not join_request:
+    if crud_group.get_join_request(db, request_id) is None:
         raise HTTPException(status_code=404, detail="Join request not found")
+    join_request = crud_group.update_join_request_status(db, request_id=request_id, status=status, commit=False)
+    if not join_request:
+        raise HTTPException(status_code=400, detail="This join request has already been answered")
+    group_id = join_request.group_id
     
     # If accepted, add student to group
     if status == "accepted":
-        crud_group.add_group_member(db, group_id=join_request.group_id, student_id=join_request.student_id)
+        if crud_group.add_group_member(db, group_id=group_id, student_id=join_request.student_id, commit=False) is None:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Group is full")
     
-    # Notify requesting student about the decision
+    # Notify requesting student about the decision, in the same transaction
     requesting_student = db.query(Student).filter(Student.id == join_request.student_id).first()
-    group = crud_group.get_group(db, join_request.group_id)
+    group = crud_group.get_group(db, group_id)
     
     if requesting_student and group:
-        create_notification(
+        notification_service.enqueue(
             db,
             NotificationCreate(
                 user_id=requesting_student.user_id,
                 type=f"join_request_{status}",
-                title=f"Join Request {status.capitalize()}",
-                message=f"Your request to join {group.name} has been {status}",
+                template_id="join_request_response",
+                params={"status": status},
                 related_group_id=group.id,
                 link=f"/student/groups/{group.id}" if status == "accepted" else None
             )
         )
+    db.commit()
+    if status == "accepted":
+        group_access_cache.invalidate_group(group_id)
     
     return {"message": f"Join request {status}"}
\ No newline at end of file
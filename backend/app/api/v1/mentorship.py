@@ -15,21 +15,13 @@ from app.models.user import User
 from app.models.student import Student
 from app.models.professor import Professor
 from app.models.group import Group, group_mentors
-from app.models.notification import Notification
+from app.services import notifications as notification_service
+from app.services.access_cache import group_access_cache
 from datetime import datetime
 
 router = APIRouter()
 
 
-def create_notification(db: Session, notification: NotificationCreate):
-    """Helper function to create notifications"""
-    db_notification = Notification(**notification.dict())
-    db.add(db_notification)
-    db.commit()
-    db.refresh(db_notification)
-    return db_notification
-
-
 @router.post("/", response_model=MentorshipRequest, status_code=status.HTTP_201_CREATED)
 def create_mentorship_request(
     request_data: MentorshipRequestCreate,
@@ -111,22 +103,23 @@ def create_mentorship_request(
         )
     
     # Create the mentorship request
-    db_request = crud_mentorship.create_mentorship_request(db, request_data)
+    db_request = crud_mentorship.create_mentorship_request(db, request_data, commit=False)
     
-    # Create notification for the professor
-    create_notification(
+    # Create notification for the professor, committed together with the request
+    notification_service.enqueue(
         db,
         NotificationCreate(
             user_id=professor.user_id,
             type="mentorship_request",
-            title="New Mentorship Request",
-            message=f"{student.user.name} has requested you to mentor their group '{group.name}'",
+            template_id="mentorship_request",
             related_group_id=group.id,
             related_student_id=student.id,
             related_request_id=db_request.id,
             link=f"/professor/mentorship-requests"
         )
     )
+    db.commit()
+    db.refresh(db_request)
     
     return db_request
 
@@ -182,7 +175,7 @@ def get_professor_mentorship_requests(
             )
     
     requests = crud_mentorship.get_mentorship_requests_for_professor(db, professor_id, request_status)
-
+    
     
     # Build detailed response
     result = []
@@ -281,74 +274,64 @@ def update_mentorship_request(
             detail="Rejection reason is required when rejecting a request"
         )
     
-    # If accepting, perform additional checks and updates
+    # Claim the request: of two concurrent answers only one gets it, and
+    # everything below commits or rolls back together with the claim
+    updated_request = crud_mentorship.update_mentorship_request_status(
+        db, request_id, update_data.status, update_data.rejection_reason, commit=False
+    )
+    if updated_request is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This request has already been answered"
+        )
+    
+    # If accepting, take a mentor seat in the group and one of the professor's slots
     if update_data.status == 'accepted':
-        # Check if professor has available slots
-        if professor.available_slots <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You have no available mentorship slots"
-            )
-        
-        # Check if group already has 2 mentors
-        group = mentorship_request.group
-        mentor_count = db.query(group_mentors).filter(
-            group_mentors.c.group_id == group.id
-        ).count()
-        
-        if mentor_count >= 2:
+        try:
+            mentor_count = crud_mentorship.assign_mentor(db, mentorship_request.group_id, professor.id, commit=False)
+        except ValueError as e:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This group already has the maximum number of mentors (2)"
+                detail=str(e)
             )
         
-        # Add professor as mentor to the group
-        stmt = group_mentors.insert().values(
-            group_id=group.id,
-            professor_id=professor.id
-        )
-        db.execute(stmt)
-        
-        # Update group mentor status
-        group.has_mentor = True
-        group.mentor_count = mentor_count + 1
-        
-        # Decrement professor's available slots
-        professor.available_slots -= 1
-        
         # If group now has 2 mentors, reject all other pending requests
-        if group.mentor_count >= 2:
-            crud_mentorship.reject_other_pending_requests_for_group(db, group.id, request_id)
-    
-    # Update the request status
-    updated_request = crud_mentorship.update_mentorship_request_status(
-        db, request_id, update_data.status, update_data.rejection_reason
-    )
+        if mentor_count >= crud_mentorship.MAX_MENTORS_PER_GROUP:
+            crud_mentorship.reject_other_pending_requests_for_group(
+                db, mentorship_request.group_id, request_id, commit=False
+            )
     
     # Create notification for the student who requested
     requester = mentorship_request.requester
     group = mentorship_request.group
     
     if update_data.status == 'accepted':
-        notification_message = f"Professor {professor.user.name} has accepted your mentorship request for '{group.name}'"
+        notification_status = "accepted"
         notification_type = "mentorship_accepted"
     else:
-        notification_message = f"Professor {professor.user.name} has declined your mentorship request for '{group.name}'"
+        notification_status = "declined"
         notification_type = "mentorship_rejected"
     
-    create_notification(
+    notification_service.enqueue(
         db,
         NotificationCreate(
             user_id=requester.user_id,
             type=notification_type,
-            title=f"Mentorship Request {update_data.status.capitalize()}",
-            message=notification_message,
+            template_id="mentorship_response",
+            params={"status": notification_status, "professor_id": professor.id},
             related_group_id=group.id,
             related_request_id=request_id,
             link=f"/student/groups/{group.id}" if update_data.status == 'accepted' else None
         )
     )
+    db.commit()
+    
+    # The new mentor gains chat access to the group
+    if update_data.status == 'accepted':
+        group_access_cache.invalidate_group(mentorship_request.group_id)
     
+    db.refresh(updated_request)
     return updated_request
 
 
@@ -1,27 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas.notification import Notification, NotificationMarkRead, GroupJoinRequestAction, GroupInvitationAction
-from app.models.notification import Notification as NotificationModel
+from typing import List, Optional, Tuple
+from datetime import datetime
+from app.config import settings
+from app.database import get_db, SessionLocal
+from app.schemas.notification import (
+    Notification, NotificationCreate, NotificationMarkRead, NotificationPreferences, NotificationPreferencesResponse,
+    GroupJoinRequestAction, GroupInvitationAction, Announcement, AnnouncementCreate, AnnouncementMarkSeen
+)
+from app.models.notification import Announcement as AnnouncementModel, Notification as NotificationModel, NotificationCounter
 from app.models.group import GroupJoinRequest as GroupJoinRequestModel, GroupMember, GroupInvitation
 from app.models.student import Student
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_admin, get_user_from_token
 from app.models.user import User
 from app.crud import group as crud_group
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services import event_bus
+from app.services import notifications as notification_service
+from app.services import announcements as announcement_service
+from app.services import notification_preferences
+from app.services.notification_templates import render_notifications
+from app.services.access_cache import group_access_cache
+from app.services.hub import notification_hub, SlowConsumerError
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Notification])
 def get_my_notifications(
+    response: Response,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
     unread_only: bool = False,
+    before: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get notifications for current user"""
+    """
+    Get notifications for current user, newest first, with the announcements
+    addressed to them merged in (`source` tells the two apart).
+    Pass the `X-Next-Cursor` header of the previous page as `before` to get
+    the next page; unlike `skip`, this costs the same at any depth.
+    """
     query = db.query(NotificationModel).filter(
         NotificationModel.user_id == current_user.id
     )
@@ -29,11 +54,72 @@ def get_my_notifications(
     if unread_only:
         query = query.filter(NotificationModel.read == False)
     
+    # The cursor keeps a position in each source: the last notification and the
+    # last announcement shown. A missing position means that source has not been
+    # reached yet; cursors from before announcements only carry the first one.
+    notification_before = announcement_before = None
+    if before:
+        try:
+            position = decode_cursor(before)
+            if position.get("id") is not None:
+                notification_before = (datetime.fromisoformat(position["created_at"]), int(position["id"]))
+            if "announcement" not in position:
+                announcement_before = (notification_before[0], 0) if notification_before else None
+            elif position["announcement"] is not None:
+                announcement_before = (
+                    datetime.fromisoformat(position["announcement"]["created_at"]),
+                    int(position["announcement"]["id"])
+                )
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if notification_before is not None:
+            query = query.filter(
+                tuple_(NotificationModel.created_at, NotificationModel.id) < tuple_(*notification_before)
+            )
+    
+    # Each source is read up to a full page and the two are merged in memory
+    offset = skip if skip and not before else 0
     notifications = query.order_by(
-        NotificationModel.created_at.desc()
-    ).offset(skip).limit(limit).all()
+        NotificationModel.created_at.desc(),
+        NotificationModel.id.desc()
+    ).limit(offset + limit).all()
+    
+    audience = announcement_service.audience_filter(db, current_user)
+    _, last_seen = announcement_service.get_counter(db, current_user.id)
+    announcements = announcement_service.get_feed_page(
+        db, audience, last_seen, offset + limit,
+        before=announcement_before, unread_only=unread_only
+    )
+    
+    # Stable sort keeps each source's own (created_at, id) order among equal timestamps
+    page = sorted(notifications + announcements, key=lambda item: item.created_at, reverse=True)
+    page = page[offset:offset + limit]
+    
+    # A full page means there may be older notifications
+    if len(page) == limit:
+        last_notification = next((item for item in reversed(page) if isinstance(item, NotificationModel)), None)
+        last_announcement = next((item for item in reversed(page) if isinstance(item, AnnouncementModel)), None)
+        notification_position = (
+            (last_notification.created_at, last_notification.id) if last_notification else notification_before
+        )
+        announcement_position = (
+            (last_announcement.created_at, last_announcement.id) if last_announcement else announcement_before
+        )
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "created_at": notification_position[0].isoformat() if notification_position else None,
+            "id": notification_position[1] if notification_position else None,
+            "announcement": {
+                "created_at": announcement_position[0].isoformat(),
+                "id": announcement_position[1]
+            } if announcement_position else None
+        })
     
-    return notifications
+    rendered = iter(render_notifications(db, [item for item in page if isinstance(item, NotificationModel)]))
+    return [
+        next(rendered) if isinstance(item, NotificationModel)
+        else announcement_service.as_notification(item, current_user.id, last_seen)
+        for item in page
+    ]
 
 
 @router.get("/unread-count")
@@ -41,13 +127,251 @@ def get_unread_count(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get count of unread notifications"""
-    count = db.query(NotificationModel).filter(
-        NotificationModel.user_id == current_user.id,
-        NotificationModel.read == False
-    ).count()
+    """Get count of unread notifications, including unseen announcements"""
+    # Trigger-maintained counter; users without any notification yet have no row
+    count, last_seen = announcement_service.get_counter(db, current_user.id)
+    audience = announcement_service.audience_filter(db, current_user)
+    
+    return {"count": count + announcement_service.count_unseen(db, audience, last_seen)}
+
+
+def push_notification_event(event: dict) -> None:
+    """
+    Forward newly delivered notifications to this worker's streams.
+    Runs on the event bus listener thread for batches delivered by any worker.
+    """
+    user_ids = [user_id for user_id in event["user_ids"] if notification_hub.has_subscribers(user_id)]
+    if not user_ids:
+        return
+    
+    db = SessionLocal()
+    try:
+        rows = db.query(NotificationModel).filter(
+            NotificationModel.id.in_(event["ids"]),
+            NotificationModel.user_id.in_(user_ids)
+        ).order_by(NotificationModel.id).all()
+        notifications = render_notifications(db, rows)
+    finally:
+        db.close()
     
-    return {"count": count}
+    # Coalesced notifications are existing rows that absorbed another occurrence
+    coalesced_ids = set(event.get("coalesced_ids", ()))
+    for notification in notifications:
+        kind = "notification_updated" if notification["id"] in coalesced_ids else "notification"
+        notification_hub.publish(notification["user_id"], (kind, notification))
+
+
+event_bus.subscribe("notification.created", push_notification_event)
+
+
+def push_announcement_event(event: dict) -> None:
+    """Forward a new announcement to this worker's streams in its audience"""
+    user_ids = notification_hub.subscribed_keys()
+    if not user_ids:
+        return
+    
+    db = SessionLocal()
+    try:
+        announcement = db.query(AnnouncementModel).filter(AnnouncementModel.id == event["id"]).first()
+        if announcement is None:
+            return
+        recipients = announcement_service.audience_user_ids(db, announcement, user_ids)
+    finally:
+        db.close()
+    
+    for user_id in recipients:
+        notification_hub.publish(user_id, ("announcement", announcement_service.as_notification(announcement, user_id, 0)))
+
+
+event_bus.subscribe("announcement.created", push_announcement_event)
+
+
+def _authenticate_stream(token: Optional[str]) -> Optional[int]:
+    """Resolve a stream's token to a user id with a short-lived session"""
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        return user.id if user else None
+    finally:
+        db.close()
+
+
+def _load_stream_backlog(user_id: int, last_event_id: Optional[int]) -> Tuple[int, int, List[dict]]:
+    """
+    Load what a (re)connecting stream needs: the unread count, the id of the
+    newest notification it accounts for, and the notifications missed since
+    last_event_id (at most NOTIFICATION_STREAM_REPLAY_LIMIT, newest kept).
+    """
+    db = SessionLocal()
+    try:
+        # One statement, so the count and the newest id come from the same snapshot
+        unread_count, newest_id = db.query(
+            db.query(NotificationCounter.unread_count).filter(
+                NotificationCounter.user_id == user_id
+            ).scalar_subquery(),
+            db.query(func.max(NotificationModel.id)).filter(
+                NotificationModel.user_id == user_id
+            ).scalar_subquery()
+        ).one()
+        
+        user = db.query(User).filter(User.id == user_id).first()
+        _, last_seen = announcement_service.get_counter(db, user_id)
+        unread_count = (unread_count or 0) + announcement_service.count_unseen(
+            db, announcement_service.audience_filter(db, user), last_seen
+        )
+        
+        missed = []
+        if last_event_id is not None:
+            rows = db.query(NotificationModel).filter(
+                NotificationModel.user_id == user_id,
+                NotificationModel.id > last_event_id
+            ).order_by(NotificationModel.id.desc()).limit(settings.NOTIFICATION_STREAM_REPLAY_LIMIT).all()
+            missed = render_notifications(db, reversed(rows))
+        
+        return unread_count, newest_id or 0, missed
+    finally:
+        db.close()
+
+
+def _format_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Event"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    token: Optional[str] = None,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events stream of the current user's notifications.
+    Authenticate with the access token as the `token` query parameter.
+    Sends an `unread_count` event on connect, then a `notification` event
+    (with the notification id as event id) for every new notification, a
+    `notification_updated` event when a repeat is merged into an unread
+    notification, an `announcement` event for new announcements addressed to
+    the user, and heartbeat comments in between. On reconnect the browser sends
+    Last-Event-ID and the missed notifications are replayed first.
+    """
+    user_id = await run_in_threadpool(_authenticate_stream, token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    # Subscribe before reading the backlog so nothing delivered in between is lost
+    subscription = notification_hub.subscribe(user_id)
+    try:
+        unread_count, newest_id, missed = await run_in_threadpool(_load_stream_backlog, user_id, last_event_id)
+    except Exception:
+        notification_hub.unsubscribe(subscription)
+        raise
+    
+    async def events():
+        # Live events up to this id are already covered by the count or the replay.
+        # Dispatchers commit notification ids in increasing order, so nothing with
+        # a lower id can still arrive once an id has been seen.
+        last_sent_id = max(newest_id, last_event_id or 0)
+        try:
+            yield _format_event("unread_count", {"count": unread_count})
+            for notification in missed:
+                yield _format_event("notification", notification, notification["id"])
+            
+            while True:
+                try:
+                    kind, notification = await asyncio.wait_for(
+                        subscription.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                except SlowConsumerError:
+                    # End the stream; the client reconnects with Last-Event-ID and catches up
+                    break
+                if kind != "notification":
+                    # An older row changed in place, or an announcement (whose feed
+                    # ids are negative); neither carries an event id, so the client's
+                    # Last-Event-ID position is not moved
+                    yield _format_event(kind, notification)
+                    continue
+                if notification["id"] <= last_sent_id:
+                    continue
+                last_sent_id = notification["id"]
+                yield _format_event(kind, notification, notification["id"])
+        finally:
+            notification_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/preferences", response_model=NotificationPreferencesResponse)
+def get_notification_preferences(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the notification types the current user has muted"""
+    mask = notification_preferences.get_muted_mask(db, current_user.id)
+    return {
+        "muted_types": notification_preferences.types_from_mask(mask),
+        "available_types": list(notification_preferences.NOTIFICATION_TYPES)
+    }
+
+
+@router.put("/preferences", response_model=NotificationPreferencesResponse)
+def update_notification_preferences(
+    preferences: NotificationPreferences,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Replace the set of notification types the current user has muted"""
+    try:
+        muted_types = notification_preferences.set_muted_types(db, current_user, preferences.muted_types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "muted_types": muted_types,
+        "available_types": list(notification_preferences.NOTIFICATION_TYPES)
+    }
+
+
+@router.post("/announcements", response_model=Announcement, status_code=status.HTTP_201_CREATED)
+def create_announcement(
+    announcement: AnnouncementCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Broadcast an announcement to every user matching its targets (admin only)"""
+    return announcement_service.create_announcement(db, announcement, created_by=current_user.id)
+
+
+@router.put("/announcements/mark-seen")
+def mark_announcements_seen(
+    data: AnnouncementMarkSeen,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark announcements up to the given one (or all of them) as seen"""
+    last_seen = announcement_service.mark_seen(db, current_user.id, data.announcement_id)
+    return {"message": "Announcements marked as seen", "last_seen_announcement_id": last_seen}
+
+
+@router.get("/outbox/stats")
+def get_outbox_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Get the notification outbox queue depth and this worker's delivery counters (admin only)"""
+    return notification_service.get_outbox_stats(db)
 
 
 @router.put("/mark-read")
@@ -56,13 +380,14 @@ def mark_notifications_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mark notifications as read"""
+    """Mark notifications as read; announcement ids in the list mark announcements seen"""
     db.query(NotificationModel).filter(
         NotificationModel.id.in_(data.notification_ids),
         NotificationModel.user_id == current_user.id
     ).update({"read": True}, synchronize_session=False)
     
     db.commit()
+    announcement_service.mark_feed_entries_seen(db, current_user, data.notification_ids)
     
     return {"message": "Notifications marked as read"}
 
@@ -73,7 +398,12 @@ def mark_notification_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mark a single notification as read"""
+    """Mark a single notification (or an announcement, by its feed id) as read"""
+    if announcement_service.is_feed_id(notification_id):
+        if not announcement_service.mark_feed_entries_seen(db, current_user, [notification_id]):
+            raise HTTPException(status_code=404, detail="Announcement not found")
+        return {"message": "Announcement marked as seen"}
+    
     notification = db.query(NotificationModel).filter(
         NotificationModel.id == notification_id,
         NotificationModel.user_id == current_user.id
@@ -95,6 +425,9 @@ def delete_notification(
     current_user: User = Depends(get_current_user)
 ):
     """Delete a notification"""
+    if announcement_service.is_feed_id(notification_id):
+        raise HTTPException(status_code=400, detail="Announcements cannot be deleted; mark them as read instead")
+    
     notification = db.query(NotificationModel).filter(
         NotificationModel.id == notification_id,
         NotificationModel.user_id == current_user.id
@@ -115,12 +448,16 @@ def handle_group_join_request(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Accept or reject a group join request from notification"""
-    # Get the notification
+    """
+    Accept or reject a group join request from notification. A notification
+    may stand for several requests (see request_ids); the one given as
+    request_id is answered, or else the oldest still pending.
+    """
+    # Get the notification, locked so answers to its requests take turns
     notification = db.query(NotificationModel).filter(
         NotificationModel.id == data.notification_id,
         NotificationModel.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -128,9 +465,18 @@ def handle_group_join_request(
     if notification.type != "join_request":
         raise HTTPException(status_code=400, detail="Notification is not a group join request")
     
-    # Get the join request using related_request_id
+    # Get the join request from the ones the notification stands for
+    request_ids = notification.request_ids or [notification.related_request_id]
+    if data.request_id is not None:
+        if data.request_id not in request_ids:
+            raise HTTPException(status_code=404, detail="Join request not found")
+        request_ids = [data.request_id]
     join_request = db.query(GroupJoinRequestModel).filter(
-        GroupJoinRequestModel.id == notification.related_request_id
+        GroupJoinRequestModel.id.in_(request_ids)
+    ).order_by(
+        # The oldest pending one first
+        GroupJoinRequestModel.status != "pending",
+        GroupJoinRequestModel.id
     ).first()
     
     if not join_request:
@@ -145,6 +491,14 @@ def handle_group_join_request(
             raise HTTPException(status_code=403, detail="Only the group leader can accept/reject join requests")
     
     if data.action.lower() == "accept":
+        # Claim the request, then a seat, in one transaction: of two concurrent
+        # accepts only one gets the request, and a full group undoes the claim
+        if crud_group.update_join_request_status(db, join_request.id, "accepted", commit=False) is None:
+            raise HTTPException(status_code=400, detail="This join request has already been answered")
+        if not crud_group.claim_member_slot(db, join_request.group_id):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Group is full")
+        
         # Add student to group
         member = GroupMember(
             group_id=join_request.group_id,
@@ -153,55 +507,55 @@ def handle_group_join_request(
         )
         db.add(member)
         
-        # Update group member count
-        group.current_members += 1
-        
-        # Update join request status
-        join_request.status = "accepted"
+        # Point the notification at the requests still pending, or mark it read
+        notification_service.settle_join_request_notification(db, notification)
         
-        # Mark notification as read
-        notification.read = True
-        
-        db.commit()
+        event_bus.emit(db, "group.member_added", group_id=join_request.group_id, student_id=join_request.student_id)
         
-        # Create notification for the student who requested to join
+        # Notify the student who requested to join, in the same transaction
         requesting_student = db.query(Student).filter(Student.id == join_request.student_id).first()
         if requesting_student:
-            acceptance_notification = NotificationModel(
-                user_id=requesting_student.user_id,
-                type="join_request_accepted",
-                title="Join Request Accepted",
-                message=f"Your request to join {group.name} has been accepted",
-                related_group_id=group.id,
-                link=f"/student/groups/{group.id}"
+            notification_service.enqueue(
+                db,
+                NotificationCreate(
+                    user_id=requesting_student.user_id,
+                    type="join_request_accepted",
+                    template_id="join_request_response",
+                    params={"status": "accepted"},
+                    related_group_id=group.id,
+                    link=f"/student/groups/{group.id}"
+                )
             )
-            db.add(acceptance_notification)
-            db.commit()
+        
+        db.commit()
+        group_access_cache.invalidate_group(join_request.group_id)
         
         return {"message": "Join request accepted", "status": "accepted"}
     
     elif data.action.lower() == "reject":
-        # Update join request status
-        join_request.status = "rejected"
+        # Update join request status, unless it was answered in the meantime
+        if crud_group.update_join_request_status(db, join_request.id, "rejected", commit=False) is None:
+            raise HTTPException(status_code=400, detail="This join request has already been answered")
         
-        # Mark notification as read
-        notification.read = True
+        # Point the notification at the requests still pending, or mark it read
+        notification_service.settle_join_request_notification(db, notification)
         
-        db.commit()
-        
-        # Create notification for the student who requested to join
+        # Notify the student who requested to join, in the same transaction
         requesting_student = db.query(Student).filter(Student.id == join_request.student_id).first()
         if requesting_student:
-            rejection_notification = NotificationModel(
-                user_id=requesting_student.user_id,
-                type="join_request_rejected",
-                title="Join Request Rejected",
-                message=f"Your request to join {group.name} has been rejected",
-                related_group_id=group.id,
-                link=None
+            notification_service.enqueue(
+                db,
+                NotificationCreate(
+                    user_id=requesting_student.user_id,
+                    type="join_request_rejected",
+                    template_id="join_request_response",
+                    params={"status": "rejected"},
+                    related_group_id=group.id,
+                    link=None
+                )
             )
-            db.add(rejection_notification)
-            db.commit()
+        
+        db.commit()
         
         return {"message": "Join request rejected", "status": "rejected"}
     
@@ -244,6 +598,14 @@ def handle_group_invitation(
     group = invitation.group if hasattr(invitation, 'group') else crud_group.get_group(db, invitation.group_id)
     
     if data.action.lower() == "accept":
+        # Claim the invitation, then a seat, in one transaction: of two concurrent
+        # accepts only one gets the invitation, and a full group undoes the claim
+        if crud_group.update_invitation_status(db, invitation.id, "accepted", commit=False) is None:
+            raise HTTPException(status_code=400, detail="This invitation has already been answered")
+        if not crud_group.claim_member_slot(db, invitation.group_id):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Group is full")
+        
         # Add student to group
         member = GroupMember(
             group_id=invitation.group_id,
@@ -252,58 +614,57 @@ def handle_group_invitation(
         )
         db.add(member)
         
-        # Update group member count
-        if group:
-            group.current_members += 1
-        
-        # Update invitation status
-        invitation.status = "accepted"
-        
         # Mark notification as read
         notification.read = True
         
-        db.commit()
+        event_bus.emit(db, "group.member_added", group_id=invitation.group_id, student_id=invitation.student_id)
         
-        # Create notification for the group leader
+        # Notify the group leader, in the same transaction
         leader_student = db.query(Student).filter(Student.id == group.leader_id).first()
         if leader_student:
-            acceptance_notification = NotificationModel(
-                user_id=leader_student.user_id,
-                type="invitation_accepted",
-                title="Invitation Accepted",
-                message=f"{student.user.name} has accepted your invitation to join {group.name}",
-                related_group_id=group.id,
-                related_student_id=student.id,
-                link=f"/student/mygroups"
+            notification_service.enqueue(
+                db,
+                NotificationCreate(
+                    user_id=leader_student.user_id,
+                    type="invitation_accepted",
+                    template_id="invitation_response",
+                    params={"status": "accepted"},
+                    related_group_id=group.id,
+                    related_student_id=student.id,
+                    link=f"/student/mygroups"
+                )
             )
-            db.add(acceptance_notification)
-            db.commit()
+        
+        db.commit()
+        group_access_cache.invalidate_group(invitation.group_id)
         
         return {"message": "Invitation accepted", "status": "accepted"}
     
     elif data.action.lower() == "reject":
-        # Update invitation status
-        invitation.status = "rejected"
+        # Update invitation status, unless it was answered in the meantime
+        if crud_group.update_invitation_status(db, invitation.id, "rejected", commit=False) is None:
+            raise HTTPException(status_code=400, detail="This invitation has already been answered")
         
         # Mark notification as read
         notification.read = True
         
-        db.commit()
-        
-        # Create notification for the group leader
+        # Notify the group leader, in the same transaction
         leader_student = db.query(Student).filter(Student.id == group.leader_id).first()
         if leader_student:
-            rejection_notification = NotificationModel(
-                user_id=leader_student.user_id,
-                type="invitation_rejected",
-                title="Invitation Rejected",
-                message=f"{student.user.name} has rejected your invitation to join {group.name}",
-                related_group_id=group.id,
-                related_student_id=student.id,
-                link=None
+            notification_service.enqueue(
+                db,
+                NotificationCreate(
+                    user_id=leader_student.user_id,
+                    type="invitation_rejected",
+                    template_id="invitation_response",
+                    params={"status": "rejected"},
+                    related_group_id=group.id,
+                    related_student_id=student.id,
+                    link=None
+                )
             )
-            db.add(rejection_notification)
-            db.commit()
+        
+        db.commit()
         
         return {"message": "Invitation rejected", "status": "rejected"}
     
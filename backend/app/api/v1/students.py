@@ -7,6 +7,7 @@ from app.api.deps import get_current_user, get_current_admin
 from app.models.user import User, UserRole
 from app.models.student import Student as StudentModel
 from app.utils.security import get_password_hash 
+from app.services import event_bus
 
 router = APIRouter()
 
@@ -129,6 +130,8 @@ def create_student(
     )
     
     db.add(db_student)
+    db.flush()
+    event_bus.emit(db, "student.updated", student_id=db_student.id)
     db.commit()
     db.refresh(db_student)
     
@@ -158,6 +161,7 @@ def update_student(
     for field, value in update_data.items():
         setattr(student, field, value)
     
+    event_bus.emit(db, "student.updated", student_id=student.id)
     db.commit()
     db.refresh(student)
     
@@ -186,6 +190,7 @@ def delete_student(
     if user:
         db.delete(user)
     
+    event_bus.emit(db, "student.deleted", student_id=student_id, user_id=student.user_id)
     db.commit()
     return None
 
@@ -276,6 +281,8 @@ def create_students_bulk(
     # Commit all successful creations
     if created_accounts:
         try:
+            # Too many ids for one event payload: workers rebuild what they cache instead
+            event_bus.emit(db, "student.bulk_created")
             db.commit()
         except Exception as e:
             db.rollback()
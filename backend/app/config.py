@@ -17,6 +17,33 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: list
     
+    # Chat
+    CHAT_WS_QUEUE_SIZE: int = 100
+    CHAT_ACCESS_CACHE_TTL_SECONDS: int = 60
+    CHAT_ACCESS_CACHE_MAX_ENTRIES: int = 10000
+    CHAT_PARTITION_MONTHS_AHEAD: int = 3
+    CHAT_ARCHIVE_AFTER_MONTHS: int = 12
+    CHAT_READ_RECEIPT_FLUSH_SECONDS: float = 1.0
+    CHAT_READ_RECEIPT_MAX_PENDING: int = 500
+    
+    # Notifications
+    NOTIFICATION_DISPATCH_INTERVAL_SECONDS: float = 2.0
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = 200
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_REPLAY_LIMIT: int = 100
+    NOTIFICATION_RETENTION_READ_DAYS: int = 90
+    NOTIFICATION_RETENTION_DAYS: int = 365
+    NOTIFICATION_PURGE_BATCH_SIZE: int = 5000
+    NOTIFICATION_COUNTER_BATCH_SIZE: int = 1000
+    NOTIFICATION_PREFERENCE_CACHE_TTL_SECONDS: int = 300
+    NOTIFICATION_PREFERENCE_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Recommendations
+    RECOMMENDATION_SKILL_WEIGHT: float = 1.0
+    RECOMMENDATION_FACULTY_WEIGHT: float = 0.3
+    RECOMMENDATION_OPEN_SLOTS_WEIGHT: float = 0.2
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,10 +1,24 @@
-from sqlalchemy.orm import Session
-from app.models.chat import GroupChatMessage, MessageReadStatus
+from sqlalchemy import and_, case, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+from app.models.chat import GroupChatMessage, GroupReadCursor
+from app.models.group import GroupMember, group_mentors
 from app.models.student import Student
 from app.models.professor import Professor
+from app.models.user import User
 from app.schemas.chat import ChatMessageCreate, ChatMessageUpdate
-from typing import List, Optional
-from datetime import datetime
+from app.services import event_bus
+from app.services.message_signal import message_signal
+from app.services.read_receipts import read_receipts
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+
+# Messages are partitioned by month on created_at. Ids come from one sequence
+# and grow with created_at, so an id bound can be paired with a created_at bound
+# that lets Postgres skip whole partitions. The slack absorbs commit-order skew.
+PARTITION_PRUNING_SLACK = timedelta(minutes=5)
+# The newest page is first looked for in this window before scanning all history
+RECENT_MESSAGES_WINDOW = timedelta(days=31)
 
 
 def create_message(
@@ -22,60 +36,192 @@ def create_message(
         message=message_data.message
     )
     db.add(db_message)
+    db.flush()
+    event_bus.emit(db, "chat.message_created", group_id=group_id, message_id=db_message.id)
     db.commit()
+    # Wake long-poll waiters in this worker without waiting for the bus
+    message_signal.notify(group_id, db_message.id)
     db.refresh(db_message)
     return db_message
 
 
-def get_messages(
+def _read_watermark(user_id: int, group_id_column):
+    """
+    The user's effective read watermark for the group in `group_id_column`:
+    the stored cursor merged with marks still waiting in this worker's
+    write-behind buffer. Marks buffered by other workers show up once flushed.
+    Needs GroupReadCursor outer-joined for the user.
+    """
+    stored = func.coalesce(GroupReadCursor.last_read_message_id, 0)
+    buffered = read_receipts.pending_for_user(user_id)
+    if not buffered:
+        return stored
+    return func.greatest(stored, case(buffered, value=group_id_column, else_=0))
+
+
+def _message_query(db: Session, current_user_id: Optional[int] = None):
+    """
+    Base query yielding (message, sender_name, is_read) rows.
+    Senders and the caller's read watermark are resolved with outer joins so
+    any number of messages costs a single query.
+    """
+    student_user = aliased(User)
+    professor_user = aliased(User)
+    
+    if current_user_id:
+        read_flag = GroupChatMessage.id <= _read_watermark(current_user_id, GroupChatMessage.group_id)
+    else:
+        read_flag = literal(False)
+    
+    query = db.query(
+        GroupChatMessage,
+        func.coalesce(student_user.name, professor_user.name, "Unknown").label("sender_name"),
+        read_flag.label("is_read")
+    ).outerjoin(
+        Student,
+        and_(
+            GroupChatMessage.sender_type == "student",
+            Student.id == GroupChatMessage.sender_id
+        )
+    ).outerjoin(
+        student_user, student_user.id == Student.user_id
+    ).outerjoin(
+        Professor,
+        and_(
+            GroupChatMessage.sender_type == "professor",
+            Professor.id == GroupChatMessage.sender_id
+        )
+    ).outerjoin(
+        professor_user, professor_user.id == Professor.user_id
+    )
+    
+    if current_user_id:
+        query = query.outerjoin(
+            GroupReadCursor,
+            and_(
+                GroupReadCursor.group_id == GroupChatMessage.group_id,
+                GroupReadCursor.user_id == current_user_id
+            )
+        )
+    
+    return query
+
+
+def _message_row_to_dict(msg: GroupChatMessage, sender_name: str, is_read: bool) -> dict:
+    return {
+        "id": msg.id,
+        "group_id": msg.group_id,
+        "sender_id": msg.sender_id,
+        "sender_type": msg.sender_type,
+        "sender_name": sender_name,
+        "message": msg.message,
+        "created_at": msg.created_at,
+        "edited_at": msg.edited_at,
+        "is_deleted": msg.is_deleted,
+        "is_read": bool(is_read)
+    }
+
+
+def get_message_history(
     db: Session, 
     group_id: int, 
-    skip: int = 0, 
+    current_user_id: Optional[int] = None,
     limit: int = 100,
-    current_user_id: int = None
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    before_created_at: Optional[datetime] = None,
+    after_created_at: Optional[datetime] = None
 ) -> List[dict]:
-    """Get all messages for a group with sender details and read status"""
-    messages = db.query(GroupChatMessage).filter(
+    """
+    Get a page of messages for a group with sender names and read status.
+    
+    Pages are keyed on message id: by default the newest `limit` messages are
+    returned, `before_id` pages back through older history and `after_id`
+    fetches messages newer than the given id. Results are always in
+    chronological order.
+    
+    `before_created_at` / `after_created_at` are the timestamps of the boundary
+    messages (carried in the pagination cursor); when given they restrict the
+    scan to the partitions that can hold the page.
+    """
+    query = _message_query(db, current_user_id).filter(
         GroupChatMessage.group_id == group_id,
         GroupChatMessage.is_deleted == False
-    ).order_by(GroupChatMessage.created_at.asc()).offset(skip).limit(limit).all()
-    
-    result = []
-    for msg in messages:
-        # Get sender name based on sender type
-        sender_name = "Unknown"
-        if msg.sender_type == "student":
-            student = db.query(Student).filter(Student.id == msg.sender_id).first()
-            if student:
-                sender_name = student.user.name
-        elif msg.sender_type == "professor":
-            professor = db.query(Professor).filter(Professor.id == msg.sender_id).first()
-            if professor:
-                sender_name = professor.user.name
-        
-        # Check if current user has read this message
-        is_read = False
-        if current_user_id:
-            read_status = db.query(MessageReadStatus).filter(
-                MessageReadStatus.message_id == msg.id,
-                MessageReadStatus.user_id == current_user_id
-            ).first()
-            is_read = read_status is not None
-        
-        result.append({
-            "id": msg.id,
-            "group_id": msg.group_id,
-            "sender_id": msg.sender_id,
-            "sender_type": msg.sender_type,
-            "sender_name": sender_name,
-            "message": msg.message,
-            "created_at": msg.created_at,
-            "edited_at": msg.edited_at,
-            "is_deleted": msg.is_deleted,
-            "is_read": is_read
-        })
-    
-    return result
+    )
+    
+    if after_id is not None:
+        query = query.filter(GroupChatMessage.id > after_id)
+        if after_created_at is not None:
+            query = query.filter(GroupChatMessage.created_at >= after_created_at - PARTITION_PRUNING_SLACK)
+        rows = query.order_by(GroupChatMessage.id.asc()).limit(limit).all()
+    elif before_id is not None:
+        query = query.filter(GroupChatMessage.id < before_id)
+        if before_created_at is not None:
+            query = query.filter(GroupChatMessage.created_at <= before_created_at + PARTITION_PRUNING_SLACK)
+        rows = query.order_by(GroupChatMessage.id.desc()).limit(limit).all()
+        rows.reverse()
+    else:
+        # Active groups fill the newest page from the current partitions alone
+        recent_since = datetime.now(timezone.utc) - RECENT_MESSAGES_WINDOW
+        rows = query.filter(
+            GroupChatMessage.created_at >= recent_since
+        ).order_by(GroupChatMessage.id.desc()).limit(limit).all()
+        if len(rows) < limit:
+            rows = query.order_by(GroupChatMessage.id.desc()).limit(limit).all()
+        rows.reverse()
+    
+    return [_message_row_to_dict(*row) for row in rows]
+
+
+def get_message_details(db: Session, message_id: int) -> Optional[dict]:
+    """Get a single message with its sender name, including soft-deleted messages"""
+    row = _message_query(db).filter(GroupChatMessage.id == message_id).first()
+    if row is None:
+        return None
+    return _message_row_to_dict(*row)
+
+
+def search_messages(
+    db: Session,
+    group_id: int,
+    query_text: str,
+    current_user_id: Optional[int] = None,
+    limit: int = 20
+) -> List[dict]:
+    """
+    Full-text search over a group's messages, best matches first.
+    Hits come from the GIN index on search_vector; snippets are only
+    highlighted for the returned page.
+    """
+    tsquery = func.websearch_to_tsquery("simple", query_text)
+    rank = func.ts_rank_cd(GroupChatMessage.search_vector, tsquery)
+    
+    ranked = db.query(
+        GroupChatMessage.id.label("id"),
+        rank.label("rank")
+    ).filter(
+        GroupChatMessage.group_id == group_id,
+        GroupChatMessage.is_deleted == False,
+        GroupChatMessage.search_vector.op("@@")(tsquery)
+    ).order_by(rank.desc(), GroupChatMessage.id.desc()).limit(limit).subquery()
+    
+    snippet = func.ts_headline(
+        "simple",
+        GroupChatMessage.message,
+        tsquery,
+        "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+    )
+    
+    rows = _message_query(db, current_user_id).join(
+        ranked, ranked.c.id == GroupChatMessage.id
+    ).add_columns(
+        ranked.c.rank, snippet
+    ).order_by(ranked.c.rank.desc(), GroupChatMessage.id.desc()).all()
+    
+    return [
+        {**_message_row_to_dict(msg, sender_name, is_read), "rank": hit_rank, "snippet": hit_snippet}
+        for msg, sender_name, is_read, hit_rank, hit_snippet in rows
+    ]
 
 
 def get_message_by_id(db: Session, message_id: int) -> Optional[GroupChatMessage]:
@@ -93,6 +239,7 @@ def update_message(
     if message:
         message.message = message_data.message
         message.edited_at = datetime.utcnow()
+        event_bus.emit(db, "chat.message_edited", group_id=message.group_id, message_id=message.id)
         db.commit()
         db.refresh(message)
     return message
@@ -104,77 +251,114 @@ def delete_message(db: Session, message_id: int) -> bool:
     if message:
         message.is_deleted = True
         message.message = "[Message deleted]"
+        event_bus.emit(db, "chat.message_deleted", group_id=message.group_id, message_id=message.id)
         db.commit()
         return True
     return False
 
 
-def mark_message_as_read(db: Session, message_id: int, user_id: int) -> MessageReadStatus:
-    """Mark a message as read by a user"""
-    # Check if already marked as read
-    existing = db.query(MessageReadStatus).filter(
-        MessageReadStatus.message_id == message_id,
-        MessageReadStatus.user_id == user_id
-    ).first()
-    
-    if existing:
-        return existing
-    
-    read_status = MessageReadStatus(
-        message_id=message_id,
-        user_id=user_id
+def _advance_read_cursor(db: Session, group_id: int, user_id: int, last_read_message_id) -> None:
+    """Move a member's read watermark forward; it never moves backwards"""
+    stmt = insert(GroupReadCursor).values(
+        group_id=group_id,
+        user_id=user_id,
+        last_read_message_id=last_read_message_id
     )
-    db.add(read_status)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GroupReadCursor.group_id, GroupReadCursor.user_id],
+        set_={
+            "last_read_message_id": func.greatest(
+                GroupReadCursor.last_read_message_id,
+                stmt.excluded.last_read_message_id
+            ),
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
     db.commit()
-    db.refresh(read_status)
-    return read_status
 
 
-def mark_all_messages_as_read(db: Session, group_id: int, user_id: int) -> int:
+def mark_message_as_read(db: Session, group_id: int, message_id: int, user_id: int) -> bool:
+    """
+    Mark a message (and everything before it) as read by a user.
+    The watermark never moves back, so only an existing, visible message of
+    the group is accepted; returns False otherwise. The mark itself goes
+    through the write-behind buffer.
+    """
+    exists = db.query(
+        db.query(GroupChatMessage.id).filter(
+            GroupChatMessage.group_id == group_id,
+            GroupChatMessage.id == message_id,
+            GroupChatMessage.is_deleted == False
+        ).exists()
+    ).scalar()
+    if not exists:
+        return False
+    read_receipts.mark(group_id, user_id, message_id)
+    return True
+
+
+def mark_all_messages_as_read(db: Session, group_id: int, user_id: int) -> None:
     """Mark all messages in a group as read for a user"""
-    messages = db.query(GroupChatMessage).filter(
-        GroupChatMessage.group_id == group_id,
-        GroupChatMessage.is_deleted == False
-    ).all()
-    
-    count = 0
-    for message in messages:
-        # Check if already marked
-        existing = db.query(MessageReadStatus).filter(
-            MessageReadStatus.message_id == message.id,
-            MessageReadStatus.user_id == user_id
-        ).first()
-        
-        if not existing:
-            read_status = MessageReadStatus(
-                message_id=message.id,
-                user_id=user_id
-            )
-            db.add(read_status)
-            count += 1
+    latest_message_id = db.query(
+        func.coalesce(func.max(GroupChatMessage.id), 0)
+    ).filter(
+        GroupChatMessage.group_id == group_id
+    ).scalar_subquery()
     
-    db.commit()
-    return count
+    _advance_read_cursor(db, group_id, user_id, latest_message_id)
 
 
 def get_unread_count(db: Session, group_id: int, user_id: int) -> int:
     """Get count of unread messages for a user in a group"""
-    # Get all messages in group
-    all_messages = db.query(GroupChatMessage.id).filter(
+    return db.query(func.count(GroupChatMessage.id)).outerjoin(
+        GroupReadCursor,
+        and_(
+            GroupReadCursor.group_id == GroupChatMessage.group_id,
+            GroupReadCursor.user_id == user_id
+        )
+    ).filter(
         GroupChatMessage.group_id == group_id,
-        GroupChatMessage.is_deleted == False
-    ).all()
+        GroupChatMessage.is_deleted == False,
+        GroupChatMessage.id > _read_watermark(user_id, GroupChatMessage.group_id)
+    ).scalar()
+
+
+def get_unread_counts_for_user(db: Session, user_id: int) -> Dict[int, int]:
+    """
+    Get unread message counts for every group the user belongs to or mentors.
+    The groups, read watermarks and counts are resolved in one grouped query.
+    """
+    member_groups = db.query(
+        GroupMember.group_id.label("group_id")
+    ).join(
+        Student, Student.id == GroupMember.student_id
+    ).filter(Student.user_id == user_id)
     
-    message_ids = [msg.id for msg in all_messages]
+    mentor_groups = db.query(
+        group_mentors.c.group_id.label("group_id")
+    ).join(
+        Professor, Professor.id == group_mentors.c.professor_id
+    ).filter(Professor.user_id == user_id)
     
-    # Get messages user has read
-    read_messages = db.query(MessageReadStatus.message_id).filter(
-        MessageReadStatus.message_id.in_(message_ids),
-        MessageReadStatus.user_id == user_id
-    ).all()
+    user_groups = member_groups.union(mentor_groups).subquery()
     
-    read_message_ids = [rm.message_id for rm in read_messages]
+    rows = db.query(
+        user_groups.c.group_id,
+        func.count(GroupChatMessage.id)
+    ).outerjoin(
+        GroupReadCursor,
+        and_(
+            GroupReadCursor.group_id == user_groups.c.group_id,
+            GroupReadCursor.user_id == user_id
+        )
+    ).outerjoin(
+        GroupChatMessage,
+        and_(
+            GroupChatMessage.group_id == user_groups.c.group_id,
+            GroupChatMessage.is_deleted == False,
+            GroupChatMessage.id > _read_watermark(user_id, user_groups.c.group_id)
+        )
+    ).group_by(user_groups.c.group_id).all()
     
-    # Count unread
-    unread_count = len(message_ids) - len(read_message_ids)
-    return unread_count
\ No newline at end of file
+    return {group_id: unread for group_id, unread in rows}
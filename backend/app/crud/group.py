@@ -1,6 +1,12 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.types import String
 from app.models.group import Group, GroupMember, GroupInvitation, GroupJoinRequest
+from app.models.professor import Professor
 from app.schemas.group import GroupCreate, GroupUpdate, GroupInvitationCreate, GroupJoinRequestCreate
+from app.services import event_bus
+from app.services.access_cache import group_access_cache
 from typing import List, Optional
 
 
@@ -12,6 +18,96 @@ def get_groups(db: Session, skip: int = 0, limit: int = 100) -> List[Group]:
     return db.query(Group).offset(skip).limit(limit).all()
 
 
+def _with_mentors(query):
+    """Load each group's mentors and their users up front: two extra queries per page"""
+    return query.options(selectinload(Group.mentors).joinedload(Professor.user))
+
+
+def group_card(group: Group) -> dict:
+    """A group with its mentors, as returned by the group listing endpoints"""
+    return {
+        **group.__dict__,
+        "mentors": [
+            {
+                "id": professor.id,
+                "name": professor.user.name,
+                "email": professor.user.email,
+                "department": professor.department,
+                "research_areas": professor.research_areas
+            }
+            for professor in group.mentors
+        ] if group.has_mentor else [],
+        "mentor_count": group.mentor_count or 0
+    }
+
+
+def get_group_with_mentors(db: Session, group_id: int) -> Optional[Group]:
+    return _with_mentors(db.query(Group)).filter(Group.id == group_id).first()
+
+
+def get_group_card(db: Session, group_id: int) -> Optional[dict]:
+    group = get_group_with_mentors(db, group_id)
+    return group_card(group) if group else None
+
+
+def get_group_cards(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    groups = _with_mentors(db.query(Group)).offset(skip).limit(limit).all()
+    return [group_card(group) for group in groups]
+
+
+def get_group_cards_by_ids(db: Session, group_ids: List[int]) -> List[dict]:
+    """Cards for the given groups, in the given order"""
+    groups = _with_mentors(db.query(Group)).filter(Group.id.in_(group_ids)).all()
+    by_id = {group.id: group for group in groups}
+    return [group_card(by_id[group_id]) for group_id in group_ids if group_id in by_id]
+
+
+def get_student_group_cards(db: Session, student_id: int) -> List[dict]:
+    """Cards for every group the student belongs to (including as leader)"""
+    member_of = db.query(GroupMember.group_id).filter(GroupMember.student_id == student_id)
+    groups = _with_mentors(db.query(Group)).filter(Group.id.in_(member_of)).all()
+    return [group_card(group) for group in groups]
+
+
+def search_group_cards(
+    db: Session,
+    skills: Optional[List[str]] = None,
+    student_skills: Optional[List[str]] = None,
+    open_only: bool = True,
+    has_mentor: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[dict]:
+    """
+    Groups needing any of `skills`, best match for `student_skills` first.
+    Each card carries skill_match: how many needed skills the student has.
+    """
+    query = db.query(Group)
+    if skills:
+        query = query.filter(Group.needed_skills.op("&&")(literal(skills, ARRAY(String))))
+    if open_only:
+        # Matches the partial indexes' predicate, so the planner can use them
+        query = query.filter(Group.current_members < Group.max_members)
+    if has_mentor is not None:
+        query = query.filter(Group.has_mentor == has_mentor)
+    
+    if student_skills:
+        needed_skill = func.unnest(Group.needed_skills).table_valued("skill").render_derived()
+        skill_match = db.query(func.count()).select_from(needed_skill).filter(
+            needed_skill.c.skill == func.any(literal(student_skills, ARRAY(String)))
+        ).scalar_subquery()
+    else:
+        skill_match = literal(0)
+    skill_match = skill_match.label("skill_match")
+    
+    rows = _with_mentors(query.add_columns(skill_match)).order_by(
+        skill_match.desc(),
+        Group.created_at.desc(),
+        Group.id.desc()
+    ).offset(skip).limit(limit).all()
+    return [{**group_card(group), "skill_match": match} for group, match in rows]
+
+
 def create_group(db: Session, group: GroupCreate) -> Group:
     db_group = Group(**group.model_dump())
     db.add(db_group)
@@ -25,6 +121,7 @@ def create_group(db: Session, group: GroupCreate) -> Group:
         role="leader"
     )
     db.add(leader_member)
+    event_bus.emit(db, "group.created", group_id=db_group.id)
     db.commit()
     
     return db_group
@@ -36,6 +133,7 @@ def update_group(db: Session, group_id: int, group: GroupUpdate) -> Optional[Gro
         update_data = group.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_group, field, value)
+        event_bus.emit(db, "group.updated", group_id=group_id)
         db.commit()
         db.refresh(db_group)
     return db_group
@@ -45,22 +143,54 @@ def delete_group(db: Session, group_id: int) -> bool:
     db_group = get_group(db, group_id)
     if db_group:
         db.delete(db_group)
+        event_bus.emit(db, "group.deleted", group_id=group_id)
         db.commit()
+        group_access_cache.invalidate_group(group_id)
         return True
     return False
 
 
-def add_group_member(db: Session, group_id: int, student_id: int) -> Optional[GroupMember]:
-    db_group = get_group(db, group_id)
-    if not db_group or db_group.current_members >= db_group.max_members:
+def claim_member_slot(db: Session, group_id: int) -> bool:
+    """
+    Take one free seat in a group, in the caller's transaction.
+    A single guarded UPDATE, so concurrent joins can never overfill a group;
+    returns False when the group is full or does not exist.
+    """
+    claimed = db.execute(
+        update(Group)
+        .where(Group.id == group_id, Group.current_members < Group.max_members)
+        .values(current_members=Group.current_members + 1)
+        .returning(Group.current_members)
+    ).first()
+    return claimed is not None
+
+
+def release_member_slot(db: Session, group_id: int) -> None:
+    """Give a seat back, in the caller's transaction"""
+    db.execute(
+        update(Group)
+        .where(Group.id == group_id, Group.current_members > 0)
+        .values(current_members=Group.current_members - 1)
+    )
+
+
+def add_group_member(db: Session, group_id: int, student_id: int, commit: bool = True) -> Optional[GroupMember]:
+    """
+    Add a student to a group; returns None, with nothing changed, when it is full.
+    With commit=False the caller commits and then invalidates the group's
+    access cache entries.
+    """
+    if not claim_member_slot(db, group_id):
         return None
     
     member = GroupMember(group_id=group_id, student_id=student_id, role="member")
     db.add(member)
     
-    db_group.current_members += 1
-    db.commit()
-    db.refresh(member)
+    event_bus.emit(db, "group.member_added", group_id=group_id, student_id=student_id)
+    if commit:
+        db.commit()
+        group_access_cache.invalidate_group(group_id)
+        db.refresh(member)
     return member
 
 
@@ -71,45 +201,83 @@ def remove_group_member(db: Session, group_id: int, student_id: int) -> bool:
     ).first()
     
     if member:
-        db_group = get_group(db, group_id)
+        # Counter first, like the join path, so row locks are always taken in the same order
+        release_member_slot(db, group_id)
         db.delete(member)
-        if db_group:
-            db_group.current_members -= 1
+        event_bus.emit(db, "group.member_removed", group_id=group_id, student_id=student_id)
         db.commit()
+        group_access_cache.invalidate_group(group_id)
         return True
     return False
 
 
-def create_invitation(db: Session, invitation: GroupInvitationCreate) -> GroupInvitation:
+def create_invitation(db: Session, invitation: GroupInvitationCreate, commit: bool = True) -> GroupInvitation:
     db_invitation = GroupInvitation(**invitation.model_dump())
     db.add(db_invitation)
-    db.commit()
-    db.refresh(db_invitation)
+    db.flush()
+    event_bus.emit(
+        db, "group.invitation_created",
+        group_id=db_invitation.group_id, invitation_id=db_invitation.id, student_id=db_invitation.student_id
+    )
+    if commit:
+        db.commit()
+        db.refresh(db_invitation)
     return db_invitation
 
 
+def get_invitation(db: Session, invitation_id: int) -> Optional[GroupInvitation]:
+    return db.query(GroupInvitation).filter(GroupInvitation.id == invitation_id).first()
+
+
 def get_invitations_for_student(db: Session, student_id: int) -> List[GroupInvitation]:
     return db.query(GroupInvitation).filter(
         GroupInvitation.student_id == student_id
     ).all()
 
 
-def update_invitation_status(db: Session, invitation_id: int, status: str) -> Optional[GroupInvitation]:
-    invitation = db.query(GroupInvitation).filter(GroupInvitation.id == invitation_id).first()
+def update_invitation_status(
+    db: Session, invitation_id: int, status: str, commit: bool = True
+) -> Optional[GroupInvitation]:
+    """
+    Answer a pending invitation; returns None when it does not exist or was
+    already answered. A single guarded UPDATE, so of two concurrent answers
+    only one gets the invitation.
+    """
+    invitation = db.scalars(
+        update(GroupInvitation)
+        .where(GroupInvitation.id == invitation_id, GroupInvitation.status == "pending")
+        .values(status=status)
+        .returning(GroupInvitation)
+        .execution_options(populate_existing=True)
+    ).first()
     if invitation:
-        invitation.status = status
-        db.commit()
-        db.refresh(invitation)
+        event_bus.emit(
+            db, "group.invitation_updated",
+            group_id=invitation.group_id, invitation_id=invitation.id, status=status
+        )
+        if commit:
+            db.commit()
+            db.refresh(invitation)
     return invitation
 
-def create_join_request(db: Session, join_request: GroupJoinRequestCreate) -> GroupJoinRequest:
+def create_join_request(db: Session, join_request: GroupJoinRequestCreate, commit: bool = True) -> GroupJoinRequest:
     db_request = GroupJoinRequest(**join_request.model_dump())
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    db.flush()
+    event_bus.emit(
+        db, "group.join_request_created",
+        group_id=db_request.group_id, request_id=db_request.id, student_id=db_request.student_id
+    )
+    if commit:
+        db.commit()
+        db.refresh(db_request)
     return db_request
 
 
+def get_join_request(db: Session, request_id: int) -> Optional[GroupJoinRequest]:
+    return db.query(GroupJoinRequest).filter(GroupJoinRequest.id == request_id).first()
+
+
 def get_join_requests_for_group(db: Session, group_id: int) -> List[GroupJoinRequest]:
     return db.query(GroupJoinRequest).filter(
         GroupJoinRequest.group_id == group_id,
@@ -117,10 +285,27 @@ def get_join_requests_for_group(db: Session, group_id: int) -> List[GroupJoinReq
     ).all()
 
 
-def update_join_request_status(db: Session, request_id: int, status: str) -> Optional[GroupJoinRequest]:
-    join_request = db.query(GroupJoinRequest).filter(GroupJoinRequest.id == request_id).first()
+def update_join_request_status(
+    db: Session, request_id: int, status: str, commit: bool = True
+) -> Optional[GroupJoinRequest]:
+    """
+    Answer a pending join request; returns None when it does not exist or was
+    already answered. A single guarded UPDATE, so of two concurrent answers
+    only one gets the request.
+    """
+    join_request = db.scalars(
+        update(GroupJoinRequest)
+        .where(GroupJoinRequest.id == request_id, GroupJoinRequest.status == "pending")
+        .values(status=status)
+        .returning(GroupJoinRequest)
+        .execution_options(populate_existing=True)
+    ).first()
     if join_request:
-        join_request.status = status
-        db.commit()
-        db.refresh(join_request)
-    return join_request
\ No newline at end of file
+        event_bus.emit(
+            db, "group.join_request_updated",
+            group_id=join_request.group_id, request_id=join_request.id, status=status
+        )
+        if commit:
+            db.commit()
+            db.refresh(join_request)
+    return join_request
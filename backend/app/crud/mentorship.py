@@ -1,19 +1,32 @@
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session, joinedload
 from app.models.mentorship_request import MentorshipRequest
-from app.models.group import Group
+from app.models.group import Group, group_mentors
 from app.models.student import Student
 from app.models.professor import Professor
 from app.schemas.mentorship import MentorshipRequestCreate, MentorshipRequestUpdate
+from app.services import event_bus
 from typing import List, Optional
 from datetime import datetime
 
+MAX_MENTORS_PER_GROUP = 2
 
-def create_mentorship_request(db: Session, request_data: MentorshipRequestCreate) -> MentorshipRequest:
-    """Create a new mentorship request"""
+
+def create_mentorship_request(
+    db: Session, request_data: MentorshipRequestCreate, commit: bool = True
+) -> MentorshipRequest:
+    """Create a new mentorship request; with commit=False it is only flushed"""
     db_request = MentorshipRequest(**request_data.dict())
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    db.flush()
+    event_bus.emit(
+        db, "mentorship.request_created",
+        request_id=db_request.id, group_id=db_request.group_id, professor_id=db_request.professor_id
+    )
+    if commit:
+        db.commit()
+        db.refresh(db_request)
     return db_request
 
 
@@ -84,21 +97,86 @@ def update_mentorship_request_status(
     db: Session, 
     request_id: int, 
     status: str,
-    rejection_reason: Optional[str] = None
+    rejection_reason: Optional[str] = None,
+    commit: bool = True
 ) -> Optional[MentorshipRequest]:
-    """Update the status of a mentorship request"""
-    request = get_mentorship_request(db, request_id)
+    """
+    Answer a pending mentorship request; returns None when it does not exist
+    or was already answered. A single guarded UPDATE, so of two concurrent
+    answers only one gets the request.
+    """
+    values = {"status": status, "responded_at": datetime.utcnow()}
+    if rejection_reason:
+        values["rejection_reason"] = rejection_reason
+    request = db.scalars(
+        update(MentorshipRequest)
+        .where(MentorshipRequest.id == request_id, MentorshipRequest.status == 'pending')
+        .values(**values)
+        .returning(MentorshipRequest)
+        .execution_options(populate_existing=True)
+    ).first()
     if request:
-        request.status = status
-        request.responded_at = datetime.utcnow()
-        if rejection_reason:
-            request.rejection_reason = rejection_reason
-        db.commit()
-        db.refresh(request)
+        event_bus.emit(
+            db, "mentorship.request_updated",
+            request_id=request.id, group_id=request.group_id, professor_id=request.professor_id, status=status
+        )
+        if commit:
+            db.commit()
+            db.refresh(request)
     return request
 
 
-def reject_other_pending_requests_for_group(db: Session, group_id: int, accepted_request_id: int):
+def assign_mentor(db: Session, group_id: int, professor_id: int, commit: bool = True) -> int:
+    """
+    Make a professor a mentor of a group and return the group's new mentor count.
+    The professor's slot and the group's mentor seat are each taken with a
+    guarded UPDATE, so concurrent accepts cannot overdraw either counter.
+    Raises ValueError when the professor already mentors the group or either
+    has no room left; nothing is changed, or with commit=False the caller
+    rolls back.
+    """
+    assigned = db.execute(
+        insert(group_mentors)
+        .values(group_id=group_id, professor_id=professor_id)
+        .on_conflict_do_nothing(constraint='uq_group_mentors_group_professor')
+        .returning(group_mentors.c.group_id)
+    ).first()
+    if assigned is None:
+        if commit:
+            db.rollback()
+        raise ValueError("You are already a mentor of this group")
+    
+    slot = db.execute(
+        update(Professor)
+        .where(Professor.id == professor_id, Professor.available_slots > 0)
+        .values(available_slots=Professor.available_slots - 1)
+        .returning(Professor.available_slots)
+    ).first()
+    if slot is None:
+        if commit:
+            db.rollback()
+        raise ValueError("You have no available mentorship slots")
+    
+    seat = db.execute(
+        update(Group)
+        .where(Group.id == group_id, func.coalesce(Group.mentor_count, 0) < MAX_MENTORS_PER_GROUP)
+        .values(mentor_count=func.coalesce(Group.mentor_count, 0) + 1, has_mentor=True)
+        .returning(Group.mentor_count)
+    ).first()
+    if seat is None:
+        if commit:
+            db.rollback()
+        raise ValueError(f"This group already has the maximum number of mentors ({MAX_MENTORS_PER_GROUP})")
+    
+    event_bus.emit(db, "group.mentor_assigned", group_id=group_id, professor_id=professor_id)
+    if commit:
+        db.commit()
+    return seat.mentor_count
+
+
+def reject_other_pending_requests_for_group(
+    db: Session, group_id: int, accepted_request_id: int, commit: bool = True
+):
     """Reject all other pending requests for a group when one is accepted"""
     db.query(MentorshipRequest).filter(
         MentorshipRequest.group_id == group_id,
@@ -109,4 +187,9 @@ def reject_other_pending_requests_for_group(db: Session, group_id: int, accepted
         'rejection_reason': 'Another professor was selected as mentor for this group.',
         'responded_at': datetime.utcnow()
     }, synchronize_session=False)
-    db.commit()
\ No newline at end of file
+    event_bus.emit(
+        db, "mentorship.requests_rejected",
+        group_id=group_id, accepted_request_id=accepted_request_id
+    )
+    if commit:
+        db.commit()
\ No newline at end of file
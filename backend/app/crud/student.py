@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.models.student import Student
 from app.models.user import User
 from app.schemas.student import StudentCreate, StudentUpdate
+from app.services import event_bus
 from typing import List, Optional
 
 
@@ -20,6 +21,8 @@ def get_students(db: Session, skip: int = 0, limit: int = 100) -> List[Student]:
 def create_student(db: Session, student: StudentCreate) -> Student:
     db_student = Student(**student.model_dump())
     db.add(db_student)
+    db.flush()
+    event_bus.emit(db, "student.updated", student_id=db_student.id)
     db.commit()
     db.refresh(db_student)
     return db_student
@@ -31,6 +34,7 @@ def update_student(db: Session, student_id: int, student: StudentUpdate) -> Opti
         update_data = student.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_student, field, value)
+        event_bus.emit(db, "student.updated", student_id=student_id)
         db.commit()
         db.refresh(db_student)
     return db_student
@@ -40,6 +44,7 @@ def delete_student(db: Session, student_id: int) -> bool:
     db_student = get_student(db, student_id)
     if db_student:
         db.delete(db_student)
+        event_bus.emit(db, "student.deleted", student_id=student_id, user_id=db_student.user_id)
         db.commit()
         return True
     return False
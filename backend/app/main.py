@@ -3,6 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import api_router
 from app.config import settings
 from app.database import engine, Base
+from app.services import event_bus
+from app.services.read_receipts import read_receipts
+from app.services import notifications as notification_service
+from app.maintenance import chat_partitions
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -20,11 +24,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+
+@app.on_event("startup")
+def start_background_services():
+    # Make sure there is a chat partition for the current month before accepting writes
+    with engine.begin() as connection:
+        chat_partitions.ensure_partitions(connection)
+    event_bus.start_listener()
+    read_receipts.start()
+    notification_service.start_dispatcher()
+
+
+@app.on_event("shutdown")
+def stop_background_services():
+    # Drain buffered read receipts before the worker exits
+    read_receipts.stop()
+    notification_service.stop_dispatcher()
+    event_bus.stop_listener()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Research Platform API", "version": "1.0.0"}
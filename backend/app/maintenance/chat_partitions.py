@@ -0,0 +1,192 @@
+"""
+Partition maintenance for group_chat_messages.
+
+group_chat_messages is range-partitioned by month on created_at. This
+command pre-creates partitions for the coming months and moves partitions
+older than the retention window out of the live table, either into compact
+archive tables (no indexes, no search vector) or dropping them outright.
+
+Rows whose month has no partition yet land in a DEFAULT partition instead
+of failing the insert; they are moved into their month's partition when it
+is created.
+
+Run it from cron, e.g. daily:
+    
+    python -m app.maintenance.chat_partitions
+    python -m app.maintenance.chat_partitions --archive-after-months 24 --drop
+"""
+import argparse
+import logging
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "group_chat_messages"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+ARCHIVE_LOCK_TIMEOUT = "5s"
+# Every column except the generated search vector
+STORED_COLUMNS = "id, group_id, sender_id, sender_type, message, created_at, edited_at, is_deleted"
+# Advisory lock key serialising partition creation across workers and cron
+PARTITION_LOCK_KEY = 7208511
+
+_PARTITION_NAME = re.compile(r"^group_chat_messages_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def archive_name(month: date) -> str:
+    return f"{PARENT_TABLE}_archive_y{month.year:04d}m{month.month:02d}"
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    """Names of the partitions currently attached to group_chat_messages"""
+    rows = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+        ORDER BY child.relname
+    """), {"parent": PARENT_TABLE})
+    return [row[0] for row in rows]
+
+
+def _create_partition(connection: Connection, month: date) -> None:
+    name = partition_name(month)
+    lower, upper = f"'{month} 00:00:00+00'", f"'{add_months(month, 1)} 00:00:00+00'"
+    in_month = f"created_at >= {lower} AND created_at < {upper}"
+    
+    stray = connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})"
+    )).scalar()
+    if not stray:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} FOR VALUES FROM ({lower}) TO ({upper})"
+        ))
+        return
+    
+    # The default partition holds rows of this month and would reject the new
+    # range, so the rows are moved into the new table before it is attached
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"
+    ))
+    connection.execute(text(
+        f"INSERT INTO {name} ({STORED_COLUMNS}) SELECT {STORED_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_month}"
+    ))
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"))
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+    ))
+
+
+def ensure_partitions(
+    connection: Connection,
+    months_ahead: int = settings.CHAT_PARTITION_MONTHS_AHEAD,
+    start: Optional[date] = None
+) -> List[str]:
+    """
+    Create the default partition and any missing monthly partitions from
+    `start` (default: this month) through `months_ahead` months from now.
+    Returns the names created. Runs under a transaction-scoped advisory lock,
+    so workers starting together do not race to create the same tables.
+    """
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+    existing = set(list_partitions(connection))
+    today = date.today()
+    month = month_start(start or today)
+    last = add_months(month_start(today), months_ahead)
+    
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            _create_partition(connection, month)
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(bind: Engine, older_than_months: int, drop: bool = False) -> List[str]:
+    """
+    Detach every partition whose whole month is older than `older_than_months`
+    and either copy it into a compact archive table or drop it. Each partition
+    is handled in its own transaction. Returns the names of detached partitions.
+    """
+    cutoff = add_months(month_start(date.today()), -older_than_months)
+    
+    with bind.connect() as connection:
+        partitions = list_partitions(connection)
+    
+    detached = []
+    for name in partitions:
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if add_months(month, 1) > cutoff:
+            continue
+        
+        with bind.begin() as connection:
+            # Detaching locks the parent table; give up rather than queue every chat query behind it
+            connection.execute(text(f"SET LOCAL lock_timeout = '{ARCHIVE_LOCK_TIMEOUT}'"))
+            connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if not drop:
+                connection.execute(text(
+                    f"CREATE TABLE {archive_name(month)} AS SELECT {STORED_COLUMNS} FROM {name}"
+                ))
+            connection.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions of group_chat_messages")
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.CHAT_PARTITION_MONTHS_AHEAD,
+        help="how many future months to pre-create"
+    )
+    parser.add_argument(
+        "--archive-after-months", type=int, default=settings.CHAT_ARCHIVE_AFTER_MONTHS,
+        help="move partitions older than this many months out of the live table (0 disables)"
+    )
+    parser.add_argument(
+        "--drop", action="store_true",
+        help="drop expired partitions instead of copying them into archive tables"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    with engine.begin() as connection:
+        for name in ensure_partitions(connection, args.months_ahead):
+            logger.info("Created partition %s", name)
+    
+    if args.archive_after_months > 0:
+        for name in archive_partitions(engine, args.archive_after_months, drop=args.drop):
+            logger.info("%s partition %s", "Dropped" if args.drop else "Archived", name)
+
+
+if __name__ == "__main__":
+    main()
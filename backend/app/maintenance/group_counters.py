@@ -0,0 +1,75 @@
+"""
+Reconcile the denormalised group and professor counters.
+
+groups.current_members, groups.mentor_count / has_mentor and
+professors.available_slots are maintained by guarded single-statement
+updates (see crud.group.claim_member_slot and crud.mentorship.assign_mentor).
+This job recomputes them from group_members and group_mentors and corrects
+any row that has drifted, e.g. after manual data fixes. Run it periodically
+from cron:
+
+    python -m app.maintenance.group_counters
+"""
+import argparse
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+
+RECONCILE_GROUPS = text("""
+    UPDATE groups
+    SET current_members = counts.members,
+        mentor_count = counts.mentors,
+        has_mentor = counts.mentors > 0
+    FROM (
+        SELECT groups.id,
+            (SELECT count(*) FROM group_members WHERE group_members.group_id = groups.id) AS members,
+            (SELECT count(*) FROM group_mentors WHERE group_mentors.group_id = groups.id) AS mentors
+        FROM groups
+    ) counts
+    WHERE groups.id = counts.id
+        AND (groups.current_members IS DISTINCT FROM counts.members
+            OR groups.mentor_count IS DISTINCT FROM counts.mentors
+            OR groups.has_mentor IS DISTINCT FROM counts.mentors > 0)
+""")
+
+RECONCILE_PROFESSORS = text("""
+    UPDATE professors
+    SET available_slots = counts.available
+    FROM (
+        SELECT professors.id,
+            greatest(coalesce(professors.total_slots, 0) - (
+                SELECT count(*) FROM group_mentors WHERE group_mentors.professor_id = professors.id
+            ), 0) AS available
+        FROM professors
+    ) counts
+    WHERE professors.id = counts.id
+        AND professors.available_slots IS DISTINCT FROM counts.available
+""")
+
+
+def reconcile_counters(connection: Connection) -> Tuple[int, int]:
+    """Recompute all counters; returns the number of groups and professors corrected"""
+    # Counter updates take their row locks on groups/professors first, so
+    # waiting here for in-flight joins and mentor assignments and then holding
+    # off new ones keeps the recount and the overwrite consistent
+    connection.execute(text("LOCK TABLE groups, professors IN EXCLUSIVE MODE"))
+    connection.execute(text("LOCK TABLE group_members, group_mentors IN SHARE MODE"))
+    groups = connection.execute(RECONCILE_GROUPS).rowcount
+    professors = connection.execute(RECONCILE_PROFESSORS).rowcount
+    return groups, professors
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute group member/mentor counts and professor slots")
+    parser.parse_args(argv)
+    
+    with engine.begin() as connection:
+        groups, professors = reconcile_counters(connection)
+    print(f"Corrected {groups} group(s) and {professors} professor(s)")
+
+
+if __name__ == "__main__":
+    main()
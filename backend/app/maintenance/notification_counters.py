@@ -0,0 +1,109 @@
+"""
+Reconcile notification_counters with the notifications table.
+
+The counters are kept up to date by triggers on notifications; this job
+recomputes every user's unread count from scratch and corrects any row that
+has drifted (e.g. after manual data fixes). Users are reconciled in batches
+of ids, one short transaction per batch. Each batch locks only its own
+counter rows, which are the rows the triggers update, so notification
+inserts and mark-reads for other users never wait on the job. Run it
+periodically from cron:
+
+    python -m app.maintenance.notification_counters
+    python -m app.maintenance.notification_counters --batch-size 500 --pause 0.1
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.database import engine
+
+NEXT_USERS = text("""
+    SELECT id FROM users
+    WHERE id > :after
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+# Every user in the batch needs a counter row to lock; a row created
+# concurrently by a trigger is waited for and left as it is
+ENSURE_COUNTERS = text("""
+    INSERT INTO notification_counters (user_id, unread_count)
+    SELECT user_id, 0 FROM unnest(CAST(:user_ids AS integer[])) AS user_id
+    ON CONFLICT (user_id) DO NOTHING
+""")
+
+# Waits for in-flight transactions whose triggers already counted into these
+# rows, and holds off new ones until the batch commits
+LOCK_COUNTERS = text("""
+    SELECT user_id FROM notification_counters
+    WHERE user_id IN :user_ids
+    ORDER BY user_id
+    FOR UPDATE
+""").bindparams(bindparam("user_ids", expanding=True))
+
+# A separate statement from the lock, so its snapshot sees everything the
+# transactions waited for above committed
+RECOUNT = text("""
+    UPDATE notification_counters
+    SET unread_count = counts.unread
+    FROM (
+        SELECT user_id, count(notifications.id) FILTER (WHERE NOT coalesce(notifications.read, false)) AS unread
+        FROM unnest(CAST(:user_ids AS integer[])) AS user_id
+        LEFT JOIN notifications USING (user_id)
+        GROUP BY user_id
+    ) counts
+    WHERE notification_counters.user_id = counts.user_id
+        AND notification_counters.unread_count IS DISTINCT FROM counts.unread
+""")
+
+
+def reconcile_batch(connection: Connection, user_ids: List[int]) -> int:
+    """Recompute the unread counters of some users; returns the number of rows corrected"""
+    connection.execute(ENSURE_COUNTERS, {"user_ids": user_ids})
+    connection.execute(LOCK_COUNTERS, {"user_ids": user_ids})
+    return connection.execute(RECOUNT, {"user_ids": user_ids}).rowcount
+
+
+def reconcile_counters(
+    bind: Engine,
+    batch_size: int = settings.NOTIFICATION_COUNTER_BATCH_SIZE,
+    pause: float = 0.0
+) -> int:
+    """Recompute all unread counters batch by batch; returns the number of rows corrected"""
+    corrected = 0
+    after = 0
+    while True:
+        with bind.begin() as connection:
+            user_ids = connection.execute(NEXT_USERS, {"after": after, "batch_size": batch_size}).scalars().all()
+            if not user_ids:
+                break
+            corrected += reconcile_batch(connection, user_ids)
+        after = user_ids[-1]
+        if pause:
+            time.sleep(pause)
+    return corrected
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute per-user unread notification counters")
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.NOTIFICATION_COUNTER_BATCH_SIZE,
+        help="number of users reconciled in one transaction"
+    )
+    parser.add_argument(
+        "--pause", type=float, default=0.0,
+        help="seconds to sleep between batches"
+    )
+    args = parser.parse_args(argv)
+    
+    corrected = reconcile_counters(engine, batch_size=args.batch_size, pause=args.pause)
+    print(f"Corrected {corrected} notification counter(s)")
+
+
+if __name__ == "__main__":
+    main()
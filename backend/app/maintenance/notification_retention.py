@@ -0,0 +1,106 @@
+"""
+Purge notifications past their retention period.
+
+Read notifications are kept for NOTIFICATION_RETENTION_READ_DAYS and all
+notifications for NOTIFICATION_RETENTION_DAYS. Expired rows are deleted by
+walking the primary key in fixed-size id ranges, one short transaction per
+range, so the purge never holds row locks for long or bloats a single
+transaction. The unread counters follow along through their triggers.
+Run it from cron, e.g. nightly:
+
+    python -m app.maintenance.notification_retention
+    python -m app.maintenance.notification_retention --read-days 30 --dry-run
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.database import engine
+from app.models.notification import Notification
+
+
+def expired_condition(now: datetime, read_days: int, retention_days: int):
+    """SQL condition matching notifications past their retention period"""
+    return or_(
+        Notification.created_at < now - timedelta(days=retention_days),
+        and_(
+            Notification.read == True,
+            Notification.created_at < now - timedelta(days=read_days)
+        )
+    )
+
+
+def purge_notifications(
+    bind: Engine,
+    read_days: int = settings.NOTIFICATION_RETENTION_READ_DAYS,
+    retention_days: int = settings.NOTIFICATION_RETENTION_DAYS,
+    batch_size: int = settings.NOTIFICATION_PURGE_BATCH_SIZE,
+    pause: float = 0.0,
+    dry_run: bool = False
+) -> int:
+    """Delete expired notifications in id-range batches; returns the number deleted (or matched on a dry run)"""
+    expired = expired_condition(datetime.now(timezone.utc), read_days, retention_days)
+    
+    with bind.connect() as connection:
+        if dry_run:
+            return connection.execute(select(func.count(Notification.id)).where(expired)).scalar()
+        first_id, last_id = connection.execute(
+            select(func.min(Notification.id), func.max(Notification.id)).where(expired)
+        ).one()
+    if first_id is None:
+        return 0
+    
+    deleted = 0
+    for start in range(first_id, last_id + 1, batch_size):
+        with bind.begin() as connection:
+            deleted += connection.execute(
+                delete(Notification).where(
+                    Notification.id >= start,
+                    Notification.id < start + batch_size,
+                    expired
+                )
+            ).rowcount
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Delete notifications past their retention period")
+    parser.add_argument(
+        "--read-days", type=int, default=settings.NOTIFICATION_RETENTION_READ_DAYS,
+        help="keep read notifications for this many days"
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+        help="keep any notification for at most this many days"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.NOTIFICATION_PURGE_BATCH_SIZE,
+        help="width of each id range deleted in one transaction"
+    )
+    parser.add_argument(
+        "--pause", type=float, default=0.0,
+        help="seconds to sleep between batches"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be deleted")
+    args = parser.parse_args(argv)
+    
+    count = purge_notifications(
+        engine,
+        read_days=args.read_days,
+        retention_days=args.retention_days,
+        batch_size=args.batch_size,
+        pause=args.pause,
+        dry_run=args.dry_run
+    )
+    print(f"{'Would delete' if args.dry_run else 'Deleted'} {count} notification(s)")
+
+
+if __name__ == "__main__":
+    main()
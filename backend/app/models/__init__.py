@@ -3,9 +3,9 @@ from app.models.student import Student
 from app.models.professor import Professor
 from app.models.research import ResearchPaper, research_professors, research_team_members
 from app.models.group import Group, GroupMember, GroupInvitation, GroupJoinRequest, group_mentors
-from app.models.notification import Notification
+from app.models.notification import Announcement, Notification, NotificationCounter, NotificationOutbox
 from app.models.mentorship_request import MentorshipRequest
-from app.models.chat import GroupChatMessage, MessageReadStatus
+from app.models.chat import GroupChatMessage, GroupReadCursor
 
 __all__ = [
     "User",
@@ -21,7 +21,10 @@ __all__ = [
     "GroupJoinRequest",
     "group_mentors",
     "Notification",
+    "NotificationCounter",
+    "NotificationOutbox",
+    "Announcement",
     "MentorshipRequest",
     "GroupChatMessage", 
-    "MessageReadStatus",
+    "GroupReadCursor",
 ]
\ No newline at end of file
@@ -1,34 +1,58 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import event, Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index, Computed, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.maintenance.chat_partitions import ensure_partitions
 
 
 class GroupChatMessage(Base):
     __tablename__ = "group_chat_messages"
+    __table_args__ = (
+        # Monthly range partitions on created_at (see app.maintenance.chat_partitions),
+        # so the partition key has to be part of the primary key
+        PrimaryKeyConstraint("id", "created_at"),
+        # Keyset pagination over a group's history walks this index
+        Index("ix_group_chat_messages_group_id_id", "group_id", "id"),
+        Index("ix_group_chat_messages_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # Ids are still unique (one sequence), so the ORM identifies rows by id alone
+    __mapper_args__ = {"primary_key": ["id"]}
     
-    id = Column(Integer, primary_key=True, index=True)
-    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, autoincrement=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
     sender_id = Column(Integer, nullable=False)  # ID of student or professor
     sender_type = Column(String, nullable=False)  # 'student' or 'professor'
     message = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     edited_at = Column(DateTime(timezone=True), nullable=True)
     is_deleted = Column(Boolean, default=False)
+    # Full-text search document, maintained by Postgres
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('simple', message)", persisted=True))
     
     # Relationships
     group = relationship("Group")
-    read_status = relationship("MessageReadStatus", back_populates="message", cascade="all, delete-orphan")
 
 
-class MessageReadStatus(Base):
-    __tablename__ = "message_read_status"
+@event.listens_for(GroupChatMessage.__table__, "after_create")
+def _create_initial_partitions(target, connection, **kw):
+    """A partitioned table accepts no rows until its partitions exist"""
+    ensure_partitions(connection)
+
+
+class GroupReadCursor(Base):
+    """
+    Per-member read watermark for a group chat.
+    Every message with id <= last_read_message_id counts as read by the user.
+    """
+    __tablename__ = "group_read_cursors"
     
-    id = Column(Integer, primary_key=True)
-    message_id = Column(Integer, ForeignKey("group_chat_messages.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    read_at = Column(DateTime(timezone=True), server_default=func.now())
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_read_message_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    message = relationship("GroupChatMessage", back_populates="read_status")
-    user = relationship("User")
\ No newline at end of file
+    group = relationship("Group")
+    user = relationship("User")
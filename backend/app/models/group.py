@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, ARRAY, Boolean, DateTime, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, ARRAY, Boolean, DateTime, Table, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,11 +8,28 @@ group_mentors = Table(
     Base.metadata,
     Column('group_id', Integer, ForeignKey('groups.id', ondelete='CASCADE')),
     Column('professor_id', Integer, ForeignKey('professors.id', ondelete='CASCADE')),
-    Column('assigned_at', DateTime(timezone=True), server_default=func.now())
+    Column('assigned_at', DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint('group_id', 'professor_id', name='uq_group_mentors_group_professor')
 )
 
 class Group(Base):
     __tablename__ = "groups"
+    __table_args__ = (
+        # Skill search: needed_skills && :skills (see crud.group.search_group_cards)
+        Index("ix_groups_needed_skills", "needed_skills", postgresql_using="gin"),
+        # Same over groups with free seats, which is what search looks at by default
+        Index(
+            "ix_groups_needed_skills_open",
+            "needed_skills",
+            postgresql_using="gin",
+            postgresql_where=text("current_members < max_members")
+        ),
+        Index(
+            "ix_groups_open_has_mentor",
+            "has_mentor", "id",
+            postgresql_where=text("current_members < max_members")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
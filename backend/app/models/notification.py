@@ -1,17 +1,54 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import event, text, DDL, Index, Column, Integer, String, ForeignKey, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.models.user import UserRole
+
+# Requests answered from the bell through related_request_id. A recipient has
+# at most one pending per group, so there is nothing to coalesce and their rows
+# are left alone. Join requests are coalesced like everything else: the row
+# keeps every request id in request_ids.
+UNCOALESCED_NOTIFICATION_TYPES = ("group_invitation", "mentorship_request")
+
+# Rows eligible for coalescing: unread and about a group
+COALESCING_PREDICATE = text(
+    "read = false AND related_group_id IS NOT NULL AND type NOT IN ("
+    + ", ".join(f"'{notification_type}'" for notification_type in UNCOALESCED_NOTIFICATION_TYPES)
+    + ")"
+)
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination of a user's feed, newest first (see get_my_notifications)
+        Index("ix_notifications_user_id_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+        # Same order over unread notifications only; stays small as users read
+        Index(
+            "ix_notifications_user_id_unread",
+            "user_id", text("created_at DESC"), text("id DESC"),
+            postgresql_where=text("read = false")
+        ),
+        # At most one unread notification per event type and group: repeats are
+        # merged into it by the dispatcher (see app.services.notifications)
+        Index(
+            "uq_notifications_unread_group_event",
+            "user_id", "type", "related_group_id",
+            unique=True,
+            postgresql_where=COALESCING_PREDICATE
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     type = Column(String)
-    title = Column(String)
-    message = Column(String)
+    # Templated notifications store template_id + params and are rendered on read
+    # (see app.services.notification_templates); title/message are left empty
+    title = Column(String, nullable=True)
+    message = Column(String, nullable=True)
+    template_id = Column(String, nullable=True)
+    params = Column(JSONB, nullable=True)
     link = Column(String, nullable=True)
     read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -21,7 +58,128 @@ class Notification(Base):
     related_student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=True)
     related_request_id = Column(Integer, nullable=True)  # For storing join request ID or other request IDs
     
+    # Coalescing: how many events this row stands for, and the students behind the latest few
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    actor_ids = Column(ARRAY(Integer), nullable=True)
+    # Every related_request_id merged into the row, oldest first; a coalesced
+    # join_request row is answered one request at a time from this list
+    request_ids = Column(ARRAY(Integer), nullable=True)
+    
     # Relationships
     user = relationship("User")
     group = relationship("Group")
-    student = relationship("Student")
\ No newline at end of file
+    student = relationship("Student")
+
+
+class NotificationCounter(Base):
+    """
+    Per-user unread notification count.
+    Maintained by triggers on notifications (see NOTIFICATION_COUNTER_TRIGGERS),
+    and corrected by `python -m app.maintenance.notification_counters`.
+    Also holds the user's announcement watermark: announcements with a higher
+    id are unread (see app.services.announcements).
+    """
+    __tablename__ = "notification_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_seen_announcement_id = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+# Statement-level triggers with transition tables, so a batch of notifications
+# inserted or marked read in one statement costs one counter update per user.
+NOTIFICATION_COUNTER_TRIGGERS = """
+CREATE OR REPLACE FUNCTION notification_counters_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, count(*) FROM new_rows
+        WHERE user_id IS NOT NULL AND NOT coalesce(read, false)
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_counters.unread_count + EXCLUDED.unread_count;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, sum(delta) FROM (
+            SELECT user_id, 1 AS delta FROM new_rows WHERE NOT coalesce(read, false)
+            UNION ALL
+            SELECT user_id, -1 AS delta FROM old_rows WHERE NOT coalesce(read, false)
+        ) changes
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        HAVING sum(delta) <> 0
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_counters.unread_count + EXCLUDED.unread_count;
+    ELSE
+        UPDATE notification_counters
+        SET unread_count = notification_counters.unread_count - removed.unread
+        FROM (
+            SELECT user_id, count(*) AS unread FROM old_rows
+            WHERE NOT coalesce(read, false)
+            GROUP BY user_id
+        ) removed
+        WHERE notification_counters.user_id = removed.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notification_counters_insert
+AFTER INSERT ON notifications REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+CREATE TRIGGER notification_counters_update
+AFTER UPDATE ON notifications REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+CREATE TRIGGER notification_counters_delete
+AFTER DELETE ON notifications REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+"""
+
+event.listen(Notification.__table__, "after_create", DDL(NOTIFICATION_COUNTER_TRIGGERS))
+
+
+class NotificationOutbox(Base):
+    """
+    Notifications waiting to be delivered.
+    Rows are written in the same transaction as the change that triggers them
+    and moved into notifications by app.services.notifications' dispatcher.
+    """
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String)
+    title = Column(String, nullable=True)
+    message = Column(String, nullable=True)
+    template_id = Column(String, nullable=True)
+    params = Column(JSONB, nullable=True)
+    link = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    related_group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=True)
+    related_student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=True)
+    related_request_id = Column(Integer, nullable=True)
+
+
+class Announcement(Base):
+    """
+    A platform-wide broadcast, stored once and merged into every matching
+    user's feed on read. Each target column narrows the audience; NULL
+    matches everyone.
+    """
+    __tablename__ = "announcements"
+    __table_args__ = (
+        Index("ix_announcements_created_at_id", text("created_at DESC"), text("id DESC")),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    link = Column(String, nullable=True)
+    target_role = Column(SQLEnum(UserRole), nullable=True)
+    target_faculty = Column(String, nullable=True)
+    target_year = Column(String, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
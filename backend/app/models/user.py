@@ -18,6 +18,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     name = Column(String, nullable=False)
     role = Column(SQLEnum(UserRole), nullable=False)
+    # Bitmask of muted notification types (see app.services.notification_preferences)
+    muted_notification_types = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     student = relationship(
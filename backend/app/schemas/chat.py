@@ -40,6 +40,11 @@ class ChatMessageWithDetails(ChatMessage):
         from_attributes = True
 
 
+class ChatSearchResult(ChatMessage):
+    rank: float
+    snippet: str  # Matching fragments with terms wrapped in <mark></mark>
+
+
 class UnreadCountResponse(BaseModel):
     group_id: int
     unread_count: int
\ No newline at end of file
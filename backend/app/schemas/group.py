@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from app.schemas.mentorship import MentorshipRequest
 
 
 class MentorBase(BaseModel):
@@ -45,6 +46,15 @@ class Group(GroupBase):
         from_attributes = True
 
 
+class GroupSearchResult(Group):
+    # How many of the group's needed skills the searching student has
+    skill_match: int = 0
+
+
+class GroupRecommendation(GroupSearchResult):
+    score: float
+
+
 class GroupMemberBase(BaseModel):
     group_id: int
     student_id: int
@@ -93,4 +103,16 @@ class GroupJoinRequest(GroupJoinRequestBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class GroupWorkspace(BaseModel):
+    """Everything the group page needs, in one response"""
+    group: Group
+    members: List[GroupMember]
+    is_leader: bool
+    # None when the user has no access to the group chat
+    chat_unread_count: Optional[int] = None
+    # Leader only (mentorship requests also for admins); None when not visible
+    join_requests: Optional[List[GroupJoinRequest]] = None
+    mentorship_requests: Optional[List[MentorshipRequest]] = None
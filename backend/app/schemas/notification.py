@@ -1,12 +1,13 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from app.models.user import UserRole
 
 
 class NotificationBase(BaseModel):
     type: str
-    title: str
-    message: str
+    title: Optional[str] = None
+    message: Optional[str] = None
     link: Optional[str] = None
     related_group_id: Optional[int] = None
     related_student_id: Optional[int] = None
@@ -15,6 +16,9 @@ class NotificationBase(BaseModel):
 
 class NotificationCreate(NotificationBase):
     user_id: int
+    # Rendered on read by app.services.notification_templates instead of storing title/message
+    template_id: Optional[str] = None
+    params: Optional[dict] = None
 
 
 class Notification(NotificationBase):
@@ -22,11 +26,48 @@ class Notification(NotificationBase):
     user_id: int
     read: bool
     created_at: datetime
+    occurrence_count: int = 1
+    actor_ids: Optional[List[int]] = None
+    request_ids: Optional[List[int]] = None
+    # "announcement" for broadcasts merged into the feed; their id is the
+    # negated announcement id, so it never collides with a notification id
+    source: str = "notification"
+    
+    class Config:
+        from_attributes = True
+
+
+class AnnouncementCreate(BaseModel):
+    title: str
+    message: str
+    link: Optional[str] = None
+    target_role: Optional[UserRole] = None
+    target_faculty: Optional[str] = None
+    target_year: Optional[str] = None
+
+
+class Announcement(AnnouncementCreate):
+    id: int
+    created_by: Optional[int] = None
+    created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class AnnouncementMarkSeen(BaseModel):
+    # Everything up to this announcement is marked seen; omit it to mark all seen
+    announcement_id: Optional[int] = None
+
+
+class NotificationPreferences(BaseModel):
+    muted_types: List[str]
+
+
+class NotificationPreferencesResponse(NotificationPreferences):
+    available_types: List[str]
+
+
 class NotificationMarkRead(BaseModel):
     notification_ids: list[int]
 
@@ -34,6 +75,8 @@ class NotificationMarkRead(BaseModel):
 class GroupJoinRequestAction(BaseModel):
     notification_id: int
     action: str  # "accept" or "reject"
+    # One of the notification's request_ids; defaults to the oldest still pending
+    request_id: Optional[int] = None
 
 
 class GroupInvitationAction(BaseModel):
@@ -40,4 +40,10 @@ class StudentWithUser(Student):
     email: str
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class StudentRecommendation(StudentWithUser):
+    score: float
+    # How many of the group's needed skills the student has
+    skill_match: int = 0
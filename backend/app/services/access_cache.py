@@ -0,0 +1,151 @@
+"""
+TTL cache of chat group access decisions keyed by (user_id, group_id).
+
+Entries are dropped explicitly whenever group membership or mentorship
+changes, both in the worker that made the change and, through the event
+bus, in every other worker. The TTL bounds staleness for anything missed.
+
+A lookup that started before an invalidation must not store its (possibly
+stale) result after it: callers take version() before resolving access and
+pass it to set(), which ignores results older than the group's last
+invalidation.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.services import event_bus
+
+
+class GroupAccessCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[int, int], Tuple[float, tuple]] = {}
+        self._users_by_group: Dict[int, Set[int]] = defaultdict(set)
+        # Bumped by every invalidation; groups remember the version that last invalidated them
+        self._version = 0
+        self._invalidated_at: Dict[int, int] = {}
+        self._user_invalidated_at: Dict[int, int] = {}
+        self._cleared_at = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, user_id: int, group_id: int) -> Optional[tuple]:
+        """Return the cached (has_access, user_type, user_profile_id) or None on a miss"""
+        key = (user_id, group_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+    
+    def version(self) -> int:
+        """Take before resolving access and hand to set() along with the result"""
+        with self._lock:
+            return self._version
+    
+    def set(self, user_id: int, group_id: int, access: tuple, version: int) -> None:
+        """Cache a decision resolved after `version` was taken, unless its group or user was invalidated since"""
+        now = time.monotonic()
+        with self._lock:
+            if version < max(
+                self._cleared_at,
+                self._invalidated_at.get(group_id, 0),
+                self._user_invalidated_at.get(user_id, 0),
+            ):
+                return
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired(now)
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                    self._users_by_group.clear()
+            self._entries[(user_id, group_id)] = (now + self.ttl_seconds, access)
+            self._users_by_group[group_id].add(user_id)
+    
+    def invalidate_group(self, group_id: int) -> None:
+        """Forget every cached decision for a group"""
+        with self._lock:
+            for user_id in self._users_by_group.pop(group_id, ()):
+                self._entries.pop((user_id, group_id), None)
+            self._version += 1
+            self._invalidated_at[group_id] = self._version
+            self.invalidations += 1
+    
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget every cached decision for a user, e.g. once their account is deleted"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                self._discard(key)
+            self._version += 1
+            self._user_invalidated_at[user_id] = self._version
+            self.invalidations += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._users_by_group.clear()
+            self._version += 1
+            self._cleared_at = self._version
+            self._invalidated_at.clear()
+            self._user_invalidated_at.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+    
+    def _discard(self, key: Tuple[int, int]) -> None:
+        self._entries.pop(key, None)
+        user_id, group_id = key
+        users = self._users_by_group.get(group_id)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self._users_by_group[group_id]
+    
+    def _evict_expired(self, now: float) -> None:
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            self._discard(key)
+
+
+group_access_cache = GroupAccessCache(
+    ttl_seconds=settings.CHAT_ACCESS_CACHE_TTL_SECONDS,
+    max_entries=settings.CHAT_ACCESS_CACHE_MAX_ENTRIES,
+)
+
+
+def _invalidate_from_event(event: dict) -> None:
+    group_access_cache.invalidate_group(event["group_id"])
+
+
+def _invalidate_deleted_user(event: dict) -> None:
+    # A deleted student's memberships go with the row without a group.member_removed
+    # for each group, so drop everything cached for the user instead
+    if event.get("user_id") is not None:
+        group_access_cache.invalidate_user(event["user_id"])
+
+
+def _invalidate_on_mentor_change(event: dict) -> None:
+    if event.get("status") == "accepted":
+        group_access_cache.invalidate_group(event["group_id"])
+
+
+for _event_type in ("group.member_added", "group.member_removed", "group.deleted"):
+    event_bus.subscribe(_event_type, _invalidate_from_event)
+event_bus.subscribe("mentorship.request_updated", _invalidate_on_mentor_change)
+event_bus.subscribe("student.deleted", _invalidate_deleted_user)
@@ -0,0 +1,175 @@
+"""
+Platform announcements, fanned out on read.
+
+A broadcast is stored once in announcements with a targeting predicate
+(role, faculty, year; NULL matches everyone) instead of as one notification
+per recipient. Each user's notification_counters row carries a
+last_seen_announcement_id watermark: matching announcements above it are
+unread. The feed and the unread count merge announcements in when they are
+read, so a broadcast costs one row whatever the size of its audience.
+
+In the feed an announcement carries its negated id, so feed ids never
+collide with notification ids and the id endpoints can tell them apart.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.notification import Announcement, NotificationCounter
+from app.models.professor import Professor
+from app.models.student import Student
+from app.models.user import User, UserRole
+from app.schemas.notification import AnnouncementCreate, Notification
+from app.services import event_bus
+
+
+def audience_filter(db: Session, user: User) -> list:
+    """Conditions selecting the announcements addressed to a user"""
+    faculty = year = None
+    if user.role == UserRole.STUDENT:
+        profile = db.query(Student.faculty, Student.year).filter(Student.user_id == user.id).first()
+        if profile:
+            faculty, year = profile
+    elif user.role == UserRole.PROFESSOR:
+        faculty = db.query(Professor.faculty).filter(Professor.user_id == user.id).scalar()
+    
+    return [
+        or_(Announcement.target_role.is_(None), Announcement.target_role == user.role),
+        or_(Announcement.target_faculty.is_(None), Announcement.target_faculty == faculty),
+        or_(Announcement.target_year.is_(None), Announcement.target_year == year),
+    ]
+
+
+def get_counter(db: Session, user_id: int) -> Tuple[int, int]:
+    """The user's (unread notification count, last seen announcement id)"""
+    row = db.query(
+        NotificationCounter.unread_count,
+        NotificationCounter.last_seen_announcement_id
+    ).filter(NotificationCounter.user_id == user_id).first()
+    return (row.unread_count, row.last_seen_announcement_id) if row else (0, 0)
+
+
+def count_unseen(db: Session, audience: list, last_seen: int) -> int:
+    return db.query(func.count(Announcement.id)).filter(
+        Announcement.id > last_seen,
+        *audience
+    ).scalar()
+
+
+def get_feed_page(
+    db: Session,
+    audience: list,
+    last_seen: int,
+    limit: int,
+    before: Optional[tuple] = None,
+    unread_only: bool = False
+) -> List[Announcement]:
+    """Announcements for a user, newest first, keyset-paged on (created_at, id)"""
+    query = db.query(Announcement).filter(*audience)
+    if unread_only:
+        query = query.filter(Announcement.id > last_seen)
+    if before is not None:
+        query = query.filter(tuple_(Announcement.created_at, Announcement.id) < before)
+    return query.order_by(
+        Announcement.created_at.desc(),
+        Announcement.id.desc()
+    ).limit(limit).all()
+
+
+def feed_id(announcement_id: int) -> int:
+    return -announcement_id
+
+
+def is_feed_id(notification_id: int) -> bool:
+    """Whether a feed id belongs to an announcement rather than a notification"""
+    return notification_id < 0
+
+
+def as_notification(announcement: Announcement, user_id: int, last_seen: int) -> dict:
+    """Serialize an announcement as a feed entry"""
+    return Notification(
+        id=feed_id(announcement.id),
+        user_id=user_id,
+        type="announcement",
+        title=announcement.title,
+        message=announcement.message,
+        link=announcement.link,
+        read=announcement.id <= last_seen,
+        created_at=announcement.created_at,
+        source="announcement"
+    ).model_dump(mode="json")
+
+
+def mark_seen(db: Session, user_id: int, announcement_id: Optional[int] = None) -> int:
+    """
+    Move the user's watermark up to announcement_id (or the newest announcement).
+    The watermark never moves back. Returns the resulting watermark.
+    """
+    if announcement_id is None:
+        announcement_id = db.query(func.max(Announcement.id)).scalar() or 0
+    
+    stmt = insert(NotificationCounter).values(user_id=user_id, last_seen_announcement_id=announcement_id)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "last_seen_announcement_id": func.greatest(
+                NotificationCounter.last_seen_announcement_id,
+                stmt.excluded.last_seen_announcement_id
+            )
+        }
+    ).returning(NotificationCounter.last_seen_announcement_id)
+    last_seen = db.execute(stmt).scalar()
+    db.commit()
+    return last_seen
+
+
+def mark_feed_entries_seen(db: Session, user: User, feed_ids: Iterable[int]) -> bool:
+    """
+    Mark announcements seen from their feed ids. The watermark moves up to the
+    newest of them addressed to the user, so older ones are marked seen too.
+    Returns False when none of the ids is such an announcement.
+    """
+    announcement_ids = [-entry_id for entry_id in feed_ids if is_feed_id(entry_id)]
+    if not announcement_ids:
+        return False
+    
+    newest = db.query(func.max(Announcement.id)).filter(
+        Announcement.id.in_(announcement_ids),
+        *audience_filter(db, user)
+    ).scalar()
+    if newest is None:
+        return False
+    mark_seen(db, user.id, newest)
+    return True
+
+
+def create_announcement(db: Session, announcement: AnnouncementCreate, created_by: int) -> Announcement:
+    db_announcement = Announcement(**announcement.model_dump(), created_by=created_by)
+    db.add(db_announcement)
+    db.flush()
+    event_bus.emit(db, "announcement.created", id=db_announcement.id)
+    db.commit()
+    db.refresh(db_announcement)
+    return db_announcement
+
+
+def audience_user_ids(db: Session, announcement: Announcement, user_ids: Iterable[int]) -> List[int]:
+    """Which of the given users an announcement is addressed to"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    
+    query = db.query(User.id).outerjoin(
+        Student, Student.user_id == User.id
+    ).outerjoin(
+        Professor, Professor.user_id == User.id
+    ).filter(User.id.in_(user_ids))
+    if announcement.target_role is not None:
+        query = query.filter(User.role == announcement.target_role)
+    if announcement.target_faculty is not None:
+        query = query.filter(func.coalesce(Student.faculty, Professor.faculty) == announcement.target_faculty)
+    if announcement.target_year is not None:
+        query = query.filter(Student.year == announcement.target_year)
+    return [user_id for user_id, in query.all()]
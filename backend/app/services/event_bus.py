@@ -0,0 +1,117 @@
+"""
+Cross-worker domain events over Postgres LISTEN/NOTIFY.
+
+Writers call emit() inside their transaction; Postgres only delivers the
+notification once that transaction commits, and drops it on rollback. Every
+worker runs one listener thread on a dedicated connection and dispatches
+incoming events to the handlers registered with subscribe().
+"""
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "app_events"
+
+EventHandler = Callable[[dict], None]
+
+_handlers: Dict[str, List[EventHandler]] = defaultdict(list)
+
+
+def emit(db: Session, event_type: str, **data) -> None:
+    """
+    Queue a domain event in the caller's transaction.
+    Keep payloads to ids and small scalars; NOTIFY payloads are capped at 8000 bytes.
+    """
+    payload = json.dumps({"type": event_type, **data}, default=str)
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+def subscribe(event_type: str, handler: EventHandler) -> None:
+    """Register a handler for an event type in this worker"""
+    _handlers[event_type].append(handler)
+
+
+def dispatch(event: dict) -> None:
+    """Run the handlers registered for an event; a failing handler does not affect the others"""
+    for handler in list(_handlers.get(event.get("type"), ())):
+        try:
+            handler(event)
+        except Exception:
+            logger.exception("Event handler %r failed for %s", handler, event.get("type"))
+
+
+class EventListener(threading.Thread):
+    """Background thread that LISTENs on the event channel and dispatches notifications"""
+    
+    def __init__(self, poll_interval: float = 1.0, reconnect_delay: float = 5.0):
+        super().__init__(name="event-bus-listener", daemon=True)
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._stopped = threading.Event()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+    
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Event bus listener failed; reconnecting")
+                self._stopped.wait(self.reconnect_delay)
+    
+    def _listen(self) -> None:
+        # A dedicated connection, detached from the pool so it is never handed
+        # to a request while it is LISTENing
+        connection = engine.raw_connection()
+        connection.detach()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notification = dbapi_connection.notifies.pop(0)
+                    try:
+                        event = json.loads(notification.payload)
+                    except ValueError:
+                        logger.warning("Ignoring malformed event payload: %r", notification.payload)
+                        continue
+                    dispatch(event)
+        finally:
+            connection.close()
+
+
+_listener: Optional[EventListener] = None
+
+
+def start_listener() -> None:
+    """Start this worker's listener thread"""
+    global _listener
+    if _listener is None:
+        _listener = EventListener()
+        _listener.start()
+
+
+def stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=5)
+        _listener = None
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Set
+
+from app.config import settings
+
+
+class SlowConsumerError(Exception):
+    """Raised to a subscriber whose queue overflowed and lost events"""
+
+
+_OVERFLOW = object()
+
+
+class Subscription:
+    """
+    A single consumer of an EventHub topic.
+    Events are buffered in a bounded queue owned by the consumer's event loop.
+    """
+    
+    def __init__(self, key: Hashable, loop: asyncio.AbstractEventLoop, max_queue_size: int):
+        self.key = key
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+    
+    def _offer(self, event: Any) -> None:
+        """Enqueue an event; runs on the subscriber's loop"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The consumer cannot keep up. Drop what is buffered and leave a
+            # marker so it disconnects and resyncs instead of silently
+            # missing events.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_OVERFLOW)
+    
+    async def get(self) -> Any:
+        """Wait for the next event. Raises SlowConsumerError after an overflow."""
+        event = await self.queue.get()
+        if event is _OVERFLOW:
+            raise SlowConsumerError()
+        return event
+
+
+class EventHub:
+    """
+    In-process publish/subscribe hub keyed by topic (e.g. a group id).
+    publish() is thread-safe, so sync endpoints running in the threadpool can
+    push to subscribers waiting on the event loop.
+    """
+    
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscriptions: Dict[Hashable, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def subscribe(self, key: Hashable) -> Subscription:
+        """Register a subscriber for a topic. Must be called from a running event loop."""
+        subscription = Subscription(key, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscriptions[key].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.key]
+    
+    def has_subscribers(self, key: Hashable) -> bool:
+        with self._lock:
+            return bool(self._subscriptions.get(key))
+    
+    def subscribed_keys(self) -> List[Hashable]:
+        """Topics that currently have at least one subscriber in this process"""
+        with self._lock:
+            return list(self._subscriptions)
+    
+    def publish(self, key: Hashable, event: Any) -> int:
+        """Deliver an event to every subscriber of a topic and return how many were reached"""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(key, ()))
+        
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+
+chat_hub = EventHub(max_queue_size=settings.CHAT_WS_QUEUE_SIZE)
+notification_hub = EventHub(max_queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
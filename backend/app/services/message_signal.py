@@ -0,0 +1,82 @@
+"""
+Wake-up signal for long-poll chat clients.
+
+Each group with parked waiters gets an asyncio.Condition. Writers record the
+newest message id per group and notify the condition, so idle waiters cost a
+coroutine and no database queries until something actually arrives.
+"""
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from app.services import event_bus
+
+
+class MessageSignal:
+    def __init__(self):
+        self._latest: Dict[int, int] = {}
+        self._conditions: Dict[int, asyncio.Condition] = {}
+        self._waiters: Dict[int, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+    
+    def notify(self, group_id: int, message_id: int) -> None:
+        """Record a new message and wake the group's waiters. Safe to call from any thread."""
+        with self._lock:
+            if message_id <= self._latest.get(group_id, 0):
+                return
+            self._latest[group_id] = message_id
+            condition = self._conditions.get(group_id)
+            loop = self._loop
+        
+        if condition is not None and loop is not None:
+            loop.call_soon_threadsafe(lambda: loop.create_task(self._wake(condition)))
+    
+    def latest(self, group_id: int) -> int:
+        """Newest message id signalled for the group so far, 0 if none"""
+        with self._lock:
+            return self._latest.get(group_id, 0)
+    
+    async def wait_for_message(self, group_id: int, after_id: int, timeout: float) -> bool:
+        """
+        Park until a message newer than after_id is signalled for the group.
+        Returns False if the timeout expires first.
+        """
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            condition = self._conditions.get(group_id)
+            if condition is None:
+                condition = self._conditions[group_id] = asyncio.Condition()
+            self._waiters[group_id] = self._waiters.get(group_id, 0) + 1
+        
+        try:
+            async with condition:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: self._latest.get(group_id, 0) > after_id),
+                    timeout
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters[group_id] -= 1
+                if not self._waiters[group_id]:
+                    del self._waiters[group_id]
+                    del self._conditions[group_id]
+    
+    @staticmethod
+    async def _wake(condition: asyncio.Condition) -> None:
+        async with condition:
+            condition.notify_all()
+
+
+message_signal = MessageSignal()
+
+
+def _signal_from_event(event: dict) -> None:
+    message_signal.notify(event["group_id"], event["message_id"])
+
+
+# Messages written by other workers arrive through the event bus
+event_bus.subscribe("chat.message_created", _signal_from_event)
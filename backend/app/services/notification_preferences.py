@@ -0,0 +1,132 @@
+"""
+Per-user notification mute preferences.
+
+Each known notification type owns one bit; a user's muted types are stored
+as a bitmask in users.muted_notification_types. Masks are cached per worker
+so enqueue() can drop muted notifications without touching the database,
+and are invalidated through the event bus whenever a user changes them.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.services import event_bus
+
+# Bit positions are persisted: only ever append to this tuple
+NOTIFICATION_TYPES = (
+    "group_invitation",
+    "invitation_accepted",
+    "invitation_rejected",
+    "join_request",
+    "join_request_accepted",
+    "join_request_rejected",
+    "mentorship_request",
+    "mentorship_accepted",
+    "mentorship_rejected",
+)
+
+_TYPE_BITS = {notification_type: 1 << bit for bit, notification_type in enumerate(NOTIFICATION_TYPES)}
+
+
+def mask_from_types(notification_types: Iterable[str]) -> int:
+    """Bitmask for the given types; raises ValueError for an unknown type"""
+    mask = 0
+    for notification_type in notification_types:
+        if notification_type not in _TYPE_BITS:
+            raise ValueError(f"Unknown notification type: {notification_type}")
+        mask |= _TYPE_BITS[notification_type]
+    return mask
+
+
+def types_from_mask(mask: int) -> List[str]:
+    return [notification_type for notification_type in NOTIFICATION_TYPES if mask & _TYPE_BITS[notification_type]]
+
+
+class MutePreferenceCache:
+    """TTL cache of muted-type bitmasks keyed by user id"""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+    
+    def set(self, user_id: int, mask: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                    del self._entries[key]
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user_id] = (now + self.ttl_seconds, mask)
+    
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+mute_cache = MutePreferenceCache(
+    ttl_seconds=settings.NOTIFICATION_PREFERENCE_CACHE_TTL_SECONDS,
+    max_entries=settings.NOTIFICATION_PREFERENCE_CACHE_MAX_ENTRIES,
+)
+
+
+def get_muted_mask(db: Session, user_id: int) -> int:
+    """The user's muted-type bitmask, from the cache when possible"""
+    mask = mute_cache.get(user_id)
+    if mask is None:
+        mask = db.query(User.muted_notification_types).filter(User.id == user_id).scalar() or 0
+        mute_cache.set(user_id, mask)
+    return mask
+
+
+def is_muted(db: Session, user_id: int, notification_type: str) -> bool:
+    """Whether the user has muted this type; unknown types are never muted"""
+    bit = _TYPE_BITS.get(notification_type)
+    if bit is None:
+        return False
+    return bool(get_muted_mask(db, user_id) & bit)
+
+
+def set_muted_types(db: Session, user: User, notification_types: Iterable[str]) -> List[str]:
+    """Replace a user's muted types and invalidate the cached mask in every worker"""
+    mask = mask_from_types(notification_types)
+    user.muted_notification_types = mask
+    event_bus.emit(db, "notification.preferences_updated", user_id=user.id)
+    db.commit()
+    mute_cache.invalidate(user.id)
+    return types_from_mask(mask)
+
+
+def _invalidate_from_event(event: dict) -> None:
+    mute_cache.invalidate(event["user_id"])
+
+
+event_bus.subscribe("notification.preferences_updated", _invalidate_from_event)
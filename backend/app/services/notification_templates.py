@@ -0,0 +1,126 @@
+"""
+Notification templates rendered on read.
+
+Notifications store a template id and a small params blob instead of
+rendered text. The group and student come from the row's related_group_id
+and related_student_id; params carry anything else (a status, a professor
+id). Names are looked up when the notification is read, in one batched
+query per entity type, so renamed users and groups show up everywhere.
+Rows without a template id (written before templates existed) keep their
+stored title and message.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.group import Group
+from app.models.notification import Notification as NotificationModel
+from app.models.professor import Professor
+from app.models.student import Student
+from app.models.user import User
+from app.schemas.notification import Notification
+
+# template id -> format strings. Placeholders: {student}, {group}, {professor},
+# {status}, {Status} and {others} (further occurrences merged into the row).
+# "message_many" is used instead of "message" once occurrences have been merged.
+TEMPLATES: Dict[str, Dict[str, str]] = {
+    "group_invitation": {
+        "title": "Group Invitation",
+        "message": "You've been invited to join {group}",
+    },
+    "invitation_response": {
+        "title": "Invitation {Status}",
+        "message": "{student} has {status} your invitation to join {group}",
+        "message_many": "{student} and {others} other(s) have {status} your invitation to join {group}",
+    },
+    "join_request": {
+        "title": "New Join Request",
+        "message": "{student} wants to join {group}",
+        "message_many": "{student} and {others} other(s) want to join {group}",
+    },
+    "join_request_response": {
+        "title": "Join Request {Status}",
+        "message": "Your request to join {group} has been {status}",
+    },
+    "mentorship_request": {
+        "title": "New Mentorship Request",
+        "message": "{student} has requested you to mentor their group '{group}'",
+    },
+    "mentorship_response": {
+        "title": "Mentorship Request {Status}",
+        "message": "Professor {professor} has {status} your mentorship request for '{group}'",
+    },
+}
+
+UNKNOWN_NAMES = {"student": "Someone", "group": "a group", "professor": "a professor"}
+
+
+class _Placeholders(dict):
+    """Leaves unknown placeholders visible instead of failing the whole page"""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _user_names(db: Session, profile_model, ids: Set[int]) -> Dict[int, str]:
+    """Names of the users behind student or professor ids, in one query"""
+    if not ids:
+        return {}
+    return dict(db.query(profile_model.id, User.name).join(
+        User, User.id == profile_model.user_id
+    ).filter(profile_model.id.in_(ids)).all())
+
+
+def _group_names(db: Session, ids: Set[int]) -> Dict[int, str]:
+    if not ids:
+        return {}
+    return dict(db.query(Group.id, Group.name).filter(Group.id.in_(ids)).all())
+
+
+def render(template_id: str, params: Optional[dict], occurrence_count: int, names: dict) -> Optional[tuple]:
+    """Render (title, message) for a template, or None for an unknown template"""
+    template = TEMPLATES.get(template_id)
+    if template is None:
+        return None
+    
+    status = (params or {}).get("status", "")
+    placeholders = _Placeholders(names, status=status, Status=status.capitalize(), others=occurrence_count - 1)
+    message = template.get("message_many") if occurrence_count > 1 else None
+    return (
+        template["title"].format_map(placeholders),
+        (message or template["message"]).format_map(placeholders)
+    )
+
+
+def render_notifications(db: Session, notifications: Iterable[NotificationModel]) -> List[dict]:
+    """Serialize notifications with their title and message rendered from current names"""
+    notifications = list(notifications)
+    student_ids, group_ids, professor_ids = set(), set(), set()
+    for notification in notifications:
+        if not notification.template_id:
+            continue
+        if notification.related_student_id:
+            student_ids.add(notification.related_student_id)
+        if notification.related_group_id:
+            group_ids.add(notification.related_group_id)
+        if (notification.params or {}).get("professor_id"):
+            professor_ids.add(notification.params["professor_id"])
+    
+    students = _user_names(db, Student, student_ids)
+    groups = _group_names(db, group_ids)
+    professors = _user_names(db, Professor, professor_ids)
+    
+    rendered = []
+    for notification in notifications:
+        data = Notification.model_validate(notification).model_dump(mode="json")
+        if notification.template_id:
+            names = {
+                "student": students.get(notification.related_student_id, UNKNOWN_NAMES["student"]),
+                "group": groups.get(notification.related_group_id, UNKNOWN_NAMES["group"]),
+                "professor": professors.get((notification.params or {}).get("professor_id"), UNKNOWN_NAMES["professor"]),
+            }
+            text = render(notification.template_id, notification.params, notification.occurrence_count or 1, names)
+            if text is not None:
+                data["title"], data["message"] = text
+        rendered.append(data)
+    return rendered
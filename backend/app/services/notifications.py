@@ -0,0 +1,270 @@
+"""
+Notification delivery through a transactional outbox.
+
+Request handlers call enqueue() to add a notification_outbox row inside their
+own transaction, so a notification exists exactly when the change that caused
+it commits and costs no extra round trip of its own. A dispatcher thread in
+every worker moves outbox rows into notifications in batches. Batches are
+claimed with FOR UPDATE SKIP LOCKED and removed from the outbox in the same
+transaction as the insert, so workers never deliver a row twice and anything
+left behind by a crash is simply picked up again.
+
+Dispatchers take turns under an advisory lock held until their batch commits.
+Notification ids therefore become visible in increasing order, which is what
+lets the SSE stream resume from "id > Last-Event-ID": a lower id can never
+commit after a higher one has been sent.
+"""
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, text, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.group import GroupJoinRequest
+from app.models.notification import UNCOALESCED_NOTIFICATION_TYPES, COALESCING_PREDICATE, Notification, NotificationOutbox
+from app.schemas.notification import NotificationCreate
+from app.services import event_bus, notification_preferences
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLUMNS = (
+    "user_id", "type", "title", "message", "template_id", "params", "link",
+    "related_group_id", "related_student_id", "related_request_id", "created_at"
+)
+
+# How many actor ids a coalesced notification keeps
+ACTOR_SAMPLE_SIZE = 5
+
+# Advisory lock key serialising dispatch across workers (see module docstring)
+DISPATCH_LOCK_KEY = 7208512
+
+# Delivered rows listed per notification.created event. Each row adds at most
+# three integers of up to 12 characters to the payload, so 150 rows stay well
+# below Postgres's 8000-byte NOTIFY limit whatever the batch size.
+CREATED_EVENT_CHUNK_SIZE = 150
+
+_dispatched = 0
+_batches = 0
+
+
+def enqueue(db: Session, notification: NotificationCreate) -> bool:
+    """
+    Queue a notification in the caller's transaction; it is delivered after
+    the caller commits. Types the recipient has muted are dropped before
+    anything is written. Returns whether the notification was queued.
+    """
+    if notification_preferences.is_muted(db, notification.user_id, notification.type):
+        return False
+    db.add(NotificationOutbox(**notification.dict()))
+    event_bus.emit(db, "notification.enqueued")
+    return True
+
+
+def _coalesce_batch(rows: List[NotificationOutbox]) -> List[dict]:
+    """
+    Turn outbox rows into notification values, folding repeats of the same
+    (user, type, group) into one entry. A single INSERT ... ON CONFLICT may
+    not update a row twice, so repeats within a batch are merged here and
+    repeats of an already delivered unread notification by the conflict clause.
+    Request ids accumulate in request_ids, so a folded join_request row can
+    still be answered request by request.
+    """
+    values = []
+    by_event: Dict[Tuple[int, str, int], dict] = {}
+    for row in rows:
+        value = {column: getattr(row, column) for column in OUTBOX_COLUMNS}
+        value["occurrence_count"] = 1
+        value["actor_ids"] = [row.related_student_id] if row.related_student_id is not None else []
+        value["request_ids"] = [row.related_request_id] if row.related_request_id is not None else []
+        
+        if row.related_group_id is None or row.type in UNCOALESCED_NOTIFICATION_TYPES:
+            values.append(value)
+            continue
+        
+        key = (row.user_id, row.type, row.related_group_id)
+        earlier = by_event.get(key)
+        if earlier is None:
+            by_event[key] = value
+            values.append(value)
+        else:
+            # The latest occurrence provides the text; counts and actors accumulate
+            occurrence_count = earlier["occurrence_count"] + 1
+            actor_ids = (earlier["actor_ids"] + value["actor_ids"])[-ACTOR_SAMPLE_SIZE:]
+            request_ids = earlier["request_ids"] + value["request_ids"]
+            earlier.update(value, occurrence_count=occurrence_count, actor_ids=actor_ids, request_ids=request_ids)
+    return values
+
+
+def dispatch_pending(db: Session, batch_size: int = settings.NOTIFICATION_DISPATCH_BATCH_SIZE) -> int:
+    """Move one batch from the outbox into notifications; returns the number of outbox rows delivered"""
+    global _dispatched, _batches
+    
+    # Held until commit, so ids allocated by the insert below are committed in order
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": DISPATCH_LOCK_KEY})
+    pending = db.query(NotificationOutbox).order_by(
+        NotificationOutbox.id
+    ).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not pending:
+        db.rollback()
+        return 0
+    
+    stmt = insert(Notification).values(_coalesce_batch(pending))
+    merged_actor_ids = func.array_cat(Notification.actor_ids, stmt.excluded.actor_ids, type_=ARRAY(Integer))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Notification.user_id, Notification.type, Notification.related_group_id],
+        index_where=COALESCING_PREDICATE,
+        set_={
+            "title": stmt.excluded.title,
+            "message": stmt.excluded.message,
+            "template_id": stmt.excluded.template_id,
+            "params": stmt.excluded.params,
+            "link": stmt.excluded.link,
+            "related_student_id": stmt.excluded.related_student_id,
+            "related_request_id": stmt.excluded.related_request_id,
+            "created_at": stmt.excluded.created_at,
+            "occurrence_count": Notification.occurrence_count + stmt.excluded.occurrence_count,
+            "request_ids": func.array_cat(Notification.request_ids, stmt.excluded.request_ids, type_=ARRAY(Integer)),
+            # Keep the most recent actors, which come last
+            "actor_ids": merged_actor_ids[
+                func.greatest(func.cardinality(merged_actor_ids) - (ACTOR_SAMPLE_SIZE - 1), 1):
+                func.cardinality(merged_actor_ids)
+            ]
+        }
+    ).returning(
+        Notification.id,
+        Notification.user_id,
+        # xmax is 0 for freshly inserted rows and set for rows updated by the conflict clause
+        literal_column("xmax = 0").label("inserted")
+    )
+    delivered = db.execute(stmt).all()
+    
+    db.query(NotificationOutbox).filter(
+        NotificationOutbox.id.in_([row.id for row in pending])
+    ).delete(synchronize_session=False)
+    for start in range(0, len(delivered), CREATED_EVENT_CHUNK_SIZE):
+        chunk = delivered[start:start + CREATED_EVENT_CHUNK_SIZE]
+        event_bus.emit(
+            db,
+            "notification.created",
+            ids=[notification_id for notification_id, _, _ in chunk],
+            coalesced_ids=[notification_id for notification_id, _, inserted in chunk if not inserted],
+            user_ids=sorted({user_id for _, user_id, _ in chunk})
+        )
+    db.commit()
+    
+    _dispatched += len(pending)
+    _batches += 1
+    return len(pending)
+
+
+def settle_join_request_notification(db: Session, notification: Notification) -> None:
+    """
+    Re-point a join_request notification at those of its requests still
+    pending, in the caller's transaction, after one of them was answered.
+    It is marked read once none are left. Callers hold the row FOR UPDATE so
+    concurrent answers do not overwrite each other's request_ids.
+    """
+    pending = db.query(GroupJoinRequest.id, GroupJoinRequest.student_id).filter(
+        GroupJoinRequest.id.in_(notification.request_ids or [notification.related_request_id]),
+        GroupJoinRequest.status == "pending"
+    ).order_by(GroupJoinRequest.id).all()
+    if not pending:
+        notification.read = True
+        return
+    
+    notification.request_ids = [request_id for request_id, _ in pending]
+    notification.related_request_id, notification.related_student_id = pending[-1]
+    notification.occurrence_count = len(pending)
+    notification.actor_ids = [student_id for _, student_id in pending][-ACTOR_SAMPLE_SIZE:]
+
+
+def get_outbox_stats(db: Session) -> dict:
+    """Queue depth and age of the oldest undelivered notification, plus this worker's counters"""
+    depth, oldest_age = db.query(
+        func.count(NotificationOutbox.id),
+        func.extract("epoch", func.now() - func.min(NotificationOutbox.created_at))
+    ).one()
+    return {
+        "queue_depth": depth,
+        "oldest_age_seconds": float(oldest_age) if oldest_age is not None else None,
+        "dispatched": _dispatched,
+        "batches": _batches
+    }
+
+
+class NotificationDispatcher(threading.Thread):
+    """Background thread that drains the outbox, woken early by notification.enqueued events"""
+    
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(name="notification-dispatcher", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+    
+    def wake(self) -> None:
+        self._wakeup.set()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+    
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Notification dispatch failed; retrying")
+    
+    def drain(self) -> None:
+        """Deliver batches until the outbox is (momentarily) empty"""
+        db = SessionLocal()
+        try:
+            while not self._stopped.is_set():
+                if dispatch_pending(db, self.batch_size) < self.batch_size:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+
+
+def _wake_dispatcher(event: dict) -> None:
+    if _dispatcher is not None:
+        _dispatcher.wake()
+
+
+event_bus.subscribe("notification.enqueued", _wake_dispatcher)
+
+
+def start_dispatcher() -> None:
+    """Start this worker's dispatcher thread"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = NotificationDispatcher(
+            interval=settings.NOTIFICATION_DISPATCH_INTERVAL_SECONDS,
+            batch_size=settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+        )
+        _dispatcher.start()
+        # Deliver anything left in the outbox by a previous run
+        _dispatcher.wake()
+
+
+def stop_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop()
+        _dispatcher.join(timeout=5)
+        _dispatcher = None
@@ -0,0 +1,159 @@
+"""
+Write-behind buffer for chat read receipts.
+
+Read marks only ever move a member's watermark in group_read_cursors forward,
+so marks for the same (group, user) collapse to the highest message id. This
+worker keeps those pending watermarks in memory and a background thread writes
+them with one multi-row upsert, either every few seconds or as soon as enough
+have piled up. Reads merge the pending watermarks so a user never sees a
+message they just read come back as unread.
+
+The buffer is per worker: a request served by another worker only sees the
+mark once it is flushed, up to CHAT_READ_RECEIPT_FLUSH_SECONDS later, and a
+worker that dies without a clean shutdown loses what it had pending.
+"""
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat import GroupReadCursor
+
+logger = logging.getLogger(__name__)
+
+CursorKey = Tuple[int, int]  # (group_id, user_id)
+
+
+class ReadReceiptBuffer:
+    """Coalesces read watermarks per (group, user) and flushes them in batches"""
+    
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[CursorKey, int] = {}
+        # Batch being written; still visible to reads until its transaction commits
+        self._inflight: Dict[CursorKey, int] = {}
+        self._lock = threading.Lock()
+        # Serialises flushes so a failed batch can be merged back before the next one
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushed = 0
+        self._batches = 0
+    
+    def mark(self, group_id: int, user_id: int, message_id: int) -> None:
+        """Record that the user has read up to message_id in the group"""
+        key = (group_id, user_id)
+        with self._lock:
+            if message_id > self._pending.get(key, 0):
+                self._pending[key] = message_id
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+    
+    def pending(self, group_id: int, user_id: int) -> int:
+        """Buffered watermark for one group, 0 when nothing is pending"""
+        key = (group_id, user_id)
+        with self._lock:
+            return max(self._pending.get(key, 0), self._inflight.get(key, 0))
+    
+    def pending_for_user(self, user_id: int) -> Dict[int, int]:
+        """Buffered watermarks of a user, keyed by group id"""
+        watermarks: Dict[int, int] = {}
+        with self._lock:
+            for source in (self._inflight, self._pending):
+                for (group_id, uid), message_id in source.items():
+                    if uid == user_id and message_id > watermarks.get(group_id, 0):
+                        watermarks[group_id] = message_id
+        return watermarks
+    
+    def flush(self) -> int:
+        """Write every pending watermark in one statement; returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            
+            stmt = insert(GroupReadCursor).values([
+                {"group_id": group_id, "user_id": user_id, "last_read_message_id": message_id}
+                for (group_id, user_id), message_id in batch.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[GroupReadCursor.group_id, GroupReadCursor.user_id],
+                set_={
+                    "last_read_message_id": func.greatest(
+                        GroupReadCursor.last_read_message_id,
+                        stmt.excluded.last_read_message_id
+                    ),
+                    "updated_at": func.now()
+                }
+            )
+            
+            db = SessionLocal()
+            try:
+                db.execute(stmt)
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the batch back (keeping any newer marks) so it is retried
+                with self._lock:
+                    for key, message_id in batch.items():
+                        if message_id > self._pending.get(key, 0):
+                            self._pending[key] = message_id
+                raise
+            finally:
+                with self._lock:
+                    self._inflight = {}
+                db.close()
+            
+            self._flushed += len(batch)
+            self._batches += 1
+            return len(batch)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending": pending, "flushed": self._flushed, "batches": self._batches}
+    
+    def start(self) -> None:
+        """Start the background flusher for this worker"""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="read-receipt-flusher", daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending"""
+        if self._thread is not None:
+            self._stopped.set()
+            self._wakeup.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush read receipts on shutdown")
+    
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush read receipts; retrying")
+
+
+read_receipts = ReadReceiptBuffer(
+    flush_interval=settings.CHAT_READ_RECEIPT_FLUSH_SECONDS,
+    max_pending=settings.CHAT_READ_RECEIPT_MAX_PENDING
+)
@@ -0,0 +1,318 @@
+"""
+Student <-> group recommendations scored in memory with NumPy.
+
+Skills are interned into a vocabulary (case-insensitively) and every
+student's skills and every group's needed skills are packed into rows of
+uint64 bitsets. Scoring one group against all students, or one student
+against all groups, is then a vectorised AND plus a popcount over a matrix
+instead of a Python loop over ORM objects. The matrices are loaded from the
+database on first use and kept current by event bus subscribers as student
+profiles and groups change, in every worker.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.group import Group
+from app.models.student import Student
+from app.services import event_bus
+
+# Set bits per byte value: a row's popcount is the sum over its bytes
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 bitset matrix"""
+    bits = np.ascontiguousarray(bits)
+    return _POPCOUNT[bits.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+def _top(scores: np.ndarray, candidates: np.ndarray, limit: int) -> np.ndarray:
+    """Rows among candidates with the highest scores, best first"""
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class _Rows:
+    """
+    Growable table of skill bitsets plus per-row scalar columns, keyed by
+    entity id. Removed rows are zeroed, marked free (id -1) and reused.
+    """
+    
+    def __init__(self, words: int, **columns):
+        self.row_of: Dict[int, int] = {}
+        self.size = 0
+        self._free: List[int] = []
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.bits = np.zeros((0, words), dtype=np.uint64)
+        self.columns = {name: np.zeros(0, dtype=dtype) for name, dtype in columns.items()}
+    
+    def _grow(self) -> None:
+        capacity = max(1024, 2 * len(self.ids))
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[:self.size] = self.ids[:self.size]
+        bits = np.zeros((capacity, self.bits.shape[1]), dtype=np.uint64)
+        bits[:self.size] = self.bits[:self.size]
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        self.ids, self.bits = ids, bits
+    
+    def widen(self, words: int) -> None:
+        """Make room for a larger vocabulary"""
+        if words > self.bits.shape[1]:
+            self.bits = np.pad(self.bits, ((0, 0), (0, words - self.bits.shape[1])))
+    
+    def put(self, entity_id: int, bits: np.ndarray, **values) -> int:
+        row = self.row_of.get(entity_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self.size == len(self.ids):
+                    self._grow()
+                row = self.size
+                self.size += 1
+            self.row_of[entity_id] = row
+            self.ids[row] = entity_id
+        self.bits[row] = bits
+        for name, value in values.items():
+            self.columns[name][row] = value
+        return row
+    
+    def remove(self, entity_id: int) -> None:
+        row = self.row_of.pop(entity_id, None)
+        if row is not None:
+            self.ids[row] = -1
+            self.bits[row] = 0
+            self._free.append(row)
+    
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+
+class RecommendationIndex:
+    """Skill bitsets for all students and groups, with vectorised scoring"""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+    
+    def _reset(self) -> None:
+        self.vocabulary: Dict[str, int] = {}
+        self.faculties: Dict[str, int] = {}
+        self.students = _Rows(1, faculty=np.int32, looking=np.bool_)
+        self.groups = _Rows(1, faculty=np.int32, leader_id=np.int64, open_slots=np.int32, max_members=np.int32)
+    
+    def _encode(self, skills: Optional[Iterable[str]]) -> np.ndarray:
+        """Pack skills into a bitset row, growing the vocabulary as needed"""
+        positions = []
+        for skill in skills or ():
+            key = skill.strip().lower()
+            if not key:
+                continue
+            if key not in self.vocabulary:
+                self.vocabulary[key] = len(self.vocabulary)
+            positions.append(self.vocabulary[key])
+        
+        words = max(1, (len(self.vocabulary) + 63) // 64)
+        self.students.widen(words)
+        self.groups.widen(words)
+        row = np.zeros(words, dtype=np.uint64)
+        for position in positions:
+            row[position >> 6] |= np.uint64(1) << np.uint64(position & 63)
+        return row
+    
+    def _faculty_code(self, faculty: Optional[str]) -> int:
+        if not faculty:
+            return -1
+        return self.faculties.setdefault(faculty.strip().lower(), len(self.faculties))
+    
+    def _put_student(self, student_id: int, skills, faculty, looking_for_group) -> None:
+        bits = self._encode(skills)
+        self.students.put(student_id, bits, faculty=self._faculty_code(faculty), looking=bool(looking_for_group))
+    
+    def _put_group(self, group_id: int, needed_skills, leader_id, current_members, max_members, leader_faculty) -> None:
+        bits = self._encode(needed_skills)
+        self.groups.put(
+            group_id,
+            bits,
+            faculty=self._faculty_code(leader_faculty),
+            leader_id=leader_id or -1,
+            open_slots=max((max_members or 0) - (current_members or 0), 0),
+            max_members=max_members or 0
+        )
+    
+    def _student_rows(self, db, student_ids=None):
+        query = db.query(Student.id, Student.skills, Student.faculty, Student.looking_for_group)
+        if student_ids is not None:
+            query = query.filter(Student.id.in_(student_ids))
+        return query.yield_per(5000)
+    
+    def _group_rows(self, db, group_ids=None):
+        query = db.query(
+            Group.id, Group.needed_skills, Group.leader_id, Group.current_members, Group.max_members, Student.faculty
+        ).outerjoin(Student, Student.id == Group.leader_id)
+        if group_ids is not None:
+            query = query.filter(Group.id.in_(group_ids))
+        return query.yield_per(5000)
+    
+    def ensure_loaded(self) -> None:
+        """Build the matrices from the database if this worker has not yet"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            db = SessionLocal()
+            try:
+                self._reset()
+                for row in self._student_rows(db):
+                    self._put_student(*row)
+                for row in self._group_rows(db):
+                    self._put_group(*row)
+            finally:
+                db.close()
+            self._loaded = True
+    
+    def invalidate(self) -> None:
+        """Drop everything; the next recommendation rebuilds from the database"""
+        with self._lock:
+            self._loaded = False
+            self._reset()
+    
+    def refresh_students(self, student_ids: Iterable[int]) -> None:
+        """Reload students from the database; ids no longer there are removed"""
+        student_ids = set(student_ids)
+        with self._lock:
+            # Until loaded there is nothing to patch: the load reads current data
+            if not self._loaded:
+                return
+            db = SessionLocal()
+            try:
+                for row in self._student_rows(db, student_ids):
+                    self._put_student(*row)
+                    # A group takes its faculty from its leader
+                    led = self.groups.column("leader_id") == row.id
+                    self.groups.column("faculty")[led] = self._faculty_code(row.faculty)
+                    student_ids.discard(row.id)
+            finally:
+                db.close()
+            for student_id in student_ids:
+                self.students.remove(student_id)
+    
+    def refresh_groups(self, group_ids: Iterable[int]) -> None:
+        """Reload groups from the database; ids no longer there are removed"""
+        group_ids = set(group_ids)
+        with self._lock:
+            if not self._loaded:
+                return
+            db = SessionLocal()
+            try:
+                for row in self._group_rows(db, group_ids):
+                    self._put_group(*row)
+                    group_ids.discard(row.id)
+            finally:
+                db.close()
+            for group_id in group_ids:
+                self.groups.remove(group_id)
+    
+    def recommend_groups(
+        self, student_id: int, exclude_group_ids: Iterable[int] = (), limit: int = 20
+    ) -> List[Tuple[int, float, int]]:
+        """
+        Open groups ranked for a student by skill fit, faculty match and free
+        seats. Returns (group_id, score, matching skill count), best first.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            row = self.students.row_of.get(student_id)
+            if row is None:
+                return []
+            groups = self.groups
+            student_bits = self.students.bits[row]
+            student_faculty = self.students.columns["faculty"][row]
+            
+            ids = groups.ids[:groups.size]
+            bits = groups.bits[:groups.size]
+            overlap = popcount(bits & student_bits)
+            skill_fit = overlap / np.maximum(popcount(bits), 1)
+            faculty_match = (groups.column("faculty") == student_faculty) & (student_faculty >= 0)
+            open_slots = groups.column("open_slots")
+            open_ratio = open_slots / np.maximum(groups.column("max_members"), 1)
+            scores = (
+                settings.RECOMMENDATION_SKILL_WEIGHT * skill_fit
+                + settings.RECOMMENDATION_FACULTY_WEIGHT * faculty_match
+                + settings.RECOMMENDATION_OPEN_SLOTS_WEIGHT * open_ratio
+            )
+            
+            eligible = (ids >= 0) & (open_slots > 0) & ~np.isin(ids, list(exclude_group_ids))
+            top = _top(scores, np.flatnonzero(eligible), limit)
+            return [(int(ids[i]), float(scores[i]), int(overlap[i])) for i in top]
+    
+    def recommend_students(
+        self, group_id: int, exclude_student_ids: Iterable[int] = (), limit: int = 20
+    ) -> List[Tuple[int, float, int]]:
+        """
+        Students looking for a group, ranked for a group by skill fit and
+        faculty match. Returns (student_id, score, matching skill count),
+        best first; empty when the group has no free seats.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            row = self.groups.row_of.get(group_id)
+            if row is None or self.groups.columns["open_slots"][row] <= 0:
+                return []
+            students = self.students
+            group_bits = self.groups.bits[row]
+            group_faculty = self.groups.columns["faculty"][row]
+            needed = max(int(popcount(group_bits[np.newaxis])[0]), 1)
+            
+            ids = students.ids[:students.size]
+            overlap = popcount(students.bits[:students.size] & group_bits)
+            faculty_match = (students.column("faculty") == group_faculty) & (group_faculty >= 0)
+            scores = (
+                settings.RECOMMENDATION_SKILL_WEIGHT * (overlap / needed)
+                + settings.RECOMMENDATION_FACULTY_WEIGHT * faculty_match
+            )
+            
+            eligible = (ids >= 0) & students.column("looking") & ~np.isin(ids, list(exclude_student_ids))
+            top = _top(scores, np.flatnonzero(eligible), limit)
+            return [(int(ids[i]), float(scores[i]), int(overlap[i])) for i in top]
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "skills": len(self.vocabulary),
+                "students": len(self.students.row_of),
+                "groups": len(self.groups.row_of),
+            }
+
+
+recommendation_index = RecommendationIndex()
+
+
+def _refresh_student(event: dict) -> None:
+    recommendation_index.refresh_students([event["student_id"]])
+
+
+def _refresh_group(event: dict) -> None:
+    recommendation_index.refresh_groups([event["group_id"]])
+
+
+def _invalidate(event: dict) -> None:
+    recommendation_index.invalidate()
+
+
+event_bus.subscribe("student.updated", _refresh_student)
+event_bus.subscribe("student.deleted", _refresh_student)
+event_bus.subscribe("student.bulk_created", _invalidate)
+for _event_type in ("group.created", "group.updated", "group.deleted", "group.member_added", "group.member_removed"):
+    event_bus.subscribe(_event_type, _refresh_group)
@@ -0,0 +1,61 @@
+from app.services import event_bus
+from app.services.access_cache import GroupAccessCache, group_access_cache
+
+from conftest import auth_headers
+
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    cache = GroupAccessCache(ttl_seconds=60, max_entries=100)
+    version = cache.version()
+    # Membership changes while the lookup is still reading the old state
+    cache.invalidate_group(7)
+    cache.set(1, 7, (True, "student", 3), version)
+    
+    assert cache.get(1, 7) is None
+
+
+def test_lookup_after_an_invalidation_is_cached():
+    cache = GroupAccessCache(ttl_seconds=60, max_entries=100)
+    cache.invalidate_group(7)
+    cache.set(1, 7, (False, None, None), cache.version())
+    # Invalidating another group does not affect it
+    version = cache.version()
+    cache.invalidate_group(8)
+    cache.set(2, 7, (True, "student", 4), version)
+    
+    assert cache.get(1, 7) == (False, None, None)
+    assert cache.get(2, 7) == (True, "student", 4)
+
+
+def test_lookup_racing_a_user_invalidation_is_not_cached():
+    cache = GroupAccessCache(ttl_seconds=60, max_entries=100)
+    cache.set(1, 8, (True, "student", 3), cache.version())
+    cache.set(2, 7, (True, "student", 4), cache.version())
+    version = cache.version()
+    cache.invalidate_user(1)
+    cache.set(1, 7, (True, "student", 3), version)
+    
+    assert cache.get(1, 7) is None
+    assert cache.get(1, 8) is None
+    assert cache.get(2, 7) == (True, "student", 4)
+
+
+def test_missing_group_is_not_cached(db, client, make_student):
+    student = make_student()
+    
+    for path in ("unread-count", "messages/read-all"):
+        method = client.get if path == "unread-count" else client.post
+        response = method(f"/api/v1/chat/groups/999/{path}", headers=auth_headers(student.user))
+        assert response.status_code == 404
+    assert group_access_cache.get(student.user_id, 999) is None
+
+
+def test_deleting_a_student_drops_their_cached_access(db, client, make_group):
+    group = make_group(members=1)
+    member = next(m.student for m in group.members if m.role == "member")
+    assert client.get(f"/api/v1/chat/groups/{group.id}/unread-count", headers=auth_headers(member.user)).status_code == 200
+    assert group_access_cache.get(member.user_id, group.id)[0] is True
+    
+    event_bus.dispatch({"type": "student.deleted", "student_id": member.id, "user_id": member.user_id})
+    
+    assert group_access_cache.get(member.user_id, group.id) is None
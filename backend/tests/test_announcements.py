@@ -0,0 +1,42 @@
+from app.models import Notification
+from app.models.notification import Announcement
+from conftest import auth_headers
+
+
+def _feed(client, user):
+    return client.get("/api/v1/notifications/", headers=auth_headers(user.user)).json()
+
+
+def _unread(client, user):
+    return client.get("/api/v1/notifications/unread-count", headers=auth_headers(user.user)).json()["count"]
+
+
+def test_announcement_feed_ids_do_not_collide_with_notification_ids(db, client, make_student):
+    student = make_student()
+    # Both tables start their ids at 1
+    db.add(Notification(user_id=student.user_id, type="system", title="personal"))
+    db.add(Announcement(title="broadcast", message="to everyone"))
+    db.commit()
+    
+    ids = {entry["source"]: entry["id"] for entry in _feed(client, student)}
+    assert ids["notification"] != ids["announcement"]
+    assert _unread(client, student) == 2
+    
+    response = client.put(f"/api/v1/notifications/{ids['announcement']}/mark-read", headers=auth_headers(student.user))
+    
+    assert response.status_code == 200
+    assert _unread(client, student) == 1
+    assert db.query(Notification).one().read is False
+
+
+def test_announcements_cannot_be_deleted_through_the_notification_endpoint(db, client, make_student):
+    student = make_student()
+    db.add(Notification(user_id=student.user_id, type="system", title="personal"))
+    db.add(Announcement(title="broadcast", message="to everyone"))
+    db.commit()
+    
+    announcement_id = next(entry["id"] for entry in _feed(client, student) if entry["source"] == "announcement")
+    response = client.delete(f"/api/v1/notifications/{announcement_id}", headers=auth_headers(student.user))
+    
+    assert response.status_code == 400
+    assert db.query(Notification).count() == 1
@@ -0,0 +1,52 @@
+from app.crud import chat as crud_chat
+from app.schemas.chat import ChatMessageCreate
+
+
+def _post(db, group, sender_id, sender_type, count):
+    for index in range(count):
+        crud_chat.create_message(db, group.id, sender_id, sender_type, ChatMessageCreate(message=f"message {index}"))
+
+
+def test_history_page_costs_a_constant_number_of_queries(db, make_student, make_professor, make_group, count_queries):
+    professor = make_professor(name="Dr. Mentor")
+    leader = make_student(name="Leader")
+    group = make_group(leader=leader, members=3, mentors=[professor])
+    _post(db, group, leader.id, "student", 40)
+    _post(db, group, professor.id, "professor", 40)
+    group_id, reader = group.id, leader.user_id
+    
+    with count_queries() as small_page:
+        small = crud_chat.get_message_history(db, group_id, reader, limit=5)
+    with count_queries() as large_page:
+        large = crud_chat.get_message_history(db, group_id, reader, limit=80)
+    
+    assert len(small) == 5 and len(large) == 80
+    assert large_page.count == small_page.count <= 2
+    assert {message["sender_name"] for message in large} == {"Leader", "Dr. Mentor"}
+
+
+def test_history_read_flags_follow_the_watermark(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader, members=1)
+    _post(db, group, leader.id, "student", 6)
+    messages = crud_chat.get_message_history(db, group.id, leader.user_id)
+    
+    crud_chat.mark_message_as_read(db, group.id, messages[2]["id"], leader.user_id)
+    
+    flags = [message["is_read"] for message in crud_chat.get_message_history(db, group.id, leader.user_id)]
+    assert flags == [True, True, True, False, False, False]
+
+
+def test_mark_read_rejects_messages_outside_the_group(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader, members=1)
+    other = make_group(members=1)
+    _post(db, group, leader.id, "student", 3)
+    _post(db, other, other.leader_id, "student", 1)
+    foreign = crud_chat.get_message_history(db, other.id)[0]["id"]
+    deleted = crud_chat.get_message_history(db, group.id)[-1]["id"]
+    crud_chat.delete_message(db, deleted)
+    
+    for message_id in (10 ** 9, foreign, deleted):
+        assert not crud_chat.mark_message_as_read(db, group.id, message_id, leader.user_id)
+    assert crud_chat.get_unread_count(db, group.id, leader.user_id) == 2
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from app.api.v1.chat import wait_for_group_messages
+from app.crud import chat as crud_chat
+from app.database import SessionLocal
+from app.schemas.chat import ChatMessageCreate
+
+
+def _wait(group_id, user, after_id, timeout):
+    db = SessionLocal()
+    try:
+        return asyncio.run(wait_for_group_messages(
+            group_id, after_id, timeout=timeout, limit=100, db=db, current_user=user
+        ))
+    finally:
+        db.close()
+
+
+def test_deleted_message_does_not_end_the_wait_early(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    first = crud_chat.create_message(db, group.id, leader.id, "student", ChatMessageCreate(message="first"))
+    deleted = crud_chat.create_message(db, group.id, leader.id, "student", ChatMessageCreate(message="oops"))
+    crud_chat.delete_message(db, deleted.id)
+    
+    started = time.monotonic()
+    assert _wait(group.id, leader.user, first.id, timeout=0.5) == []
+    assert time.monotonic() - started >= 0.45
+
+
+def test_wait_returns_a_message_posted_while_parked(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    group_id, user, sender_id = group.id, leader.user, leader.id
+    deleted = crud_chat.create_message(db, group_id, sender_id, "student", ChatMessageCreate(message="oops"))
+    crud_chat.delete_message(db, deleted.id)
+    
+    async def post_later():
+        await asyncio.sleep(0.2)
+        writer = SessionLocal()
+        try:
+            await asyncio.to_thread(
+                crud_chat.create_message, writer, group_id, sender_id, "student", ChatMessageCreate(message="hello")
+            )
+        finally:
+            writer.close()
+    
+    async def scenario():
+        reader = SessionLocal()
+        try:
+            waiting = wait_for_group_messages(group_id, 0, timeout=5, limit=100, db=reader, current_user=user)
+            messages, _ = await asyncio.gather(waiting, post_later())
+            return messages
+        finally:
+            reader.close()
+    
+    started = time.monotonic()
+    messages = asyncio.run(scenario())
+    assert [message["message"] for message in messages] == ["hello"]
+    assert time.monotonic() - started < 2
@@ -0,0 +1,48 @@
+import threading
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.crud import chat as crud_chat
+from app.maintenance import chat_partitions
+from app.models.chat import GroupChatMessage
+
+
+def test_message_for_a_missing_month_is_kept_and_moved_later(db, engine, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    month = chat_partitions.add_months(chat_partitions.month_start(date.today()), 6)
+    db.add(GroupChatMessage(
+        group_id=group.id, sender_id=leader.id, sender_type="student", message="from the future",
+        created_at=datetime(month.year, month.month, 2, tzinfo=timezone.utc)
+    ))
+    db.commit()
+    
+    with engine.begin() as connection:
+        created = chat_partitions.ensure_partitions(connection, months_ahead=6)
+        moved = connection.execute(text(f"SELECT count(*) FROM {chat_partitions.partition_name(month)}")).scalar()
+        stray = connection.execute(text(f"SELECT count(*) FROM {chat_partitions.DEFAULT_PARTITION}")).scalar()
+    
+    assert chat_partitions.partition_name(month) in created
+    assert (moved, stray) == (1, 0)
+    assert [m["message"] for m in crud_chat.get_message_history(db, group.id)] == ["from the future"]
+
+
+def test_concurrent_startups_create_each_partition_once(engine):
+    errors, created = [], []
+    
+    def start_worker():
+        try:
+            with engine.begin() as connection:
+                created.extend(chat_partitions.ensure_partitions(connection, months_ahead=9))
+        except Exception as exc:
+            errors.append(exc)
+    
+    workers = [threading.Thread(target=start_worker) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    assert errors == []
+    assert len(created) == len(set(created))
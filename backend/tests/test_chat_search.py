@@ -0,0 +1,67 @@
+from sqlalchemy import text
+
+from app.crud import chat as crud_chat
+from app.schemas.chat import ChatMessageCreate
+
+from conftest import auth_headers
+
+
+def _post(db, group, *messages):
+    return [
+        crud_chat.create_message(db, group.id, group.leader_id, "student", ChatMessageCreate(message=message)).id
+        for message in messages
+    ]
+
+
+def test_search_ranks_hits_in_the_group_and_highlights_them(db, client, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    other = make_group()
+    best, partial, draft, deleted, _ = _post(
+        db, group,
+        "deadline moved, the report deadline is friday",
+        "what is the deadline",
+        "deadline for the draft",
+        "old deadline",
+        "lunch anyone?",
+    )
+    _post(db, other, "our deadline is monday")
+    crud_chat.delete_message(db, deleted)
+    headers = auth_headers(leader.user)
+    
+    response = client.get(f"/api/v1/chat/groups/{group.id}/search", params={"q": "deadline"}, headers=headers)
+    
+    assert response.status_code == 200
+    hits = response.json()
+    assert [hit["id"] for hit in hits][0] == best
+    assert {hit["id"] for hit in hits} == {best, partial, draft}
+    assert all("<mark>deadline</mark>" in hit["snippet"] for hit in hits)
+    assert hits[0]["rank"] > hits[-1]["rank"]
+    
+    # websearch syntax: exclusion
+    response = client.get(f"/api/v1/chat/groups/{group.id}/search", params={"q": "deadline -draft"}, headers=headers)
+    assert {hit["id"] for hit in response.json()} == {best, partial}
+
+
+def test_search_is_limited_to_members(db, client, make_student, make_group):
+    group = make_group()
+    outsider = make_student()
+    
+    response = client.get(f"/api/v1/chat/groups/{group.id}/search", params={"q": "x"}, headers=auth_headers(outsider.user))
+    assert response.status_code == 403
+    response = client.get("/api/v1/chat/groups/999/search", params={"q": "x"}, headers=auth_headers(outsider.user))
+    assert response.status_code == 404
+
+
+def test_search_can_use_the_gin_index(db, engine, make_group):
+    group = make_group()
+    _post(db, group, "deadline")
+    
+    with engine.connect() as connection:
+        connection.execute(text("SET enable_seqscan = off"))
+        plan = "\n".join(connection.execute(text(
+            "EXPLAIN SELECT id FROM group_chat_messages "
+            "WHERE search_vector @@ websearch_to_tsquery('simple', 'deadline')"
+        )).scalars())
+    
+    assert "search_vector_idx" in plan and "Seq Scan" not in plan
@@ -0,0 +1,47 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.chat import WS_ACCESS_REVOKED
+from app.crud import chat as crud_chat
+from app.crud import group as crud_group
+from app.schemas.chat import ChatMessageCreate
+from app.services import event_bus
+from conftest import auth_token
+
+
+def _socket_url(group_id, user):
+    return f"/api/v1/chat/groups/{group_id}/ws?token={auth_token(user)}"
+
+
+def test_removed_member_socket_is_closed(db, client, make_student, make_group):
+    leader, member = make_student(), make_student()
+    group = make_group(leader=leader)
+    crud_group.add_group_member(db, group.id, member.id)
+    group_id, member_id = group.id, member.id
+    
+    with client.websocket_connect(_socket_url(group_id, leader.user)) as leader_socket, \
+            client.websocket_connect(_socket_url(group_id, member.user)) as member_socket:
+        crud_group.remove_group_member(db, group_id, member_id)
+        # The listener thread is not running in tests, so deliver the event by hand
+        event_bus.dispatch({"type": "group.member_removed", "group_id": group_id, "student_id": member_id})
+        
+        with pytest.raises(WebSocketDisconnect) as closed:
+            member_socket.receive_json()
+        assert closed.value.code == WS_ACCESS_REVOKED
+        
+        # Other members keep their socket and get the next message
+        message = crud_chat.create_message(db, group_id, leader.id, "student", ChatMessageCreate(message="still here"))
+        event_bus.dispatch({"type": "chat.message_created", "group_id": group_id, "message_id": message.id})
+        assert leader_socket.receive_json()["message"]["message"] == "still here"
+
+
+def test_deleted_group_closes_every_socket(db, client, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    group_id = group.id
+    
+    with client.websocket_connect(_socket_url(group_id, leader.user)) as socket:
+        event_bus.dispatch({"type": "group.deleted", "group_id": group_id})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+        assert closed.value.code == WS_ACCESS_REVOKED
@@ -0,0 +1,34 @@
+from app.crud import chat as crud_chat
+from app.schemas.chat import ChatMessageCreate
+
+from conftest import auth_headers
+
+
+def _post(db, group, count):
+    return [
+        crud_chat.create_message(db, group.id, group.leader_id, "student", ChatMessageCreate(message=f"message {index}")).id
+        for index in range(count)
+    ]
+
+
+def test_unread_counts_cover_member_and_mentor_groups_in_one_query(db, client, make_student, make_professor, make_group, count_queries):
+    student = make_student()
+    professor = make_professor()
+    read_some = make_group(leader=student, mentors=[professor])
+    untouched = make_group(leader=student)
+    quiet = make_group(mentors=[professor])
+    make_group()
+    ids = _post(db, read_some, 5)
+    _post(db, untouched, 2)
+    crud_chat.mark_message_as_read(db, read_some.id, ids[1], student.user_id)
+    crud_chat.delete_message(db, ids[4])
+    user_id = student.user_id
+    
+    with count_queries() as queries:
+        counts = crud_chat.get_unread_counts_for_user(db, user_id)
+    
+    assert counts == {read_some.id: 2, untouched.id: 2}
+    assert queries.count == 1
+    response = client.get("/api/v1/chat/unread-counts", headers=auth_headers(professor.user))
+    assert response.status_code == 200
+    assert response.json() == {str(read_some.id): 4, str(quiet.id): 0}
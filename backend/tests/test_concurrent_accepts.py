@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func
+
+from app.models import GroupJoinRequest, GroupMember, Notification, group_mentors
+from app.models.mentorship_request import MentorshipRequest
+from conftest import auth_headers
+
+ATTEMPTS = 8
+
+
+def _all_at_once(send):
+    """
+    Run the same request from ATTEMPTS threads released together; returns the status codes.
+    `send` must not touch the test session (it is not thread safe), so read ids
+    and headers before calling.
+    """
+    barrier = threading.Barrier(ATTEMPTS)
+    
+    def attempt(_):
+        barrier.wait()
+        return send().status_code
+    
+    with ThreadPoolExecutor(ATTEMPTS) as pool:
+        return sorted(pool.map(attempt, range(ATTEMPTS)))
+
+
+def test_a_join_request_accepted_concurrently_adds_one_member(db, client, make_student, make_group):
+    leader, applicant = make_student(), make_student()
+    group = make_group(leader=leader)
+    request = GroupJoinRequest(group_id=group.id, student_id=applicant.id, message="hi", status="pending")
+    db.add(request)
+    db.commit()
+    
+    url, headers = f"/api/v1/groups/join-requests/{request.id}/status", auth_headers(leader.user)
+    codes = _all_at_once(lambda: client.put(
+        url,
+        params={"status": "accepted"},
+        headers=headers
+    ))
+    
+    assert codes == [200] + [400] * (ATTEMPTS - 1)
+    assert db.query(GroupMember).filter(GroupMember.student_id == applicant.id).count() == 1
+    db.refresh(group)
+    assert group.current_members == 2
+
+
+def test_a_join_request_accepted_concurrently_from_the_bell_adds_one_member(db, client, make_student, make_group):
+    leader, applicant = make_student(), make_student()
+    group = make_group(leader=leader)
+    request = GroupJoinRequest(group_id=group.id, student_id=applicant.id, message="hi", status="pending")
+    db.add(request)
+    db.flush()
+    notification = Notification(
+        user_id=leader.user_id, type="join_request", title="join",
+        related_group_id=group.id, related_request_id=request.id
+    )
+    db.add(notification)
+    db.commit()
+    
+    payload, headers = {"notification_id": notification.id, "action": "accept"}, auth_headers(leader.user)
+    codes = _all_at_once(lambda: client.post(
+        "/api/v1/notifications/group-join-request/action",
+        json=payload,
+        headers=headers
+    ))
+    
+    assert codes == [200] + [400] * (ATTEMPTS - 1)
+    assert db.query(GroupMember).filter(GroupMember.student_id == applicant.id).count() == 1
+    db.refresh(group)
+    assert group.current_members == 2
+
+
+def test_a_mentorship_request_accepted_concurrently_assigns_one_mentor(db, client, make_student, make_professor, make_group):
+    leader = make_student()
+    professor = make_professor(total_slots=3)
+    group = make_group(leader=leader)
+    request = MentorshipRequest(group_id=group.id, professor_id=professor.id, requested_by=leader.id, message="mentor us")
+    db.add(request)
+    db.commit()
+    
+    url, headers = f"/api/v1/mentorship-requests/{request.id}/status", auth_headers(professor.user)
+    codes = _all_at_once(lambda: client.put(
+        url,
+        json={"status": "accepted"},
+        headers=headers
+    ))
+    
+    assert codes == [200] + [400] * (ATTEMPTS - 1)
+    assert db.query(func.count()).select_from(group_mentors).scalar() == 1
+    db.refresh(group)
+    db.refresh(professor)
+    assert (group.mentor_count, professor.available_slots) == (1, 2)
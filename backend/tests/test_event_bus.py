@@ -0,0 +1,60 @@
+import threading
+import time
+
+from app.services import event_bus
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_committed_events_reach_every_worker_and_rolled_back_ones_none(db):
+    received = []
+    lock = threading.Lock()
+    
+    def record(event):
+        with lock:
+            received.append((threading.current_thread().name, event["n"]))
+    
+    def fail(event):
+        raise RuntimeError("handler bug")
+    
+    def delivered(n):
+        return {name for name, value in received if value == n} == {"worker-0", "worker-1"}
+    
+    # One listener per simulated worker
+    listeners = [event_bus.EventListener(poll_interval=0.05) for _ in range(2)]
+    for index, listener in enumerate(listeners):
+        listener.name = f"worker-{index}"
+    event_bus.subscribe("test.fan_out", fail)
+    event_bus.subscribe("test.fan_out", record)
+    try:
+        for listener in listeners:
+            listener.start()
+        # Listeners connect in the background, so keep emitting until both are listening
+        n = 0
+        while not _wait_for(lambda: delivered(n), timeout=0.2):
+            n += 1
+            assert n < 50, "events were not delivered"
+            event_bus.emit(db, "test.fan_out", n=n)
+            db.commit()
+        
+        event_bus.emit(db, "test.fan_out", n=-1)
+        db.rollback()
+        event_bus.emit(db, "test.fan_out", n=n + 1)
+        db.commit()
+        
+        # The failing handler runs first and does not stop delivery
+        assert _wait_for(lambda: delivered(n + 1))
+    finally:
+        for listener in listeners:
+            listener.stop()
+            listener.join(timeout=5)
+        event_bus._handlers.pop("test.fan_out", None)
+    
+    assert -1 not in {value for _, value in received}
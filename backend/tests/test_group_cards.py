@@ -0,0 +1,41 @@
+from app.crud import group as crud_group
+from conftest import auth_headers
+
+
+def _make_groups(make_group, make_professor, count):
+    mentors = [make_professor(), make_professor()]
+    return [make_group(members=2, mentors=mentors) for _ in range(count)]
+
+
+def test_groups_page_costs_a_constant_number_of_queries(db, client, make_student, make_professor, make_group, count_queries):
+    viewer = make_student()
+    headers = auth_headers(viewer.user)
+    _make_groups(make_group, make_professor, 3)
+    
+    with count_queries() as small_page:
+        small = client.get("/api/v1/groups/", headers=headers).json()
+    _make_groups(make_group, make_professor, 30)
+    with count_queries() as large_page:
+        large = client.get("/api/v1/groups/", headers=headers).json()
+    
+    assert (len(small), len(large)) == (3, 33)
+    assert large_page.count == small_page.count
+    assert all(len(card["mentors"]) == 2 for card in large)
+    assert all(mentor["name"] for card in large for mentor in card["mentors"])
+
+
+def test_student_group_cards_cost_a_constant_number_of_queries(db, make_student, make_professor, make_group, count_queries):
+    mentors = [make_professor(), make_professor()]
+    few, many = make_student(), make_student()
+    make_group(leader=few, mentors=mentors)
+    for _ in range(12):
+        make_group(leader=many, mentors=mentors)
+    few_id, many_id = few.id, many.id
+    
+    with count_queries() as few_groups:
+        assert len(crud_group.get_student_group_cards(db, few_id)) == 1
+    with count_queries() as many_groups:
+        cards = crud_group.get_student_group_cards(db, many_id)
+    
+    assert len(cards) == 12
+    assert many_groups.count == few_groups.count <= 3
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import func
+
+from app.crud import group as crud_group
+from app.crud import mentorship as crud_mentorship
+from app.models import group_mentors
+
+
+def _mentors(db, group_id):
+    return db.query(func.count()).select_from(group_mentors).filter(group_mentors.c.group_id == group_id).scalar()
+
+
+def test_assign_mentor_takes_a_slot_and_a_seat(db, make_professor, make_group):
+    professor = make_professor(total_slots=2, available_slots=2)
+    group = make_group()
+    
+    assert crud_mentorship.assign_mentor(db, group.id, professor.id) == 1
+    
+    db.refresh(professor)
+    db.refresh(group)
+    assert (professor.available_slots, group.mentor_count, group.has_mentor) == (1, 1, True)
+    with pytest.raises(ValueError, match="already a mentor"):
+        crud_mentorship.assign_mentor(db, group.id, professor.id)
+    db.refresh(professor)
+    assert professor.available_slots == 1
+
+
+def test_assign_mentor_rejects_a_third_mentor(db, make_professor, make_group):
+    group = make_group(mentors=[make_professor(), make_professor()])
+    third = make_professor(total_slots=3, available_slots=3)
+    
+    with pytest.raises(ValueError, match="maximum number of mentors"):
+        crud_mentorship.assign_mentor(db, group.id, third.id)
+    
+    db.refresh(group)
+    db.refresh(third)
+    assert (group.mentor_count, _mentors(db, group.id), third.available_slots) == (2, 2, 3)
+
+
+def test_assign_mentor_rejects_a_professor_without_free_slots(db, make_professor, make_group):
+    professor = make_professor(total_slots=1, available_slots=0)
+    group = make_group()
+    
+    with pytest.raises(ValueError, match="no available mentorship slots"):
+        crud_mentorship.assign_mentor(db, group.id, professor.id)
+    
+    db.refresh(group)
+    db.refresh(professor)
+    assert (group.mentor_count, _mentors(db, group.id), professor.available_slots) == (0, 0, 0)
+
+
+def test_member_slots_stop_at_the_group_limits(db, make_group):
+    group = make_group(members=1, max_members=3)
+    
+    assert crud_group.claim_member_slot(db, group.id)
+    assert not crud_group.claim_member_slot(db, group.id)
+    assert not crud_group.claim_member_slot(db, 999)
+    db.commit()
+    db.refresh(group)
+    assert group.current_members == 3
+    
+    for _ in range(4):
+        crud_group.release_member_slot(db, group.id)
+    db.commit()
+    db.refresh(group)
+    assert group.current_members == 0
@@ -0,0 +1,76 @@
+from app.models import GroupJoinRequest, GroupMember, Notification, NotificationOutbox
+from conftest import auth_headers
+
+
+def test_join_request_and_its_notification_commit_together(db, client, make_student, make_group, count_commits):
+    leader, applicant = make_student(), make_student()
+    group = make_group(leader=leader)
+    body = {"group_id": group.id, "student_id": applicant.id, "message": "let me in"}
+    
+    with count_commits() as commits:
+        response = client.post("/api/v1/groups/join-requests/", json=body, headers=auth_headers(applicant.user))
+    
+    assert response.status_code == 201
+    assert len(commits) == 1
+    outbox = db.query(NotificationOutbox).one()
+    assert (outbox.user_id, outbox.related_request_id) == (leader.user_id, response.json()["id"])
+
+
+def test_accepting_into_a_full_group_changes_nothing(db, client, make_student, make_group):
+    leader, applicant = make_student(), make_student()
+    group = make_group(leader=leader, members=1, max_members=2)
+    request = GroupJoinRequest(group_id=group.id, student_id=applicant.id, message="hi", status="pending")
+    db.add(request)
+    db.commit()
+    
+    response = client.put(
+        f"/api/v1/groups/join-requests/{request.id}/status",
+        params={"status": "accepted"},
+        headers=auth_headers(leader.user)
+    )
+    
+    assert response.status_code == 400
+    db.refresh(request)
+    assert request.status == "pending"
+    assert db.query(NotificationOutbox).count() == 0
+
+
+def test_a_coalesced_join_request_notification_is_answered_one_request_at_a_time(db, client, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    applicants = [make_student() for _ in range(3)]
+    requests = [GroupJoinRequest(group_id=group.id, student_id=applicant.id, message="hi", status="pending") for applicant in applicants]
+    db.add_all(requests)
+    db.flush()
+    notification = Notification(
+        user_id=leader.user_id, type="join_request", title="join", related_group_id=group.id,
+        related_request_id=requests[-1].id, request_ids=[request.id for request in requests], occurrence_count=3
+    )
+    db.add(notification)
+    db.commit()
+    
+    def answer(action, request_id=None):
+        return client.post(
+            "/api/v1/notifications/group-join-request/action",
+            json={"notification_id": notification.id, "action": action, "request_id": request_id},
+            headers=auth_headers(leader.user)
+        )
+    
+    assert answer("accept", requests[1].id).status_code == 200
+    db.refresh(notification)
+    assert (notification.read, notification.request_ids) == (False, [requests[0].id, requests[2].id])
+    assert notification.occurrence_count == 2
+    
+    # Without a request id the oldest pending request is answered
+    assert answer("reject").status_code == 200
+    db.refresh(requests[0])
+    assert requests[0].status == "rejected"
+    
+    assert answer("accept").status_code == 200
+    db.refresh(notification)
+    assert notification.read is True
+    assert answer("accept").status_code == 400
+    assert answer("accept", 12345).status_code == 404
+    
+    members = {member.student_id for member in db.query(GroupMember).filter(GroupMember.group_id == group.id)}
+    assert members == {leader.id, applicants[1].id, applicants[2].id}
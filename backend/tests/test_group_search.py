@@ -0,0 +1,52 @@
+from sqlalchemy import event, text
+
+from app.crud import group as crud_group
+from conftest import auth_headers
+
+
+def _names(cards):
+    return [card["name"] for card in cards]
+
+
+def test_search_matches_any_needed_skill_and_skips_full_groups(db, client, make_student, make_group):
+    make_group(name="python and sql", needed_skills=["python", "sql"])
+    make_group(name="react", needed_skills=["react"])
+    make_group(name="full python", needed_skills=["python"], members=1, max_members=2)
+    viewer = make_student(skills=["sql"])
+    
+    def search(**params):
+        response = client.get("/api/v1/groups/search", params=params, headers=auth_headers(viewer.user))
+        assert response.status_code == 200
+        return response.json()
+    
+    assert _names(search(skills=["python"])) == ["python and sql"]
+    assert sorted(_names(search(skills=["python"], open_only=False))) == ["full python", "python and sql"]
+    assert sorted(_names(search(skills=["sql", "react"]))) == ["python and sql", "react"]
+    assert search(skills=["haskell"]) == []
+    
+    # The viewer's own skills rank the results and are reported per card
+    cards = search()
+    assert _names(cards)[0] == "python and sql"
+    assert {card["name"]: card["skill_match"] for card in cards} == {"python and sql": 1, "react": 0}
+
+
+def test_open_skill_search_can_use_the_partial_gin_index(db, engine, make_group):
+    make_group(needed_skills=["python"])
+    captured = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not captured:
+            captured.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        crud_group.search_group_cards(db, skills=["python"])
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    
+    statement, parameters = captured[0]
+    connection = db.connection()
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters))
+    db.rollback()
+    assert "ix_groups_needed_skills_open" in plan
@@ -0,0 +1,62 @@
+from app.crud import chat as crud_chat
+from app.models import GroupJoinRequest
+from app.models.mentorship_request import MentorshipRequest
+from app.schemas.chat import ChatMessageCreate
+from app.services.access_cache import group_access_cache
+
+from conftest import auth_headers
+
+
+def _workspace(client, group_id, user):
+    return client.get(f"/api/v1/groups/{group_id}/workspace", headers=auth_headers(user.user))
+
+
+def test_each_role_sees_what_the_individual_endpoints_allow(db, client, make_student, make_professor, make_group):
+    leader, applicant, outsider = make_student(), make_student(), make_student()
+    professor, requested = make_professor(), make_professor()
+    group = make_group(leader=leader, members=2, mentors=[professor])
+    db.add(GroupJoinRequest(group_id=group.id, student_id=applicant.id, message="hi", status="pending"))
+    db.add(MentorshipRequest(group_id=group.id, professor_id=requested.id, requested_by=leader.id, message="mentor us"))
+    db.commit()
+    crud_chat.create_message(db, group.id, professor.id, "professor", ChatMessageCreate(message="welcome"))
+    
+    as_leader = _workspace(client, group.id, leader).json()
+    assert as_leader["is_leader"] is True
+    assert len(as_leader["members"]) == 3
+    assert as_leader["group"]["id"] == group.id
+    assert as_leader["chat_unread_count"] == 1
+    assert [request["student_id"] for request in as_leader["join_requests"]] == [applicant.id]
+    assert [request["professor_id"] for request in as_leader["mentorship_requests"]] == [requested.id]
+    
+    as_mentor = _workspace(client, group.id, professor).json()
+    assert as_mentor["is_leader"] is False
+    assert as_mentor["chat_unread_count"] == 1
+    assert as_mentor["join_requests"] is None and as_mentor["mentorship_requests"] is None
+    
+    as_outsider = _workspace(client, group.id, outsider).json()
+    assert as_outsider["chat_unread_count"] is None
+    assert as_outsider["join_requests"] is None and as_outsider["mentorship_requests"] is None
+    # The decision is shared with the chat endpoints through the access cache
+    assert group_access_cache.get(outsider.user_id, group.id) == (False, None, None)
+    
+    assert client.get("/api/v1/groups/999/workspace", headers=auth_headers(leader.user)).status_code == 404
+
+
+def test_workspace_costs_a_constant_number_of_queries(db, client, make_student, make_professor, make_group, count_queries):
+    small_leader, large_leader = make_student(), make_student()
+    small = make_group(leader=small_leader, members=1, mentors=[make_professor()])
+    large = make_group(leader=large_leader, members=4, mentors=[make_professor(), make_professor()])
+    for group, requests in ((small, 1), (large, 5)):
+        for _ in range(requests):
+            db.add(GroupJoinRequest(group_id=group.id, student_id=make_student().id, message="hi", status="pending"))
+    db.commit()
+    small_url, small_headers = f"/api/v1/groups/{small.id}/workspace", auth_headers(small_leader.user)
+    large_url, large_headers = f"/api/v1/groups/{large.id}/workspace", auth_headers(large_leader.user)
+    
+    with count_queries() as small_queries:
+        assert client.get(small_url, headers=small_headers).status_code == 200
+    with count_queries() as large_queries:
+        response = client.get(large_url, headers=large_headers)
+    
+    assert len(response.json()["join_requests"]) == 5
+    assert small_queries.count == large_queries.count
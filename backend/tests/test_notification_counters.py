@@ -0,0 +1,88 @@
+import threading
+
+from sqlalchemy import func, insert, text
+
+from app.maintenance.notification_counters import reconcile_counters
+from app.models import Notification
+from app.models.notification import NotificationCounter
+from conftest import auth_headers
+
+
+def _unread_counts(db):
+    db.expire_all()
+    return dict(db.query(NotificationCounter.user_id, NotificationCounter.unread_count).all())
+
+
+def test_reconcile_corrects_drifted_counters_batch_by_batch(db, engine, make_student):
+    users = [make_student().user_id for _ in range(3)]
+    db.add_all([Notification(user_id=users[0], type="system", title="a"), Notification(user_id=users[1], type="system", title="b")])
+    db.commit()
+    db.execute(text("UPDATE notification_counters SET unread_count = 7"))
+    db.execute(text("DELETE FROM notification_counters WHERE user_id = :user_id"), {"user_id": users[1]})
+    db.commit()
+    
+    assert reconcile_counters(engine, batch_size=2) == 2
+    assert _unread_counts(db) == {users[0]: 1, users[1]: 1, users[2]: 0}
+
+
+def test_reconcile_waits_only_for_the_users_it_recounts(db, engine, make_student):
+    busy, other = make_student().user_id, make_student().user_id
+    
+    with engine.connect() as writer:
+        # An in-flight insert for one user holds that user's counter row
+        writer.execute(text("INSERT INTO notifications (user_id, type, read) VALUES (:user_id, 'system', false)"), {"user_id": busy})
+        job = threading.Thread(target=reconcile_counters, args=(engine,), kwargs={"batch_size": 1})
+        job.start()
+        job.join(timeout=0.5)
+        assert job.is_alive()
+        
+        # Writes for other users, including mark-read, are not held up by the job
+        db.add(Notification(user_id=other, type="system", title="x"))
+        db.commit()
+        db.query(Notification).filter(Notification.user_id == other).update({"read": True})
+        db.commit()
+        writer.commit()
+    
+    job.join(timeout=5)
+    assert not job.is_alive()
+    assert _unread_counts(db) == {busy: 1, other: 0}
+
+
+def _actual_unread(db):
+    rows = db.query(Notification.user_id, func.count()).filter(Notification.read == False).group_by(Notification.user_id)
+    return dict(rows.all())
+
+
+def test_counters_follow_bulk_mark_read_and_delete(db, client, make_student):
+    first, second = make_student(), make_student()
+    users = [first.user_id, second.user_id]
+    # One multi-row INSERT statement for both users
+    db.execute(insert(Notification), [
+        {"user_id": user_id, "type": "system", "title": f"n{index}", "read": index == 0}
+        for user_id in users for index in range(6)
+    ])
+    db.commit()
+    assert _unread_counts(db) == _actual_unread(db) == {users[0]: 5, users[1]: 5}
+    
+    ids = [row.id for row in db.query(Notification.id).filter(Notification.user_id == users[0]).order_by(Notification.id)]
+    foreign = db.query(Notification.id).filter(Notification.user_id == users[1]).first().id
+    # Already read, unread and another user's ids in one bulk update
+    response = client.put(
+        "/api/v1/notifications/mark-read",
+        json={"notification_ids": ids[:4] + [foreign]},
+        headers=auth_headers(first.user)
+    )
+    assert response.status_code == 200
+    assert _unread_counts(db) == _actual_unread(db) == {users[0]: 2, users[1]: 5}
+    
+    client.delete(f"/api/v1/notifications/{ids[0]}", headers=auth_headers(first.user))
+    client.delete(f"/api/v1/notifications/{ids[5]}", headers=auth_headers(first.user))
+    assert _unread_counts(db)[users[0]] == 1
+    
+    # Marking unread again and a bulk delete across users
+    db.query(Notification).filter(Notification.user_id == users[0]).update({"read": False})
+    db.commit()
+    db.query(Notification).filter(Notification.title.in_(["n1", "n2"])).delete(synchronize_session=False)
+    db.commit()
+    assert _unread_counts(db) == {users[0]: 2, users[1]: 3}
+    assert _actual_unread(db) == {users[0]: 2, users[1]: 3}
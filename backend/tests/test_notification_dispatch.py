@@ -0,0 +1,123 @@
+import json
+import threading
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models import Notification, NotificationOutbox
+from app.schemas.notification import NotificationCreate
+from app.services import event_bus
+from app.services import notifications as notification_service
+
+
+def _enqueue(db, user_id, count):
+    for index in range(count):
+        notification_service.enqueue(db, NotificationCreate(user_id=user_id, type="system", title=f"n{index}"))
+    db.commit()
+
+
+def test_dispatchers_take_turns_so_ids_commit_in_order(db, engine, make_student):
+    user_id = make_student().user_id
+    _enqueue(db, user_id, 3)
+    
+    delivered = []
+    
+    def dispatch():
+        session = SessionLocal()
+        try:
+            delivered.append(notification_service.dispatch_pending(session))
+        finally:
+            session.close()
+    
+    # Another worker's dispatcher is mid-batch: it holds the lock until it commits
+    with engine.connect() as other:
+        other.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": notification_service.DISPATCH_LOCK_KEY})
+        waiting = threading.Thread(target=dispatch)
+        waiting.start()
+        waiting.join(timeout=0.5)
+        assert waiting.is_alive()
+        assert db.query(Notification).count() == 0
+        other.commit()
+    
+    waiting.join(timeout=5)
+    assert delivered == [3]
+    assert db.query(Notification).count() == 3
+
+
+def _notify(db, user_id, group_id, notification_type, request_id=None):
+    notification_service.enqueue(db, NotificationCreate(
+        user_id=user_id, type=notification_type, title=notification_type,
+        related_group_id=group_id, related_request_id=request_id
+    ))
+    db.commit()
+
+
+def test_join_requests_for_one_group_coalesce_and_keep_every_request_id(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    
+    # Two in one batch, the third against the already delivered unread row
+    _notify(db, leader.user_id, group.id, "join_request", request_id=1)
+    _notify(db, leader.user_id, group.id, "join_request", request_id=2)
+    notification_service.dispatch_pending(db)
+    _notify(db, leader.user_id, group.id, "join_request", request_id=3)
+    notification_service.dispatch_pending(db)
+    
+    row = db.query(Notification).filter(Notification.user_id == leader.user_id).one()
+    assert (row.occurrence_count, row.request_ids) == (3, [1, 2, 3])
+
+
+def test_invitations_are_never_coalesced(db, make_student, make_group):
+    student = make_student()
+    group = make_group()
+    
+    _notify(db, student.user_id, group.id, "group_invitation", request_id=1)
+    _notify(db, student.user_id, group.id, "group_invitation", request_id=2)
+    notification_service.dispatch_pending(db)
+    
+    rows = db.query(Notification).filter(Notification.user_id == student.user_id).all()
+    assert sorted(row.related_request_id for row in rows) == [1, 2]
+
+
+def test_informational_notifications_for_one_group_are_coalesced(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    
+    _notify(db, leader.user_id, group.id, "join_request_accepted")
+    _notify(db, leader.user_id, group.id, "join_request_accepted")
+    notification_service.dispatch_pending(db)
+    _notify(db, leader.user_id, group.id, "join_request_accepted")
+    notification_service.dispatch_pending(db)
+    
+    row = db.query(Notification).filter(Notification.user_id == leader.user_id).one()
+    assert row.occurrence_count == 3
+
+
+def test_a_batch_too_big_for_one_notify_payload_is_delivered(db, engine, make_student):
+    user_id = make_student().user_id
+    count = 2000
+    db.bulk_insert_mappings(NotificationOutbox, [
+        {"user_id": user_id, "type": "system", "title": f"n{index}"} for index in range(count)
+    ])
+    db.commit()
+    
+    # Detached so the autocommit connection is closed rather than returned to the pool
+    listener = engine.raw_connection()
+    listener.detach()
+    try:
+        listener.dbapi_connection.autocommit = True
+        with listener.dbapi_connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {event_bus.CHANNEL}")
+        
+        assert notification_service.dispatch_pending(db, batch_size=count) == count
+        
+        listener.dbapi_connection.poll()
+        events = [json.loads(notify.payload) for notify in listener.dbapi_connection.notifies]
+    finally:
+        listener.close()
+    
+    created = [event for event in events if event["type"] == "notification.created"]
+    assert len(created) > 1
+    delivered = [notification_id for event in created for notification_id in event["ids"]]
+    assert sorted(delivered) == [row.id for row in db.query(Notification.id).order_by(Notification.id)]
+    assert db.query(NotificationOutbox).count() == 0
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.models import Notification
+from conftest import auth_headers
+
+
+def _pages(client, user, limit, **params):
+    """Follow X-Next-Cursor to the end; returns the id pages"""
+    pages, cursor = [], None
+    while True:
+        response = client.get(
+            "/api/v1/notifications/",
+            params={"limit": limit, **params, **({"before": cursor} if cursor else {})},
+            headers=auth_headers(user.user)
+        )
+        assert response.status_code == 200
+        pages.append([entry["id"] for entry in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_walk_the_feed_once_across_equal_timestamps(db, client, make_student):
+    student = make_student()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Groups of three share a timestamp so the id tiebreak decides the order
+    db.add_all([
+        Notification(user_id=student.user_id, type="system", title=f"n{index}", read=index % 2 == 0,
+                     created_at=start + timedelta(minutes=index // 3))
+        for index in range(25)
+    ])
+    db.commit()
+    newest_first = [
+        row.id for row in db.query(Notification.id).order_by(Notification.created_at.desc(), Notification.id.desc())
+    ]
+    unread_newest_first = [
+        row.id for row in db.query(Notification.id).filter(Notification.read == False)
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+    ]
+    
+    pages = _pages(client, student, limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == newest_first
+    
+    assert sum(_pages(client, student, limit=4, unread_only=True), []) == unread_newest_first
+
+
+def test_a_malformed_cursor_is_rejected(db, client, make_student):
+    student = make_student()
+    
+    response = client.get("/api/v1/notifications/", params={"before": "not-a-cursor"}, headers=auth_headers(student.user))
+    
+    assert response.status_code == 400
+
+
+def test_a_deep_page_seeks_the_feed_index(db, engine, make_student):
+    user_id = make_student().user_id
+    
+    with engine.connect() as connection:
+        connection.execute(text("SET enable_seqscan = off"))
+        plan = "\n".join(connection.execute(text(
+            "EXPLAIN SELECT * FROM notifications WHERE user_id = :user_id "
+            "AND (created_at, id) < (now(), 1000) ORDER BY created_at DESC, id DESC LIMIT 50"
+        ), {"user_id": user_id}).scalars())
+    
+    assert "ix_notifications_user_id_created_at_id" in plan
+    assert "Sort" not in plan
@@ -0,0 +1,68 @@
+import time
+
+from app.models import User
+from app.models.notification import NotificationOutbox
+from app.schemas.notification import NotificationCreate
+from app.services import event_bus, notification_preferences
+from app.services import notifications as notification_service
+from app.services.notification_preferences import MutePreferenceCache, mute_cache
+
+from conftest import auth_headers
+
+
+def test_type_bits_are_stable_and_round_trip():
+    # Positions are persisted in users.muted_notification_types
+    assert notification_preferences.mask_from_types(["group_invitation"]) == 1
+    assert notification_preferences.mask_from_types(["join_request", "mentorship_rejected"]) == (1 << 3) | (1 << 8)
+    assert notification_preferences.types_from_mask((1 << 3) | (1 << 8)) == ["join_request", "mentorship_rejected"]
+    assert notification_preferences.types_from_mask(0) == []
+
+
+def test_muted_types_are_dropped_at_enqueue(db, client, make_student):
+    student = make_student()
+    user_id = student.user_id
+    headers = auth_headers(student.user)
+    
+    response = client.put("/api/v1/notifications/preferences", json={"muted_types": ["join_request"]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["muted_types"] == ["join_request"]
+    
+    assert not notification_service.enqueue(db, NotificationCreate(user_id=user_id, type="join_request", title="muted"))
+    assert notification_service.enqueue(db, NotificationCreate(user_id=user_id, type="group_invitation", title="kept"))
+    # Types outside the bitmask can never be muted
+    assert notification_service.enqueue(db, NotificationCreate(user_id=user_id, type="announcement", title="kept"))
+    db.commit()
+    assert sorted(title for (title,) in db.query(NotificationOutbox.title)) == ["kept", "kept"]
+    
+    response = client.put("/api/v1/notifications/preferences", json={"muted_types": ["bogus"]}, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/api/v1/notifications/preferences", headers=headers).json()["muted_types"] == ["join_request"]
+
+
+def test_masks_are_cached_until_the_preferences_change(db, make_student, count_queries):
+    student = make_student()
+    user_id = student.user_id
+    notification_preferences.set_muted_types(db, student.user, ["mentorship_request"])
+    
+    with count_queries() as first:
+        assert notification_preferences.is_muted(db, user_id, "mentorship_request")
+    with count_queries() as cached:
+        assert notification_preferences.is_muted(db, user_id, "mentorship_request")
+        assert not notification_preferences.is_muted(db, user_id, "join_request")
+    assert (first.count, cached.count) == (1, 0)
+    
+    # Another worker changed them: its event drops this worker's copy
+    db.query(User).filter_by(id=user_id).update({"muted_notification_types": 0})
+    db.commit()
+    assert notification_preferences.is_muted(db, user_id, "mentorship_request")
+    event_bus.dispatch({"type": "notification.preferences_updated", "user_id": user_id})
+    assert mute_cache.get(user_id) is None
+    assert not notification_preferences.is_muted(db, user_id, "mentorship_request")
+
+
+def test_cached_masks_expire():
+    cache = MutePreferenceCache(ttl_seconds=0.05, max_entries=10)
+    cache.set(1, 4)
+    assert cache.get(1) == 4
+    time.sleep(0.1)
+    assert cache.get(1) is None
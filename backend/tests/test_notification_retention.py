@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from app.maintenance.notification_retention import purge_notifications
+from app.models import Notification
+from app.models.notification import NotificationCounter
+
+
+def test_purge_deletes_expired_rows_one_id_range_at_a_time(db, engine, make_student, count_commits):
+    user_id = make_student().user_id
+    now = datetime.now(timezone.utc)
+    ages = {
+        "old read": (True, 40), "old unread": (False, 40), "ancient unread": (False, 400),
+        "recent read": (True, 5), "recent unread": (False, 5),
+    }
+    # Interleave kept and expired rows so every range has something to skip
+    db.add_all([
+        Notification(user_id=user_id, type="system", title=title, read=read, created_at=now - timedelta(days=days))
+        for _ in range(3) for title, (read, days) in ages.items()
+    ])
+    db.commit()
+    
+    assert purge_notifications(engine, read_days=30, retention_days=365, dry_run=True) == 6
+    with count_commits() as commits:
+        assert purge_notifications(engine, read_days=30, retention_days=365, batch_size=4) == 6
+    
+    assert len(commits) == 4
+    db.expire_all()
+    remaining = sorted(title for (title,) in db.query(Notification.title))
+    assert remaining == sorted(["old unread", "recent read", "recent unread"] * 3)
+    # The expired unread rows left the counter through its delete trigger
+    assert db.query(NotificationCounter.unread_count).filter_by(user_id=user_id).scalar() == 6
+
+
+def test_purge_with_nothing_expired_is_a_no_op(db, engine, make_student):
+    db.add(Notification(user_id=make_student().user_id, type="system", title="fresh"))
+    db.commit()
+    
+    assert purge_notifications(engine) == 0
+    assert db.query(Notification).count() == 1
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from app.api.v1 import notifications as notifications_api
+from app.config import settings
+from app.models import Notification
+from app.services.hub import notification_hub
+
+from conftest import auth_token
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+async def _open(token, last_event_id):
+    response = await notifications_api.stream_notifications(token=token, last_event_id=last_event_id)
+    return response.body_iterator
+
+
+async def _next_events(stream, count):
+    return [_parse(await asyncio.wait_for(stream.__anext__(), 5)) for _ in range(count)]
+
+
+def _add(db, user_id, count):
+    rows = [Notification(user_id=user_id, type="system", title=f"n{index}") for index in range(count)]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def test_reconnect_replays_missed_notifications_then_continues_live(db, make_student):
+    student, other = make_student(), make_student()
+    user_id, token = student.user_id, auth_token(student.user)
+    _add(db, other.user_id, 2)
+    ids = _add(db, user_id, 5)
+    
+    async def scenario():
+        stream = await _open(token, last_event_id=ids[1])
+        try:
+            connected = await _next_events(stream, 4)
+            # Already replayed, then new: only the new one is sent
+            late = _add(db, user_id, 1)
+            event = {"ids": [ids[4]] + late, "user_ids": [user_id]}
+            await asyncio.to_thread(notifications_api.push_notification_event, event)
+            live = await _next_events(stream, 1)
+        finally:
+            await stream.aclose()
+        return connected, live, late[0]
+    
+    connected, live, late_id = asyncio.run(scenario())
+    
+    assert connected[0] == (None, "unread_count", {"count": 5})
+    assert [(event_id, kind) for event_id, kind, _ in connected[1:]] == [
+        (str(ids[2]), "notification"), (str(ids[3]), "notification"), (str(ids[4]), "notification")
+    ]
+    assert live[0][:2] == (str(late_id), "notification")
+    assert live[0][2]["title"] == "n0"
+    assert not notification_hub.has_subscribers(user_id)
+
+
+def test_replay_is_capped_to_the_newest_notifications(db, make_student, monkeypatch):
+    student = make_student()
+    token = auth_token(student.user)
+    ids = _add(db, student.user_id, 5)
+    monkeypatch.setattr(settings, "NOTIFICATION_STREAM_REPLAY_LIMIT", 2)
+    
+    async def scenario():
+        stream = await _open(token, last_event_id=0)
+        try:
+            return await _next_events(stream, 3)
+        finally:
+            await stream.aclose()
+    
+    events = asyncio.run(scenario())
+    
+    assert [event_id for event_id, _, _ in events[1:]] == [str(ids[3]), str(ids[4])]
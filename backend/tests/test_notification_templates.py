@@ -0,0 +1,54 @@
+from app.models import Notification
+from app.services.notification_templates import render, render_notifications
+
+
+def test_render_fills_placeholders_and_switches_to_the_merged_message():
+    names = {"student": "Ana", "group": "Robotics", "professor": "Lee"}
+    
+    assert render("join_request", None, 1, names) == ("New Join Request", "Ana wants to join Robotics")
+    assert render("join_request", None, 3, names) == ("New Join Request", "Ana and 2 other(s) want to join Robotics")
+    assert render("mentorship_response", {"status": "accepted"}, 1, names) == (
+        "Mentorship Request Accepted",
+        "Professor Lee has accepted your mentorship request for 'Robotics'"
+    )
+    # No merged wording: the single message is kept
+    assert render("group_invitation", None, 2, names)[1] == "You've been invited to join Robotics"
+    assert render("no_such_template", None, 1, names) is None
+
+
+def test_notifications_render_current_names_in_one_query_per_entity(db, make_student, make_professor, make_group, count_queries):
+    recipient = make_student()
+    applicant = make_student(name="Ana")
+    professor = make_professor(name="Dr. Lee")
+    groups = [make_group(name=f"Group {index}") for index in range(4)]
+    rows = [
+        Notification(user_id=recipient.user_id, type="join_request", template_id="join_request",
+                     related_group_id=group.id, related_student_id=applicant.id)
+        for group in groups
+    ] + [
+        Notification(user_id=recipient.user_id, type="mentorship_accepted", template_id="mentorship_response",
+                     related_group_id=groups[0].id, params={"status": "accepted", "professor_id": professor.id}),
+        Notification(user_id=recipient.user_id, type="join_request", template_id="join_request",
+                     related_group_id=None, related_student_id=None, occurrence_count=2),
+        Notification(user_id=recipient.user_id, type="system", title="Stored title", message="stored message"),
+    ]
+    db.add_all(rows)
+    # Renames after the notification was written show up on read
+    groups[1].name = "Renamed"
+    db.commit()
+    notifications = db.query(Notification).order_by(Notification.id).all()
+    
+    with count_queries() as queries:
+        rendered = render_notifications(db, notifications)
+    
+    assert queries.count == 3
+    messages = [(entry["title"], entry["message"]) for entry in rendered]
+    assert messages[:2] == [
+        ("New Join Request", "Ana wants to join Group 0"),
+        ("New Join Request", "Ana wants to join Renamed"),
+    ]
+    assert messages[4:] == [
+        ("Mentorship Request Accepted", "Professor Dr. Lee has accepted your mentorship request for 'Group 0'"),
+        ("New Join Request", "Someone and 1 other(s) want to join a group"),
+        ("Stored title", "stored message"),
+    ]
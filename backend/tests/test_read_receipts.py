@@ -0,0 +1,68 @@
+from app.crud import chat as crud_chat
+from app.models.chat import GroupReadCursor
+from app.schemas.chat import ChatMessageCreate
+from app.services.read_receipts import ReadReceiptBuffer, read_receipts
+
+
+def _post(db, group, count):
+    return [
+        crud_chat.create_message(db, group.id, group.leader_id, "student", ChatMessageCreate(message=f"message {index}")).id
+        for index in range(count)
+    ]
+
+
+def _stored_watermark(db, group_id, user_id):
+    db.expire_all()
+    cursor = db.query(GroupReadCursor).filter_by(group_id=group_id, user_id=user_id).first()
+    return cursor.last_read_message_id if cursor else None
+
+
+def test_marks_collapse_to_the_highest_and_never_move_the_cursor_back(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    first, second, third = _post(db, group, 3)
+    buffer = ReadReceiptBuffer(flush_interval=3600, max_pending=100)
+    
+    buffer.mark(group.id, leader.user_id, second)
+    buffer.mark(group.id, leader.user_id, first)
+    assert buffer.pending(group.id, leader.user_id) == second
+    assert buffer.flush() == 1
+    assert _stored_watermark(db, group.id, leader.user_id) == second
+    
+    # An older mark flushed later keeps the stored watermark (GREATEST)
+    buffer.mark(group.id, leader.user_id, first)
+    buffer.flush()
+    assert _stored_watermark(db, group.id, leader.user_id) == second
+    
+    buffer.mark(group.id, leader.user_id, third)
+    buffer.flush()
+    assert _stored_watermark(db, group.id, leader.user_id) == third
+
+
+def test_pending_marks_are_written_on_shutdown(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    (message_id,) = _post(db, group, 1)
+    buffer = ReadReceiptBuffer(flush_interval=3600, max_pending=100)
+    buffer.start()
+    
+    buffer.mark(group.id, leader.user_id, message_id)
+    assert _stored_watermark(db, group.id, leader.user_id) is None
+    buffer.stop()
+    
+    assert _stored_watermark(db, group.id, leader.user_id) == message_id
+    assert buffer.stats() == {"pending": 0, "flushed": 1, "batches": 1}
+
+
+def test_mark_for_another_groups_message_is_not_buffered(db, make_student, make_group):
+    leader = make_student()
+    group = make_group(leader=leader)
+    other = make_group()
+    _post(db, group, 2)
+    (foreign,) = _post(db, other, 1)
+    
+    assert not crud_chat.mark_message_as_read(db, group.id, foreign, leader.user_id)
+    
+    assert read_receipts.pending(group.id, leader.user_id) == 0
+    assert read_receipts.pending_for_user(leader.user_id) == {}
+    assert crud_chat.get_unread_count(db, group.id, leader.user_id) == 2
@@ -0,0 +1,61 @@
+import numpy as np
+
+from app.models import Student
+from app.services.recommendations import RecommendationIndex, _top, popcount
+
+
+def test_popcount_counts_bits_across_every_word_of_a_row():
+    bits = np.array([
+        [0b1011, 0],
+        [0, 1 << 63],
+        [2 ** 64 - 1, 1],
+        [0, 0],
+    ], dtype=np.uint64)
+    
+    assert popcount(bits).tolist() == [3, 1, 65, 0]
+    # Column slices are not contiguous; the result must not depend on layout
+    assert popcount(bits[:, 1:]).tolist() == [0, 1, 1, 0]
+
+
+def test_top_returns_the_best_candidates_first_and_keeps_ties_in_order():
+    scores = np.array([0.5, 0.9, 0.1, 0.9, 0.7])
+    
+    assert _top(scores, np.arange(5), 3).tolist() == [1, 3, 4]
+    assert _top(scores, np.array([0, 2, 4]), 10).tolist() == [4, 0, 2]
+    assert _top(scores, np.array([], dtype=np.int64), 3).tolist() == []
+
+
+def test_skills_beyond_the_first_64_are_matched(db, make_student, make_group):
+    skills = [f"skill {index}" for index in range(100)]
+    leader = make_student(skills=skills[:64])
+    group = make_group(leader=leader, needed_skills=["Skill 70", "skill 99", "skill 3"])
+    candidate = make_student(skills=["skill 99", "SKILL 70 "], looking_for_group=True)
+    index = RecommendationIndex()
+    
+    ranked = index.recommend_students(group.id, exclude_student_ids=[leader.id])
+    
+    assert len(index.vocabulary) == 66
+    assert index.students.bits.shape[1] == 2
+    assert [(student_id, skill_match) for student_id, _, skill_match in ranked] == [(candidate.id, 2)]
+
+
+def test_refreshing_a_leader_moves_their_groups_to_the_new_faculty(db, make_student, make_group):
+    leader = make_student(faculty="Engineering")
+    group = make_group(leader=leader)
+    index = RecommendationIndex()
+    index.ensure_loaded()
+    
+    db.query(Student).filter(Student.id == leader.id).update({"faculty": "Law"})
+    db.commit()
+    index.refresh_students([leader.id])
+    
+    row = index.groups.row_of[group.id]
+    assert index.groups.columns["faculty"][row] == index.faculties["law"]
+
+
+def test_a_full_group_gets_no_student_recommendations(db, make_student, make_group):
+    group = make_group(needed_skills=["python"], members=1, max_members=2)
+    make_student(skills=["python"], looking_for_group=True)
+    index = RecommendationIndex()
+    
+    assert index.recommend_students(group.id) == []
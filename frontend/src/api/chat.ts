@@ -21,6 +21,12 @@ export interface ChatMessageUpdate {
   message: string;
 }
 
+export interface ChatMessagePage {
+  messages: ChatMessage[];
+  // Send back as `cursor` to load the page before this one; absent on the oldest page
+  nextCursor?: string;
+}
+
 export interface UnreadCountResponse {
   group_id: number;
   unread_count: number;
@@ -36,13 +42,13 @@ export const chatApi = {
     return response.data;
   },
 
-  // Get all messages for a group
-  getMessages: async (groupId: number, skip: number = 0, limit: number = 100): Promise<ChatMessage[]> => {
+  // Get a page of messages, oldest first: the newest page, or the one before `cursor`
+  getMessages: async (groupId: number, cursor?: string, limit: number = 100): Promise<ChatMessagePage> => {
     const response = await apiClient.get<ChatMessage[]>(
       `/chat/groups/${groupId}/messages`,
-      { params: { skip, limit } }
+      { params: { cursor, limit } }
     );
-    return response.data;
+    return { messages: response.data, nextCursor: response.headers['x-next-cursor'] };
   },
 
   // Update a message
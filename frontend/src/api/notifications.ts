@@ -1,6 +1,7 @@
 import { apiClient } from './client';
 
 export interface Notification {
+  // Announcements carry their negated id, so ids are unique across both sources
   id: number;
   user_id: number;
   type: string;
@@ -12,6 +13,10 @@ export interface Notification {
   related_group_id?: number;
   related_student_id?: number;
   related_request_id?: number;
+  // Every request a coalesced notification stands for, oldest first
+  request_ids?: number[];
+  occurrence_count?: number;
+  source?: 'notification' | 'announcement';
 }
 
 export const notificationsApi = {
@@ -37,7 +42,7 @@ export const notificationsApi = {
     return response.data;
   },
 
-  // Mark single notification as read
+  // Mark single notification as read (an announcement is marked as seen)
   markOneRead: async (notificationId: number): Promise<{ message: string }> => {
     const response = await apiClient.put<{ message: string }>(
       `/notifications/${notificationId}/mark-read`
@@ -62,11 +67,16 @@ export const notificationsApi = {
     return response.data;
   },
 
-  // Handle group join request action (accept/reject)
-  handleGroupJoinRequest: async (notificationId: number, action: 'accept' | 'reject'): Promise<{ message: string; status: string }> => {
+  // Handle group join request action (accept/reject); without a request id the
+  // oldest request the notification stands for that is still pending is answered
+  handleGroupJoinRequest: async (
+    notificationId: number,
+    action: 'accept' | 'reject',
+    requestId?: number
+  ): Promise<{ message: string; status: string }> => {
     const response = await apiClient.post<{ message: string; status: string }>(
       '/notifications/group-join-request/action',
-      { notification_id: notificationId, action }
+      { notification_id: notificationId, action, request_id: requestId }
     );
     return response.data;
   }
@@ -23,6 +23,8 @@ export default function GroupChatModal({
   const [newMessage, setNewMessage] = useState('');
   const [isLoading, setIsLoading] = useState(true);
   const [isSending, setIsSending] = useState(false);
+  const [olderCursor, setOlderCursor] = useState<string | undefined>();
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const messagesContainerRef = useRef<HTMLDivElement>(null);
 
@@ -34,15 +36,18 @@ export default function GroupChatModal({
     }
   }, [isOpen, groupId]);
 
+  // Only a new latest message scrolls down; loading older ones keeps the position
+  const latestMessageId = messages.length > 0 ? messages[messages.length - 1].id : undefined;
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [latestMessageId]);
 
   const fetchMessages = async () => {
     try {
       setIsLoading(true);
-      const data = await chatApi.getMessages(groupId);
-      setMessages(data);
+      const page = await chatApi.getMessages(groupId);
+      setMessages(page.messages);
+      setOlderCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to fetch messages:', error);
     } finally {
@@ -50,6 +55,29 @@ export default function GroupChatModal({
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!olderCursor || isLoadingOlder) return;
+
+    const container = messagesContainerRef.current;
+    const previousHeight = container?.scrollHeight ?? 0;
+    try {
+      setIsLoadingOlder(true);
+      const page = await chatApi.getMessages(groupId, olderCursor);
+      setMessages(current => [...page.messages, ...current]);
+      setOlderCursor(page.nextCursor);
+      // Keep the messages that were on screen in place
+      requestAnimationFrame(() => {
+        if (container) {
+          container.scrollTop += container.scrollHeight - previousHeight;
+        }
+      });
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
@@ -217,152 +245,173 @@ export default function GroupChatModal({
               </p>
             </div>
           ) : (
-            messages.map((message) => {
-              const isOwn = isCurrentUser(message);
-              return (
-                <div
-                  key={message.id}
+            <>
+              {olderCursor && (
+                <button
+                  onClick={loadOlderMessages}
+                  disabled={isLoadingOlder}
                   style={{
-                    display: 'flex',
-                    justifyContent: isOwn ? 'flex-end' : 'flex-start'
+                    alignSelf: 'center',
+                    padding: '0.375rem 0.875rem',
+                    background: colors.neutral.white,
+                    border: `2px solid ${colors.neutral.gray200}`,
+                    borderRadius: '8px',
+                    color: colors.neutral.gray600,
+                    fontSize: '0.75rem',
+                    cursor: isLoadingOlder ? 'default' : 'pointer',
+                    opacity: isLoadingOlder ? 0.6 : 1
                   }}
                 >
+                  {isLoadingOlder ? 'Loading...' : 'Load older messages'}
+                </button>
+              )}
+              {messages.map((message) => {
+                const isOwn = isCurrentUser(message);
+                return (
                   <div
+                    key={message.id}
                     style={{
-                      maxWidth: '70%',
                       display: 'flex',
-                      flexDirection: 'column',
-                      gap: '0.25rem'
+                      justifyContent: isOwn ? 'flex-end' : 'flex-start'
                     }}
                   >
-                    {!isOwn && (
-                      <span
-                        style={{
-                          fontSize: '0.75rem',
-                          fontWeight: '600',
-                          color: colors.neutral.gray600,
-                          marginLeft: '0.75rem'
-                        }}
-                      >
-                        {message.sender_name}
-                      </span>
-                    )}
                     <div
                       style={{
-                        padding: '0.875rem 1.125rem',
-                        borderRadius: isOwn ? '16px 16px 4px 16px' : '16px 16px 16px 4px',
-                        background: isOwn
-                          ? colors.primary.gradient
-                          : colors.neutral.white,
-                        color: isOwn ? 'white' : colors.neutral.gray900,
-                        boxShadow: isOwn
-                          ? `0 4px 12px ${colors.primary.shadow}`
-                          : '0 2px 8px rgba(0,0,0,0.08)',
-                        border: isOwn ? 'none' : `2px solid ${colors.neutral.gray200}`,
-                        wordWrap: 'break-word'
+                        maxWidth: '70%',
+                        display: 'flex',
+                        flexDirection: 'column',
+                        gap: '0.25rem'
                       }}
                     >
-                      <p style={{ margin: 0, fontSize: '0.875rem', lineHeight: '1.5' }}>
-                        {message.message}
-                      </p>
-                      {message.edited_at && (
-                        <p
+                      {!isOwn && (
+                        <span
                           style={{
-                            margin: '0.25rem 0 0 0',
-                            fontSize: '0.625rem',
-                            opacity: 0.7,
-                            fontStyle: 'italic'
+                            fontSize: '0.75rem',
+                            fontWeight: '600',
+                            color: colors.neutral.gray600,
+                            marginLeft: '0.75rem'
                           }}
                         >
-                          (edited)
-                        </p>
+                          {message.sender_name}
+                        </span>
                       )}
+                      <div
+                        style={{
+                          padding: '0.875rem 1.125rem',
+                          borderRadius: isOwn ? '16px 16px 4px 16px' : '16px 16px 16px 4px',
+                          background: isOwn
+                            ? colors.primary.gradient
+                            : colors.neutral.white,
+                          color: isOwn ? 'white' : colors.neutral.gray900,
+                          boxShadow: isOwn
+                            ? `0 4px 12px ${colors.primary.shadow}`
+                            : '0 2px 8px rgba(0,0,0,0.08)',
+                          border: isOwn ? 'none' : `2px solid ${colors.neutral.gray200}`,
+                          wordWrap: 'break-word'
+                        }}
+                      >
+                        <p style={{ margin: 0, fontSize: '0.875rem', lineHeight: '1.5' }}>
+                          {message.message}
+                        </p>
+                        {message.edited_at && (
+                          <p
+                            style={{
+                              margin: '0.25rem 0 0 0',
+                              fontSize: '0.625rem',
+                              opacity: 0.7,
+                              fontStyle: 'italic'
+                            }}
+                          >
+                            (edited)
+                          </p>
+                        )}
+                      </div>
+                      <span
+                        style={{
+                          fontSize: '0.625rem',
+                          color: colors.neutral.gray600,
+                          marginLeft: isOwn ? 'auto' : '0.75rem',
+                          marginRight: isOwn ? '0.75rem' : 'auto'
+                        }}
+                      >
+                        {formatTime(message.created_at)}
+                      </span>
                     </div>
-                    <span
-                      style={{
-                        fontSize: '0.625rem',
-                        color: colors.neutral.gray600,
-                        marginLeft: isOwn ? 'auto' : '0.75rem',
-                        marginRight: isOwn ? '0.75rem' : 'auto'
-                      }}
-                    >
-                      {formatTime(message.created_at)}
-                    </span>
                   </div>
-                </div>
-              );
-            })
-          )}
-          <div ref={messagesEndRef} />
-        </div>
+                );
+              })}
+          </>
+        )}
+        <div ref={messagesEndRef} />
+      </div>
 
-        {/* Input Area */}
-        <div
-          style={{
-            padding: '1rem 1.5rem',
-            borderTop: `2px solid ${colors.neutral.gray200}`,
-            background: colors.neutral.white,
-            borderRadius: '0 0 16px 16px'
-          }}
-        >
-          <div style={{ display: 'flex', gap: '0.75rem', alignItems: 'flex-end' }}>
-            <textarea
-              value={newMessage}
-              onChange={(e) => setNewMessage(e.target.value)}
-              onKeyPress={handleKeyPress}
-              placeholder="Type your message..."
-              disabled={isSending}
-              rows={1}
-              style={{
-                ...baseInput,
-                resize: 'none',
-                minHeight: '44px',
-                maxHeight: '120px',
-                fontFamily: 'inherit',
-                opacity: isSending ? 0.6 : 1
-              }}
-              onFocus={(e) => {
-                e.target.style.borderColor = '#667eea';
-                e.target.style.boxShadow = '0 0 0 3px rgba(102, 126, 234, 0.1)';
-              }}
-              onBlur={(e) => {
-                e.target.style.borderColor = colors.neutral.gray200;
-                e.target.style.boxShadow = 'none';
-              }}
-            />
-            <button
-              onClick={handleSendMessage}
-              disabled={!newMessage.trim() || isSending}
-              style={{
-                ...primaryButton,
-                padding: '0.875rem 1.125rem',
-                opacity: (!newMessage.trim() || isSending) ? 0.5 : 1,
-                cursor: (!newMessage.trim() || isSending) ? 'not-allowed' : 'pointer',
-                flexShrink: 0
-              }}
-              onMouseEnter={(e) => {
-                if (newMessage.trim() && !isSending) {
-                  e.currentTarget.style.transform = 'translateY(-2px)';
-                  e.currentTarget.style.boxShadow = `0 6px 20px ${colors.primary.shadowHover}`;
-                }
-              }}
-              onMouseLeave={(e) => {
-                e.currentTarget.style.transform = 'translateY(0)';
-                e.currentTarget.style.boxShadow = `0 4px 12px ${colors.primary.shadow}`;
-              }}
-            >
-              <Send size={18} />
-            </button>
-          </div>
-          <p style={{
-            margin: '0.5rem 0 0 0',
-            fontSize: '0.625rem',
-            color: colors.neutral.gray600
-          }}>
-            Press Enter to send, Shift+Enter for new line
-          </p>
+      {/* Input Area */}
+      <div
+        style={{
+          padding: '1rem 1.5rem',
+          borderTop: `2px solid ${colors.neutral.gray200}`,
+          background: colors.neutral.white,
+          borderRadius: '0 0 16px 16px'
+        }}
+      >
+        <div style={{ display: 'flex', gap: '0.75rem', alignItems: 'flex-end' }}>
+          <textarea
+            value={newMessage}
+            onChange={(e) => setNewMessage(e.target.value)}
+            onKeyPress={handleKeyPress}
+            placeholder="Type your message..."
+            disabled={isSending}
+            rows={1}
+            style={{
+              ...baseInput,
+              resize: 'none',
+              minHeight: '44px',
+              maxHeight: '120px',
+              fontFamily: 'inherit',
+              opacity: isSending ? 0.6 : 1
+            }}
+            onFocus={(e) => {
+              e.target.style.borderColor = '#667eea';
+              e.target.style.boxShadow = '0 0 0 3px rgba(102, 126, 234, 0.1)';
+            }}
+            onBlur={(e) => {
+              e.target.style.borderColor = colors.neutral.gray200;
+              e.target.style.boxShadow = 'none';
+            }}
+          />
+          <button
+            onClick={handleSendMessage}
+            disabled={!newMessage.trim() || isSending}
+            style={{
+              ...primaryButton,
+              padding: '0.875rem 1.125rem',
+              opacity: (!newMessage.trim() || isSending) ? 0.5 : 1,
+              cursor: (!newMessage.trim() || isSending) ? 'not-allowed' : 'pointer',
+              flexShrink: 0
+            }}
+            onMouseEnter={(e) => {
+              if (newMessage.trim() && !isSending) {
+                e.currentTarget.style.transform = 'translateY(-2px)';
+                e.currentTarget.style.boxShadow = `0 6px 20px ${colors.primary.shadowHover}`;
+              }
+            }}
+            onMouseLeave={(e) => {
+              e.currentTarget.style.transform = 'translateY(0)';
+              e.currentTarget.style.boxShadow = `0 4px 12px ${colors.primary.shadow}`;
+            }}
+          >
+            <Send size={18} />
+          </button>
         </div>
+        <p style={{
+          margin: '0.5rem 0 0 0',
+          fontSize: '0.625rem',
+          color: colors.neutral.gray600
+        }}>
+          Press Enter to send, Shift+Enter for new line
+        </p>
       </div>
+    </div>
     </>
   );
 }
\ No newline at end of file
@@ -606,9 +606,8 @@ const handleStudentInvite = async (studentId: number) => {
                 await notificationsApi.handleGroupJoinRequest(notificationId, action);
               }
               
-              // Remove notification from the list immediately
-              setNotifications(notifications.filter(n => n.id !== notificationId));
-              setUnreadCount(Math.max(0, unreadCount - 1));
+              // A coalesced join request notification stays until its last request is answered
+              await fetchNotifications();
             } catch (error) {
               console.error('Failed to handle notification action:', error);
             }